@@ -0,0 +1,162 @@
+"""
+ai_cache.py
+===========
+Content-addressed on-disk cache for Gemini outputs (article, captions, FAQs,
+structured bundles), so a retried product or a re-run of a crashed cycle does
+not pay for the same generation twice.
+
+Key   = sha256(kind + ASIN + language + niche prompt + prompt-template hash + extras)
+Store = one JSON file per entry under CACHE_DIR/ai/
+Evict = entries older than AI_CACHE_TTL_HOURS, then oldest-first until the
+        directory is under AI_CACHE_MAX_MB.
+
+Only successful generations are stored — fallback captions/FAQs never are.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+
+from config import CACHE_DIR, AI_CACHE_TTL_HOURS, AI_CACHE_MAX_MB
+
+
+def template_hash(*sources) -> str:
+    """
+    Short hash of the prompt templates behind a generation. Functions are hashed
+    by their source code, anything else by its JSON/str form — editing a prompt
+    therefore invalidates every entry produced by the old wording.
+    """
+    digest = hashlib.sha256()
+    for src in sources:
+        if callable(src):
+            try:
+                text = inspect.getsource(src)
+            except (OSError, TypeError):
+                text = getattr(src, "__qualname__", repr(src))
+        elif isinstance(src, (dict, list)):
+            text = json.dumps(src, sort_keys=True)
+        else:
+            text = str(src)
+        digest.update(text.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class AIOutputCache:
+    """Thread-safe JSON-file cache with TTL and size-bounded eviction."""
+
+    def __init__(self, directory, ttl_seconds, max_bytes):
+        self.directory = directory
+        self.ttl       = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock     = threading.Lock()
+        self.hits      = 0
+        self.misses    = 0
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.max_bytes > 0
+
+    @staticmethod
+    def make_key(kind, asin, language="", niche_prompt="", template="", **extra) -> str:
+        parts = {
+            "kind":     kind,
+            "asin":     asin or "",
+            "language": (language or "").lower(),
+            "niche":    (niche_prompt or "").strip().lower(),
+            "template": template,
+            "extra":    {k: v for k, v in sorted(extra.items()) if v is not None},
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """Cached value for `key`, or None if missing/expired/unreadable."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError, OSError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if time.time() - entry.get("created", 0) > self.ttl:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        try:
+            os.utime(path)  # keep recently used entries at the back of the eviction queue
+        except OSError:
+            pass
+        return entry.get("value")
+
+    def put(self, key, value, kind=""):
+        if not self.enabled or value is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path     = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"created": time.time(), "kind": kind, "value": value}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"[AI:cache] Could not store {kind or 'entry'}: {e}")
+            return
+        self._evict()
+
+    def _evict(self):
+        """Drops expired entries, then least-recently-used ones until under max_bytes."""
+        with self._lock:
+            try:
+                names = [n for n in os.listdir(self.directory) if n.endswith(".json")]
+            except OSError:
+                return
+            now, entries, total = time.time(), [], 0
+            for name in names:
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if now - st.st_mtime > self.ttl:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+            if total <= self.max_bytes:
+                return
+            entries.sort()
+            for _, size, path in entries:
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    continue
+                if total <= self.max_bytes:
+                    break
+
+
+ai_cache = AIOutputCache(
+    os.path.join(CACHE_DIR, "ai"),
+    ttl_seconds=AI_CACHE_TTL_HOURS * 3600,
+    max_bytes=int(AI_CACHE_MAX_MB * 1024 * 1024),
+)
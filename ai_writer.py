@@ -1,29 +1,387 @@
-from config import GEMINI_API_KEYS, SCRAPINGANT_API_KEYS
+from config import (GEMINI_API_KEYS, AI_GENERATION_MODE, GEMINI_RPM_PER_KEY,
+                    CACHE_DIR, GEMINI_MODEL_CACHE_TTL_HOURS)
 import time
 try:
     from youtubesearchpython import VideosSearch
 except ImportError:
     VideosSearch = None
 import random
-import requests
+import scrapingant_client
 import re
 import json
+import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from google import genai
+from google.genai import errors as genai_errors
+from google.genai import types as genai_types
+try:
+    import httpx
+except ImportError:
+    httpx = None
+from fluff_filter import clean_fluff
+from ai_cache import ai_cache, template_hash
+from scraper import extract_asin
+
+# ---------------------------------------------------------------------------
+# Gemini key scheduler (client pool + health-aware rotation)
+# ---------------------------------------------------------------------------
+_RETRY_DELAY_PATTERNS = [
+    re.compile(r"retryDelay['\"]?\s*:\s*['\"]?(\d+(?:\.\d+)?)s", re.IGNORECASE),
+    re.compile(r"retry in (\d+(?:\.\d+)?)\s*s", re.IGNORECASE),
+]
+
+
+def _retry_after_seconds(error):
+    """Extracts a server-suggested wait (Retry-After header or RetryInfo) from an API error."""
+    response = getattr(error, "response", None)
+    headers  = getattr(response, "headers", None)
+    if headers:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    text = str(error)
+    for pattern in _RETRY_DELAY_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+TRANSIENT_STATUS_CODES = (500, 502, 503, 504)
+
+
+def _status_code(error):
+    """HTTP status of an API error (genai APIError.code, or the attached response), else None."""
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code
+    code = getattr(getattr(error, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def _is_transient_error(error):
+    """5xx / overloaded responses and dropped connections: worth a short pause on that key, not a rotation."""
+    if isinstance(error, genai_errors.ServerError):
+        return True
+    code = _status_code(error)
+    if code is not None:
+        return code in TRANSIENT_STATUS_CODES
+    if httpx is not None and isinstance(error, httpx.TransportError):
+        return True
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+class GeminiKeysUnavailable(RuntimeError):
+    """Every key is cooling down past the calling generation's deadline."""
+
+
+class GeminiKeyScheduler:
+    """
+    Thread-safe pool of Gemini API keys.
+
+    - caches one genai.Client per key (no client rebuild per attempt)
+    - puts a key on cooldown after a quota error, honouring Retry-After /
+      RetryInfo when Gemini sends one, else backing off exponentially
+    - enforces a requests-per-minute budget per key
+    - hands out the healthiest available key (success rate, then least recently used)
+
+    Keys are read from the module-level GEMINI_API_KEYS on every call, so
+    per-site overrides (run_single_cycle.py) take effect immediately.
+
+    A generation gets one deadline for all its attempts (deadline()); when
+    every key is parked beyond it (e.g. daily quota used up), acquire()
+    raises GeminiKeysUnavailable at once instead of sleeping.
+    """
+
+    BASE_COOLDOWN = 30       # seconds, first quota hit without Retry-After
+    MAX_COOLDOWN  = 900      # seconds
+    CALL_DEADLINE = 300      # seconds one generation (all attempts + key waits) may take
+
+    def __init__(self, rpm_limit=GEMINI_RPM_PER_KEY):
+        self.rpm_limit = rpm_limit
+        self._lock     = threading.Lock()
+        self._keys     = {}   # key -> state dict
+        self._clients  = {}   # key -> genai.Client
+
+    def _state(self, key):
+        state = self._keys.get(key)
+        if state is None:
+            state = {
+                'cooldown_until': 0.0,
+                'quota_strikes':  0,
+                'successes':      0,
+                'failures':       0,
+                'last_used':      0.0,
+                'recent':         [],   # request timestamps inside the last 60s
+            }
+            self._keys[key] = state
+        return state
+
+    def _score(self, state):
+        # Laplace-smoothed success rate; new keys start at 0.5
+        return (state['successes'] + 1) / (state['successes'] + state['failures'] + 2)
+
+    def deadline(self):
+        """Absolute deadline for one generation started now."""
+        return time.time() + self.CALL_DEADLINE
+
+    def acquire(self, deadline=None):
+        """
+        Returns the healthiest usable key, waiting if every key is cooling down
+        but one frees up before `deadline` (default: CALL_DEADLINE from now).
+        Raises GeminiKeysUnavailable when none will be usable in time.
+        """
+        if not GEMINI_API_KEYS:
+            raise ValueError("No Gemini API keys configured in config.py")
+        if deadline is None:
+            deadline = self.deadline()
+
+        while True:
+            with self._lock:
+                now = time.time()
+                ready, next_ready = [], None
+                for key in GEMINI_API_KEYS:
+                    state = self._state(key)
+                    state['recent'] = [t for t in state['recent'] if now - t < 60]
+                    available_at = state['cooldown_until']
+                    if self.rpm_limit and len(state['recent']) >= self.rpm_limit:
+                        available_at = max(available_at, state['recent'][0] + 60)
+                    if available_at <= now:
+                        ready.append(key)
+                    elif next_ready is None or available_at < next_ready:
+                        next_ready = available_at
+
+                if ready and now < deadline:
+                    key = max(ready, key=lambda k: (self._score(self._keys[k]), -self._keys[k]['last_used']))
+                    state = self._keys[key]
+                    state['last_used'] = now
+                    state['recent'].append(now)
+                    return key
+
+                if now >= deadline or next_ready is None or next_ready > deadline:
+                    wait = f" for another {next_ready - now:.0f}s" if next_ready else ""
+                    raise GeminiKeysUnavailable(
+                        f"All {len(GEMINI_API_KEYS)} Gemini key(s) cooling down{wait}; "
+                        f"past this call's deadline."
+                    )
+                delay = max(next_ready - now, 0.5)
+
+            print(f"[AI:keys] All {len(GEMINI_API_KEYS)} key(s) cooling down. Waiting {delay:.0f}s...")
+            time.sleep(delay)
+
+    def note_request(self, key):
+        """Counts an extra request made on an already-acquired key (model fallback) against its RPM budget."""
+        with self._lock:
+            self._state(key)['recent'].append(time.time())
+
+    def client(self, key):
+        """Returns the cached genai.Client for `key`."""
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = genai.Client(api_key=key)
+                self._clients[key] = client
+            return client
+
+    def report_success(self, key):
+        with self._lock:
+            state = self._state(key)
+            state['successes']    += 1
+            state['quota_strikes'] = 0
+
+    def report_failure(self, key, error):
+        """Records a failed call. Only quota / transient errors put the key on cooldown."""
+        with self._lock:
+            state = self._state(key)
+            state['failures'] += 1
+            if is_quota_error(error):
+                state['quota_strikes'] += 1
+                wait = _retry_after_seconds(error)
+                if wait is None:
+                    wait = min(self.BASE_COOLDOWN * 2 ** (state['quota_strikes'] - 1), self.MAX_COOLDOWN)
+                state['cooldown_until'] = max(state['cooldown_until'], time.time() + wait)
+                idx = GEMINI_API_KEYS.index(key) + 1 if key in GEMINI_API_KEYS else '?'
+                print(f"[AI:keys] Key {idx}/{len(GEMINI_API_KEYS)} cooling down for {wait:.0f}s.")
+            elif _is_transient_error(error):
+                state['cooldown_until'] = max(state['cooldown_until'], time.time() + 5)
+
+    def snapshot(self):
+        """Per-key health summary (keys masked) for logging / dashboards."""
+        with self._lock:
+            now = time.time()
+            return [
+                {
+                    'key':          f"{key[:8]}…",
+                    'cooldown_s':   max(0, round(self._state(key)['cooldown_until'] - now)),
+                    'successes':    self._state(key)['successes'],
+                    'failures':     self._state(key)['failures'],
+                    'success_rate': round(self._score(self._state(key)), 2),
+                }
+                for key in GEMINI_API_KEYS
+            ]
+
+
+key_scheduler = GeminiKeyScheduler()
+
+
+# ---------------------------------------------------------------------------
+# Model availability cache (which models each key can actually call)
+# ---------------------------------------------------------------------------
+CAPTION_MODELS = ['gemini-2.0-flash', 'gemini-2.5-flash']
+ARTICLE_MODELS = ['gemini-2.5-flash', 'gemini-1.5-flash', 'gemini-1.5-pro', 'gemini-1.0-pro', 'gemini-pro']
+
+
+def is_model_missing_error(error):
+    """True when Gemini says the requested model does not exist for this key."""
+    error_str = str(error).lower()
+    return "404" in error_str or "not found" in error_str
+
+
+class GeminiModelCache:
+    """
+    Persisted record of which Gemini models each API key can use (and which
+    returned 404), so later calls go straight to the first working model.
+
+    Entries are keyed by a SHA-256 prefix of the API key — keys themselves are
+    never written to disk — and expire after GEMINI_MODEL_CACHE_TTL_HOURS.
+    """
+
+    def __init__(self, path, ttl_seconds):
+        self.path  = path
+        self.ttl   = ttl_seconds
+        self._lock = threading.Lock()
+        self._data = None
+
+    @staticmethod
+    def _key_id(api_key):
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+    def _load(self):
+        if self._data is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except (FileNotFoundError, ValueError):
+                self._data = {}
+        return self._data
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[AI:models] Could not persist model cache: {e}")
+
+    def _entry(self, api_key):
+        return self._load().setdefault(self._key_id(api_key), {"working": {}, "missing": {}})
+
+    def _fresh(self, ts):
+        return ts is not None and time.time() - ts < self.ttl
+
+    def order(self, api_key, preferred):
+        """`preferred` reordered: known-working models first, known-404 models dropped."""
+        with self._lock:
+            entry   = self._entry(api_key)
+            working = [m for m in preferred if self._fresh(entry["working"].get(m))]
+            unknown = [m for m in preferred if m not in working and not self._fresh(entry["missing"].get(m))]
+            return working + unknown
+
+    def _mark(self, api_key, model_name, bucket, other):
+        with self._lock:
+            entry = self._entry(api_key)
+            ts = entry[bucket].get(model_name)
+            if ts is not None and time.time() - ts < self.ttl / 2 and model_name not in entry[other]:
+                return  # still fresh — skip the disk write
+            entry[bucket][model_name] = time.time()
+            entry[other].pop(model_name, None)
+            self._save()
+
+    def mark_working(self, api_key, model_name):
+        self._mark(api_key, model_name, "working", "missing")
+
+    def mark_missing(self, api_key, model_name):
+        self._mark(api_key, model_name, "missing", "working")
+
+    def discovered(self, api_key):
+        """Model names found by client.models.list() for this key, if still fresh."""
+        with self._lock:
+            entry = self._entry(api_key)
+            if self._fresh(entry.get("discovered_at")):
+                return entry.get("discovered") or []
+            return None
+
+    def set_discovered(self, api_key, model_names):
+        with self._lock:
+            entry = self._entry(api_key)
+            entry["discovered"]    = list(model_names)
+            entry["discovered_at"] = time.time()
+            self._save()
+
+
+model_cache = GeminiModelCache(
+    os.path.join(CACHE_DIR, "gemini_models.json"),
+    ttl_seconds=GEMINI_MODEL_CACHE_TTL_HOURS * 3600,
+)
+
+
+def _generate_with_models(client, api_key, models, contents, config=None, discover=False):
+    """
+    Calls the first model from `models` this key can use (per model_cache).
+    Quota errors propagate for key rotation; 404s are cached and skipped.
+    With `discover`, a key that has none of `models` falls back to the best
+    model it lists (the listing is cached per key).
+    Returns (response, model_name).
+    """
+    last_error = None
+    calls = 0
+    for model_name in model_cache.order(api_key, models):
+        if calls:
+            key_scheduler.note_request(api_key)   # acquire() only counted the first call
+        calls += 1
+        try:
+            response = client.models.generate_content(model=model_name, contents=contents, config=config)
+            model_cache.mark_working(api_key, model_name)
+            return response, model_name
+        except Exception as err:
+            if not is_quota_error(err) and is_model_missing_error(err):
+                model_cache.mark_missing(api_key, model_name)
+                last_error = err
+                continue
+            raise
+
+    if discover:
+        valid_models = model_cache.discovered(api_key)
+        if valid_models is None:
+            print("[AI] Standard models failed. Auto-discovering available models...")
+            all_models   = list(client.models.list())
+            valid_models = [m.name for m in all_models if hasattr(m, 'supported_generation_methods') and 'generateContent' in m.supported_generation_methods or 'gemini' in m.name.lower()]
+            model_cache.set_discovered(api_key, valid_models)
+        if valid_models:
+            best_model = next((m for m in valid_models if 'flash' in m), valid_models[0])
+            print(f"[AI] Auto-selected: {best_model}")
+            if calls:
+                key_scheduler.note_request(api_key)
+            return client.models.generate_content(model=best_model, contents=contents, config=config), best_model
+        print("[AI] No valid models found on this key.")
+    raise last_error or ValueError("No usable Gemini model cached for this key.")
 
-# API Key Rotation System (Similar to ScrapingAnt)
-_current_key_index = 0  # Track current API key index
 
 def get_current_gemini_key():
-    """Returns the current Gemini API key."""
-    if not GEMINI_API_KEYS:
-        raise ValueError("No Gemini API keys configured in config.py")
-    return GEMINI_API_KEYS[_current_key_index]
+    """Returns the healthiest Gemini API key (legacy name, backed by key_scheduler)."""
+    return key_scheduler.acquire()
 
-def switch_to_next_gemini_key():
-    """Switches to the next Gemini API key in rotation."""
-    global _current_key_index
-    _current_key_index = (_current_key_index + 1) % len(GEMINI_API_KEYS)
-    print(f" Switched to Gemini API key {_current_key_index + 1}/{len(GEMINI_API_KEYS)}")
+def switch_to_next_gemini_key(failed_key=None):
+    """Legacy hook: treats `failed_key` as quota-exhausted so the scheduler skips it."""
+    if failed_key is not None:
+        key_scheduler.report_failure(failed_key, "429 quota exceeded")
 
 def is_quota_error(error):
     """
@@ -45,8 +403,8 @@ def is_quota_error(error):
     return any(indicator in error_str for indicator in quota_indicators)
 
 def get_gemini_model(api_key):
-    """Creates and returns a Gemini model instance with the given API key."""
-    return genai.Client(api_key=api_key)
+    """Returns the pooled Gemini client for the given API key."""
+    return key_scheduler.client(api_key)
 
 def find_review_video(product_name):
     """Searches YouTube for a review video and returns an embed code."""
@@ -85,23 +443,16 @@ def find_review_video(product_name):
     print(" Attempting Fallback Video Search via ScrapingAnt...")
     search_url = f"https://www.youtube.com/results?search_query={product_name.replace(' ', '+')}+review"
     
-    for api_key in SCRAPINGANT_API_KEYS:
-        try:
-             response = requests.get(
-                "https://api.scrapingant.com/v2/general",
-                params={'url': search_url, 'browser': 'false'}, # youtube results usually minimal js needed for first hit? or true? use true to be safe
-                headers={'x-api-key': api_key},
-                timeout=40
-            )
-             if response.status_code == 200:
-                 html = response.text
-                 # Find video ID: /watch?v=VIDEO_ID
-                 # Regex for video ID (11 chars)
-                 match = re.search(r'/watch\?v=([a-zA-Z0-9_-]{11})', html)
-                 if match:
-                     video_id = match.group(1)
-                     title = f"{product_name} Review" # Fallback title
-                     embed_code = f'''
+    # youtube results usually need minimal JS for the first hit
+    html = scrapingant_client.fetch(search_url, browser=False, timeout=40)
+    if html:
+        # Find video ID: /watch?v=VIDEO_ID
+        # Regex for video ID (11 chars)
+        match = re.search(r'/watch\?v=([a-zA-Z0-9_-]{11})', html)
+        if match:
+            video_id = match.group(1)
+            title = f"{product_name} Review" # Fallback title
+            embed_code = f'''
                     <div class="video-wrapper" style="margin: 30px 0; border-radius: 12px; overflow: hidden; box-shadow: 0 4px 15px rgba(0,0,0,0.1);">
                         <h3 style="margin-bottom: 15px; font-size: 1.2rem;">📺 Watch: {title}</h3>
                         <div style="position: relative; padding-bottom: 56.25%; height: 0; overflow: hidden;">
@@ -114,21 +465,21 @@ def find_review_video(product_name):
                         </div>
                     </div>
                     '''
-                     print(" Fallback Video Found!")
-                     return embed_code
-        except Exception as e:
-            print(f"Fallback key failed: {e}")
-            continue
+            print(" Fallback Video Found!")
+            return embed_code
             
     return ""
 
-def generate_article(product_data, similar_products=None, internal_links=None, language='English', competitor_text=None, affiliate_tag=None, niche_prompt=None):
+# Bump to invalidate every cached AI output (ai_cache) without touching a template
+PROMPT_VERSION = "1"
+
+
+def _build_article_prompt(product_data, similar_products=None, internal_links=None, language='English', competitor_text=None, affiliate_tag=None, structured=False):
     """
-    Generates a Human-Like, GEO (Generative Engine Optimized) article.
+    Builds the full article prompt (system instruction + structure).
+    With `structured=True` the trailing social-JSON instructions are replaced by
+    a note pointing at the response schema used by generate_structured_content().
     """
-    if not product_data:
-        return None, None
-
     title = product_data.get('title', 'Unknown Product')
     price = product_data.get('price', 'N/A')
     rating = product_data.get('rating', 'N/A')
@@ -223,6 +574,18 @@ def generate_article(product_data, similar_products=None, internal_links=None, l
     if article_type == "top10":
         keyword_words = title.split()[:3]
         list_topic = " ".join(keyword_words)
+        social_block = STRUCTURED_ARTICLE_NOTE if structured else f"""
+    ```json
+    {{
+      "pros": ["Dynamic Pro 1 based on review", "Dynamic Pro 2 based on review"],
+      "cons": ["Dynamic Con 1 based on review"],
+      "fb_content": "🔥 TOP 10 {list_topic} RANKED!\\n\\nI've tested dozens. Here's my honest #1 pick: {title}\\n\\n👇 Full list: [post_link]\\n\\n#BestOf2025 #Shopping",
+      "pin_title": "Top 10 Best {list_topic} 2025 — Expert Ranked",
+      "pin_desc": "Looking for the best {list_topic}? We tested 10 options. {title} is our #1 pick. Save this for later! 🛒",
+      "ig_content": "✨ 10 best {list_topic} — ranked by testing!\\n\\n#1: {title}\\n\\n🔗 Full breakdown in bio link!\\n\\n#TopPick #ProductReview #BestOf2025"
+    }}
+    ```
+    """
         prompt = f"""
     Write a complete, HTML-formatted "Top 10 Best {list_topic}" list article in **{language}** language.
     Use this product as the #1 recommendation: **{title}** (Price: {price}, Rating: {rating} stars)
@@ -250,18 +613,28 @@ def generate_article(product_data, similar_products=None, internal_links=None, l
 
     Output raw HTML body only.
 
+    {social_block}
+    """
+    else:
+        social_block = STRUCTURED_ARTICLE_NOTE if structured else f"""
+    **10. 📢 Premium Social Media & Review Bundle (JSON)**
+    - At the VERY END, generate a strictly valid JSON block.
+    - Write the social media copy with the SAME intelligence, depth, and human-like quality as the main article.
+    - Include dynamic pros and cons of the product.
+    - Format exactly like this:
     ```json
     {{
       "pros": ["Dynamic Pro 1 based on review", "Dynamic Pro 2 based on review"],
       "cons": ["Dynamic Con 1 based on review"],
-      "fb_content": "🔥 TOP 10 {list_topic} RANKED!\\n\\nI've tested dozens. Here's my honest #1 pick: {title}\\n\\n👇 Full list: [post_link]\\n\\n#BestOf2025 #Shopping",
-      "pin_title": "Top 10 Best {list_topic} 2025 — Expert Ranked",
-      "pin_desc": "Looking for the best {list_topic}? We tested 10 options. {title} is our #1 pick. Save this for later! 🛒",
-      "ig_content": "✨ 10 best {list_topic} — ranked by testing!\\n\\n#1: {title}\\n\\n🔗 Full breakdown in bio link!\\n\\n#TopPick #ProductReview #BestOf2025"
+      "fb_content": "🔥 [ATTENTION HOOK]\\nStart with a highly relatable, contrarian, or thought-provoking statement that stops the scroll.\\n\\n💬 [BRIDGE/STORY]\\nWrite 2-3 short, punchy paragraphs explaining the core problem and how this product is the ultimate solution. Be authentic, engaging, and smart. Use spacing for readability.\\n\\n👇 [CALL TO ACTION]\\nGive them a clear, irresistible reason to click the link right now.\\n\\n#HighlyRelevant1 #HighlyRelevant2",
+      "pin_title": "Catchy SEO Title for Pinterest (Max 90 chars)",
+      "pin_desc": "Keyword-rich description highlighting the main benefit. Use bullet points. End with strong CTA: 'Save this pin & check the link to grab yours today!' #TargetKeyword1 #TargetKeyword2",
+      "ig_content": "✨ [STORYTELLING HOOK]\\nStart with an engaging micro-story or a bold statement about a lifestyle upgrade.\\n\\n[VALUE DRIVEN BODY]\\nBreak down WHY this product changes the game using bullet points or short, aesthetic paragraphs. Speak directly to their desires and pain points. Keep it visually structured.\\n\\n🔗 [BIO CTA]\\nTell them exactly what to do next: 'Click the LINK IN BIO to check out the {title} and upgrade your setup!'\\n\\n#NicheHashtag1 #NicheHashtag2",
+      "x_content": "🚨 Don't miss out on the {title}! The ultimate solution for [Main Benefit]. \\n\\nCheck out why we recommend it 👇\\n{product_link} \\n\\n#Hashtag1 #Hashtag2"
     }}
     ```
+    - Ensure this JSON is strictly valid, properly quoted, and completely separated from the HTML above it.
     """
-    else:
         prompt = f"""
     Write a complete, HTML-formatted product review for: **{title}**
     in **{language}** language.
@@ -325,111 +698,72 @@ def generate_article(product_data, similar_products=None, internal_links=None, l
     - Output raw HTML body only (no ```html tags).
     - Use <h2>, <h3>, <p>, <ul>, <li>, <strong>.
 
-    **10. 📢 Premium Social Media & Review Bundle (JSON)**
-    - At the VERY END, generate a strictly valid JSON block.
-    - Write the social media copy with the SAME intelligence, depth, and human-like quality as the main article.
-    - Include dynamic pros and cons of the product.
-    - Format exactly like this:
-    ```json
-    {{
-      "pros": ["Dynamic Pro 1 based on review", "Dynamic Pro 2 based on review"],
-      "cons": ["Dynamic Con 1 based on review"],
-      "fb_content": "🔥 [ATTENTION HOOK]\\nStart with a highly relatable, contrarian, or thought-provoking statement that stops the scroll.\\n\\n💬 [BRIDGE/STORY]\\nWrite 2-3 short, punchy paragraphs explaining the core problem and how this product is the ultimate solution. Be authentic, engaging, and smart. Use spacing for readability.\\n\\n👇 [CALL TO ACTION]\\nGive them a clear, irresistible reason to click the link right now.\\n\\n#HighlyRelevant1 #HighlyRelevant2",
-      "pin_title": "Catchy SEO Title for Pinterest (Max 90 chars)",
-      "pin_desc": "Keyword-rich description highlighting the main benefit. Use bullet points. End with strong CTA: 'Save this pin & check the link to grab yours today!' #TargetKeyword1 #TargetKeyword2",
-      "ig_content": "✨ [STORYTELLING HOOK]\\nStart with an engaging micro-story or a bold statement about a lifestyle upgrade.\\n\\n[VALUE DRIVEN BODY]\\nBreak down WHY this product changes the game using bullet points or short, aesthetic paragraphs. Speak directly to their desires and pain points. Keep it visually structured.\\n\\n🔗 [BIO CTA]\\nTell them exactly what to do next: 'Click the LINK IN BIO to check out the {title} and upgrade your setup!'\\n\\n#NicheHashtag1 #NicheHashtag2",
-      "x_content": "🚨 Don't miss out on the {title}! The ultimate solution for [Main Benefit]. \\n\\nCheck out why we recommend it 👇\\n{product_link} \\n\\n#Hashtag1 #Hashtag2"
-    }}
-    ```
-    - Ensure this JSON is strictly valid, properly quoted, and completely separated from the HTML above it.
+    {social_block}
     """
 
-    api_key = get_current_gemini_key()
-    
+    return system_instruction + "\n\n" + prompt
+
+
+def _prompt_inputs_digest(product_data, similar_products=None, internal_links=None, competitor_text=None):
+    """
+    Digest of the per-call inputs _build_article_prompt() reads (current
+    title/price/rating, comparisons, internal links, competitor text), for
+    the article cache keys — the prompt itself can't be hashed, it picks the
+    article type at random.
+    """
+    inputs = {
+        "product":    {k: product_data.get(k) for k in ('title', 'price', 'rating', 'review_count', 'product_url')},
+        "similar":    similar_products,
+        "links":      internal_links,
+        "competitor": competitor_text,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def generate_article(product_data, similar_products=None, internal_links=None, language='English', competitor_text=None, affiliate_tag=None, niche_prompt=None):
+    """
+    Generates a Human-Like, GEO (Generative Engine Optimized) article.
+    """
+    if not product_data:
+        return None, None
+
+    cache_key = ai_cache.make_key(
+        "article", product_data.get('asin'), language, niche_prompt,
+        template=template_hash(PROMPT_VERSION, _build_article_prompt, clean_fluff),
+        affiliate_tag=affiliate_tag,
+        inputs=_prompt_inputs_digest(product_data, similar_products, internal_links, competitor_text),
+    )
+    cached = ai_cache.get(cache_key)
+    if cached:
+        print("[AI:cache] ♻️ Article reused from cache (0 Gemini calls).")
+        return cached["content"], cached["social_data"]
+
+    final_prompt = _build_article_prompt(
+        product_data, similar_products, internal_links,
+        language=language, competitor_text=competitor_text, affiliate_tag=affiliate_tag,
+    )
+
     # Retry Logic for Quota (Try all keys if needed)
     max_attempts = len(GEMINI_API_KEYS) * 2
+    deadline = key_scheduler.deadline()
 
     for attempt in range(max_attempts):
-        current_key = get_current_gemini_key()
+        try:
+            current_key = key_scheduler.acquire(deadline)
+        except GeminiKeysUnavailable as e:
+            print(f"[AI] ⏳ {e}")
+            break
         
         try:
-            final_prompt = system_instruction + "\n\n" + prompt
-            client = genai.Client(api_key=current_key)
-            
-            response   = None
-            last_error = None
-            
-            # --- Try preferred models in order ---
-            preferred_models = [
-                'gemini-2.5-flash',
-                'gemini-1.5-flash',
-                'gemini-1.5-pro',
-                'gemini-1.0-pro',
-                'gemini-pro',
-            ]
-            
-            FLUFF_WORDS   = ["unleash", "unlock", "realm", "landscape", "tapestry",
-                             "symphony", "game-changer", "delve", "dive deep",
-                             "bustling", "vibrant", "meticulous", "paramount", "elevate",
-                             "testament", "not only", "in conclusion", "last but not least",
-                             "when it comes to", "it is important to remember", "ultimately"]
-            MAX_FLUFF_RETRIES = 3
-
-            for model_name in preferred_models:
-                try:
-                    # Fluff-check validation loop
-                    for fluff_attempt in range(MAX_FLUFF_RETRIES):
-                        r = client.models.generate_content(
-                            model=model_name,
-                            contents=final_prompt
-                        )
-                        if r and r.text:
-                            found_fluff = [w for w in FLUFF_WORDS if w in r.text.lower()]
-                            if not found_fluff:
-                                print(f"[AI] Model: {model_name} | Fluff check passed (attempt {fluff_attempt+1})")
-                                response = r
-                                break
-                            else:
-                                print(f"[AI] Fluff detected: {found_fluff}. Retry {fluff_attempt+1}/{MAX_FLUFF_RETRIES}...")
-                                if fluff_attempt == MAX_FLUFF_RETRIES - 1:
-                                    print(f"[AI] Fluff retry limit hit for {model_name}. Accepting anyway.")
-                                    response = r
-                        else:
-                            break
-
-                    if response:
-                        break  # Got a valid response — stop trying other models
-
-                except Exception as model_err:
-                    if is_quota_error(model_err):
-                        raise model_err  # Let outer loop handle key rotation
-                    if "404" in str(model_err) or "not found" in str(model_err).lower():
-                        continue       # Model not available — try next
-                    last_error = model_err
-                    continue
-
-            # --- Fallback: auto-discover available models ---
-            if not response:
-                print("[AI] Standard models failed. Auto-discovering available models...")
-                try:
-                    all_models   = list(client.models.list())
-                    valid_models = [m.name for m in all_models if hasattr(m, 'supported_generation_methods') and 'generateContent' in m.supported_generation_methods or 'gemini' in m.name.lower()]
-                    if valid_models:
-                        best_model = next((m for m in valid_models if 'flash' in m), valid_models[0])
-                        print(f"[AI] Auto-selected: {best_model}")
-                        response = client.models.generate_content(
-                            model=best_model,
-                            contents=final_prompt
-                        )
-                    else:
-                        print("[AI] No valid models found on this key.")
-                        if last_error:
-                            raise last_error
-                except Exception as disc_err:
-                    raise disc_err
+            client = key_scheduler.client(current_key)
+            # One generation per key — fluff is cleaned after parsing
+            response, model_name = _generate_with_models(
+                client, current_key, ARTICLE_MODELS, final_prompt, discover=True,
+            )
 
             # --- Parse and return successful response ---
             if response and response.text:
+                print(f"[AI] Model: {model_name}")
                 content     = response.text
                 social_data = {}
 
@@ -483,39 +817,82 @@ def generate_article(product_data, similar_products=None, internal_links=None, l
                 content = re.sub(r'```\s*', '', content)
                 content = content.strip('`').strip()
 
+                key_scheduler.report_success(current_key)
+                content = clean_fluff(content, rewrite=lambda sentences: rewrite_fluff_sentences(sentences, language, deadline))
+                ai_cache.put(cache_key, {"content": content, "social_data": social_data}, kind="article")
                 return content, social_data
 
 
-            # If we get here, no response was obtained
+            # If we get here, the model returned no text
             print(f"[AI] Attempt {attempt+1}: No response obtained.")
-            if last_error:
-                raise last_error
 
         except Exception as e:
+            key_scheduler.report_failure(current_key, e)
             if is_quota_error(e):
                 print(f"[AI] Quota exceeded. Switching API key...")
-                switch_to_next_gemini_key()
-                time.sleep(2)
             else:
                 print(f"[AI] Error on attempt {attempt+1}: {e}")
-                switch_to_next_gemini_key()
 
     print("[AI] All API keys and retries exhausted. Returning None.")
     return None, None
 
 
-def generate_social_captions(title: str, brand: str, amazon_url: str, review_url: str, niche_prompt: str = None) -> dict:
-    """
-    Uses Gemini to generate highly-optimized, platform-specific social media captions.
-    Returns a dict with keys: fb_content, ig_content, pin_title, pin_desc, linkedin_content
-    """
-    FALLBACK = {
+
+def _fallback_captions(title, brand, review_url):
+    """Template captions used when Gemini cannot produce platform copy."""
+    return {
         "fb_content": f"🔥 {title}\n\n💰 Best price on Amazon!\n✅ Full Review → {review_url}\n\n#ProductReview #Amazon #BestDeals",
         "ig_content": f"🔥 {title}\n\n💰 Best price on Amazon!\n✅ Full review — link in bio\n\n#ProductReview #Amazon #BestDeals #Shopping #AffiliateMarketing #MustHave",
         "pin_title": f"{title} - Expert Review",
         "pin_desc": f"{title} — Full Review & Best Price on Amazon! Click to read the complete review! {review_url}\n\n#ProductReview #Amazon #BestDeals #Shopping",
         "linkedin_content": f"🔎 Just published a detailed review of the {brand} — {title}\n\nGreat value for money! Check it out → {review_url}\n\n#ProductReview #Amazon #Deals",
     }
+
+
+def _fallback_faqs(brand, model_number):
+    """Generic FAQ pairs used when Gemini cannot produce product FAQs."""
+    return [
+        {"question": f"Is the {brand} {model_number} worth buying?", "answer": f"Yes, the {brand} {model_number} offers excellent value for money. It combines durability, style, and functionality at an affordable price point, making it a top choice for budget-conscious buyers."},
+        {"question": f"What are the best features of the {brand} {model_number}?", "answer": f"The {brand} {model_number} comes with excellent build quality and reliable performance. We recommend checking the specific features in our full review above for exact specifications."},
+        {"question": f"How long does the {brand} {model_number} last?", "answer": f"Lifespan varies by usage. In standard mode, the {brand} {model_number} offers excellent long-term performance. Refer to the specs table in our review for exact details."},
+        {"question": f"Where can I buy the {brand} {model_number} at the best price?", "answer": f"The best price for the {brand} {model_number} is usually found on Amazon. We recommend checking our affiliate link above for the latest pricing and any available discounts."},
+        {"question": f"What is the warranty on the {brand} {model_number}?", "answer": f"Warranty terms vary by seller. We recommend purchasing from Amazon's fulfilled listings for the best buyer protection and return policy."},
+        {"question": f"How does the {brand} {model_number} compare to competitors?", "answer": f"The {brand} {model_number} stands out from competitors in its price range by offering a combination of durability, features, and brand reliability. See our detailed comparison in the review above."},
+    ]
+
+
+def _validate_faqs(faqs):
+    """Keeps well-formed {question, answer} items. Raises ValueError if fewer than 3 remain."""
+    if not isinstance(faqs, list) or len(faqs) < 3:
+        raise ValueError("Invalid FAQ list structure.")
+
+    # Validate each item
+    validated = []
+    for item in faqs:
+        if isinstance(item, dict) and item.get('question') and item.get('answer'):
+            validated.append({"question": item['question'], "answer": item['answer']})
+
+    if len(validated) < 3:
+        raise ValueError("Not enough valid FAQ items.")
+    return validated
+
+
+def generate_social_captions(title: str, brand: str, amazon_url: str, review_url: str, niche_prompt: str = None) -> dict:
+    """
+    Uses Gemini to generate highly-optimized, platform-specific social media captions.
+    Returns a dict with keys: fb_content, ig_content, pin_title, pin_desc, linkedin_content
+    """
+    FALLBACK = _fallback_captions(title, brand, review_url)
+
+    cache_key = ai_cache.make_key(
+        "captions", extract_asin(amazon_url or ""), niche_prompt=niche_prompt,
+        template=template_hash(PROMPT_VERSION, generate_social_captions),
+        title=title, amazon_url=amazon_url, review_url=review_url,
+    )
+    cached = ai_cache.get(cache_key)
+    if cached:
+        print("[AI:cache] ♻️ Social captions reused from cache.")
+        return cached
     
     niche_desc = f"reviewing {niche_prompt}" if niche_prompt else "reviewing best products and gear"
 
@@ -537,14 +914,16 @@ Return ONLY a valid JSON object (no markdown, no extra text) with these exact ke
 }}"""
 
     max_attempts = len(GEMINI_API_KEYS) * 2
+    deadline = key_scheduler.deadline()
     for attempt in range(max_attempts):
         try:
-            api_key = get_current_gemini_key()
+            api_key = key_scheduler.acquire(deadline)
+        except GeminiKeysUnavailable as e:
+            print(f"[AI:social] ⏳ {e}")
+            break
+        try:
             client = get_gemini_model(api_key)
-            response = client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt,
-            )
+            response, _ = _generate_with_models(client, api_key, CAPTION_MODELS, prompt)
             raw = response.text.strip()
             raw = re.sub(r'```(?:json)?\s*', '', raw)
             raw = re.sub(r'```\s*', '', raw).strip()
@@ -559,18 +938,17 @@ Return ONLY a valid JSON object (no markdown, no extra text) with these exact ke
                 if key not in captions or not captions[key]:
                     captions[key] = FALLBACK[key]
 
+            key_scheduler.report_success(api_key)
+            ai_cache.put(cache_key, captions, kind="captions")
             print("[AI] ✅ Platform-specific social captions generated.")
             return captions
 
         except Exception as e:
+            key_scheduler.report_failure(api_key, e)
             if is_quota_error(e):
                 print(f"[AI:social] Quota exceeded (attempt {attempt+1}). Switching key...")
-                switch_to_next_gemini_key()
-                time.sleep(2)
             else:
-                print(f"[AI:social] Error (attempt {attempt+1}): {e}. Switching key...")
-                switch_to_next_gemini_key()
-                time.sleep(1)
+                print(f"[AI:social] Error (attempt {attempt+1}): {e}. Retrying...")
 
     print("[AI:social] All retries exhausted. Using fallback captions.")
     return FALLBACK
@@ -582,14 +960,17 @@ def generate_faqs(title: str, brand: str, model_number: str, niche_prompt: str =
     Returns a list of {"question": ..., "answer": ...} dicts.
     Targets Google's "People Also Ask" rich snippets.
     """
-    FALLBACK = [
-        {"question": f"Is the {brand} {model_number} worth buying?", "answer": f"Yes, the {brand} {model_number} offers excellent value for money. It combines durability, style, and functionality at an affordable price point, making it a top choice for budget-conscious buyers."},
-        {"question": f"What are the best features of the {brand} {model_number}?", "answer": f"The {brand} {model_number} comes with excellent build quality and reliable performance. We recommend checking the specific features in our full review above for exact specifications."},
-        {"question": f"How long does the {brand} {model_number} last?", "answer": f"Lifespan varies by usage. In standard mode, the {brand} {model_number} offers excellent long-term performance. Refer to the specs table in our review for exact details."},
-        {"question": f"Where can I buy the {brand} {model_number} at the best price?", "answer": f"The best price for the {brand} {model_number} is usually found on Amazon. We recommend checking our affiliate link above for the latest pricing and any available discounts."},
-        {"question": f"What is the warranty on the {brand} {model_number}?", "answer": f"Warranty terms vary by seller. We recommend purchasing from Amazon's fulfilled listings for the best buyer protection and return policy."},
-        {"question": f"How does the {brand} {model_number} compare to competitors?", "answer": f"The {brand} {model_number} stands out from competitors in its price range by offering a combination of durability, features, and brand reliability. See our detailed comparison in the review above."},
-    ]
+    FALLBACK = _fallback_faqs(brand, model_number)
+
+    cache_key = ai_cache.make_key(
+        "faqs", model_number, niche_prompt=niche_prompt,
+        template=template_hash(PROMPT_VERSION, generate_faqs),
+        title=title,
+    )
+    cached = ai_cache.get(cache_key)
+    if cached:
+        print("[AI:cache] ♻️ FAQs reused from cache.")
+        return cached
     
     niche_desc = f"that focuses on {niche_prompt}" if niche_prompt else "that focuses on high quality products"
 
@@ -618,14 +999,16 @@ Return ONLY a valid JSON array (no markdown, no extra text):
 ]"""
 
     max_attempts = len(GEMINI_API_KEYS) * 2
+    deadline = key_scheduler.deadline()
     for attempt in range(max_attempts):
         try:
-            api_key = get_current_gemini_key()
+            api_key = key_scheduler.acquire(deadline)
+        except GeminiKeysUnavailable as e:
+            print(f"[AI:faq] ⏳ {e}")
+            break
+        try:
             client = get_gemini_model(api_key)
-            response = client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt,
-            )
+            response, _ = _generate_with_models(client, api_key, CAPTION_MODELS, prompt)
             raw = response.text.strip()
             raw = re.sub(r'```(?:json)?\s*', '', raw)
             raw = re.sub(r'```\s*', '', raw).strip()
@@ -635,31 +1018,302 @@ Return ONLY a valid JSON array (no markdown, no extra text):
             if start == -1 or end == 0:
                 raise ValueError("No JSON array found.")
 
-            faqs = json.loads(raw[start:end])
-            if not isinstance(faqs, list) or len(faqs) < 3:
-                raise ValueError("Invalid FAQ list structure.")
-
-            # Validate each item
-            validated = []
-            for item in faqs:
-                if isinstance(item, dict) and item.get('question') and item.get('answer'):
-                    validated.append({"question": item['question'], "answer": item['answer']})
-
-            if len(validated) < 3:
-                raise ValueError("Not enough valid FAQ items.")
+            validated = _validate_faqs(json.loads(raw[start:end]))
 
+            key_scheduler.report_success(api_key)
+            ai_cache.put(cache_key, validated, kind="faqs")
             print(f"[AI] FAQ generated: {len(validated)} questions.")
             return validated
 
         except Exception as e:
+            key_scheduler.report_failure(api_key, e)
             if is_quota_error(e):
                 print(f"[AI:faq] Quota exceeded (attempt {attempt+1}). Switching key...")
-                switch_to_next_gemini_key()
-                time.sleep(2)
             else:
-                print(f"[AI:faq] Error (attempt {attempt+1}): {e}. Switching key...")
-                switch_to_next_gemini_key()
-                time.sleep(1)
+                print(f"[AI:faq] Error (attempt {attempt+1}): {e}. Retrying...")
 
     print("[AI:faq] All retries exhausted. Using fallback FAQs.")
     return FALLBACK
+
+
+def rewrite_fluff_sentences(sentences: list, language: str = 'English', deadline=None) -> list:
+    """
+    Rewrites the few sentences fluff_filter could not fix locally, in one small
+    Gemini call (instead of regenerating the whole article), keeping them in
+    the article's `language`. `deadline` is the calling generation's: once
+    no key is free before it, the rewrite is skipped rather than waited for.
+    Returns a list of the same length; raises on failure so the caller keeps the originals.
+    """
+    numbered = "\n".join(f"{i+1}. {s}" for i, s in enumerate(sentences))
+    prompt = f"""Rewrite each sentence below in plain, direct {language}. Keep the meaning, facts, numbers and product names.
+Words like "landscape", "unlock" or "elevate" may be literal (landscape mode, unlock the phone, elevated stand): keep that meaning in plain words.
+Never use these words or phrases: "not only", "unleash", "realm", "landscape", "delve", "elevate", "ultimately".
+Do not add HTML.
+
+{numbered}
+
+Return ONLY a valid JSON array of {len(sentences)} strings, in the same order."""
+
+    # GeminiKeysUnavailable propagates: clean_fluff then skips the rewrite
+    api_key = key_scheduler.acquire(deadline)
+    try:
+        client = get_gemini_model(api_key)
+        response, _ = _generate_with_models(client, api_key, CAPTION_MODELS, prompt)
+        raw = re.sub(r'```(?:json)?\s*', '', response.text.strip())
+        raw = re.sub(r'```\s*', '', raw).strip()
+        rewritten = json.loads(raw[raw.find('['):raw.rfind(']') + 1])
+        if not isinstance(rewritten, list) or len(rewritten) != len(sentences):
+            raise ValueError("Rewrite count mismatch.")
+        key_scheduler.report_success(api_key)
+        return [str(item) for item in rewritten]
+    except Exception as e:
+        key_scheduler.report_failure(api_key, e)
+        raise
+
+
+
+# ---------------------------------------------------------------------------
+# Single-call structured generation (article + captions + FAQs in one request)
+# ---------------------------------------------------------------------------
+STRUCTURED_MODELS = ['gemini-2.5-flash', 'gemini-2.0-flash']
+
+SOCIAL_KEYS = ["fb_content", "ig_content", "pin_title", "pin_desc", "linkedin_content", "x_content"]
+
+STRUCTURED_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "article_html":     {"type": "STRING"},
+        "pros":             {"type": "ARRAY", "items": {"type": "STRING"}},
+        "cons":             {"type": "ARRAY", "items": {"type": "STRING"}},
+        "fb_content":       {"type": "STRING"},
+        "ig_content":       {"type": "STRING"},
+        "pin_title":        {"type": "STRING"},
+        "pin_desc":         {"type": "STRING"},
+        "linkedin_content": {"type": "STRING"},
+        "x_content":        {"type": "STRING"},
+        "faqs": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "question": {"type": "STRING"},
+                    "answer":   {"type": "STRING"},
+                },
+                "required": ["question", "answer"],
+            },
+        },
+    },
+    "required": ["article_html", "pros", "cons", "fb_content", "ig_content",
+                 "pin_title", "pin_desc", "linkedin_content", "faqs"],
+    "property_ordering": ["article_html", "pros", "cons", "fb_content", "ig_content",
+                          "pin_title", "pin_desc", "linkedin_content", "x_content", "faqs"],
+}
+
+STRUCTURED_ARTICLE_NOTE = """
+    **📦 Structured Output (JSON — single response)**
+    - Return ONE JSON object that follows the response schema. No markdown fences, no text outside the JSON.
+    - `article_html`: the complete HTML article body following the STRUCTURE above — every section it lists, CTA buttons and video block included. Nothing else goes into this field.
+    - `pros` / `cons`: 2-4 short, dynamic items based on your review.
+    - `fb_content`: Conversational, engaging Facebook post. 2-3 short paragraphs. Emojis. End with a CTA to click the review link. 3-5 relevant hashtags.
+    - `ig_content`: Visual, emoji-rich Instagram caption with line breaks. 15-20 hashtags. End with 'Link in bio!'. Do NOT include any URL.
+    - `pin_title`: SEO-friendly Pinterest pin title under 100 characters. Focus on value/benefit.
+    - `pin_desc`: Pinterest description under 500 characters. Include the review link naturally. 5-8 hashtags.
+    - `linkedin_content`: Professional, value-driven LinkedIn post. 2-3 paragraphs. Value-for-money angle. Include the review link. 3-5 professional hashtags.
+    - `x_content`: One punchy post under 280 characters with 2 hashtags.
+    - `faqs`: exactly 6 {question, answer} pairs real customers search on Google. Answers are 2-3 conversational sentences, never mention specific prices, and encourage reading the full review.
+    """
+
+
+def _parse_structured_response(raw, title, brand, review_url, model_number, language='English', deadline=None):
+    """
+    Validates a structured JSON response against what the pipeline needs.
+    Returns (article_content, social_data, faqs); raises ValueError if unusable.
+    """
+    raw = re.sub(r'```(?:json)?\s*', '', raw.strip())
+    raw = re.sub(r'```\s*', '', raw).strip()
+    data = json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError("Structured response is not a JSON object.")
+
+    content = re.sub(r'```(?:html)?\s*', '', (data.get('article_html') or '')).strip('`').strip()
+    if len(content) < 500 or '<' not in content:
+        raise ValueError("article_html missing or too short.")
+
+    faqs    = _validate_faqs(data.get('faqs'))
+    content = clean_fluff(content, rewrite=lambda sentences: rewrite_fluff_sentences(sentences, language, deadline))
+
+    fallback    = _fallback_captions(title, brand, review_url)
+    social_data = {}
+    for key in SOCIAL_KEYS:
+        value = data.get(key)
+        if isinstance(value, str) and value.strip():
+            social_data[key] = value.strip()
+        elif key in fallback:
+            social_data[key] = fallback[key]
+    for key in ('pros', 'cons'):
+        items = [str(item).strip() for item in (data.get(key) or []) if str(item).strip()]
+        if items:
+            social_data[key] = items
+
+    return content, social_data, faqs
+
+
+def generate_structured_content(product_data, similar_products=None, internal_links=None, language='English',
+                                competitor_text=None, affiliate_tag=None, niche_prompt=None, review_url=None):
+    """
+    Generates article HTML, pros/cons, all platform captions and 6 FAQs with ONE
+    schema-constrained Gemini request (JSON mode) instead of three round trips.
+
+    Returns:
+        (article_content, social_data, faqs) — same shapes as generate_content_bundle(),
+        or (None, None, None) if every key/model failed validation.
+    """
+    if not product_data:
+        return None, None, None
+
+    title        = product_data.get('title', '')
+    brand_name   = title.split(' ')[0] if title else 'Brand'
+    model_number = product_data.get('asin', '')
+    review_url   = review_url or product_data.get('product_url', '')
+    niche_desc   = f"reviewing {niche_prompt}" if niche_prompt else "reviewing best products and gear"
+
+    cache_key = ai_cache.make_key(
+        "structured", model_number, language, niche_prompt,
+        template=template_hash(PROMPT_VERSION, _build_article_prompt, generate_structured_content,
+                               STRUCTURED_RESPONSE_SCHEMA, STRUCTURED_ARTICLE_NOTE, clean_fluff),
+        affiliate_tag=affiliate_tag, review_url=review_url,
+        inputs=_prompt_inputs_digest(product_data, similar_products, internal_links, competitor_text),
+    )
+    cached = ai_cache.get(cache_key)
+    if cached:
+        print("[AI:cache] ♻️ Structured bundle reused from cache (0 Gemini calls).")
+        return cached["content"], cached["social_data"], cached["faqs"]
+
+    final_prompt = _build_article_prompt(
+        product_data, similar_products, internal_links,
+        language=language, competitor_text=competitor_text, affiliate_tag=affiliate_tag,
+        structured=True,
+    )
+    final_prompt += f"""
+
+    **Context for captions & FAQs** (blog "Whit Logic", {niche_desc}):
+    - Brand: {brand_name} | Model: {model_number}
+    - Amazon Link: {product_data.get('product_url', '')}
+    - Review Link: {review_url}
+    """
+
+    gen_config = genai_types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=STRUCTURED_RESPONSE_SCHEMA,
+    )
+
+    max_attempts = len(GEMINI_API_KEYS) * 2
+    deadline = key_scheduler.deadline()
+    for attempt in range(max_attempts):
+        try:
+            api_key = key_scheduler.acquire(deadline)
+        except GeminiKeysUnavailable as e:
+            print(f"[AI:structured] ⏳ {e}")
+            break
+        try:
+            client = get_gemini_model(api_key)
+            response, model_name = _generate_with_models(
+                client, api_key, STRUCTURED_MODELS, final_prompt, config=gen_config,
+            )
+            result = _parse_structured_response(
+                response.text or "", title, brand_name, review_url, model_number, language, deadline,
+            )
+            key_scheduler.report_success(api_key)
+            ai_cache.put(cache_key, {"content": result[0], "social_data": result[1], "faqs": result[2]},
+                         kind="structured")
+            print(f"[AI:structured] ✅ Model: {model_name} | article + captions + {len(result[2])} FAQs in one call.")
+            return result
+
+        except Exception as e:
+            key_scheduler.report_failure(api_key, e)
+            if is_quota_error(e):
+                print(f"[AI:structured] Quota exceeded (attempt {attempt+1}). Switching key...")
+            else:
+                print(f"[AI:structured] Error (attempt {attempt+1}): {e}. Retrying...")
+
+    print("[AI:structured] All retries exhausted.")
+    return None, None, None
+
+
+def generate_content_bundle(product_data, similar_products=None, internal_links=None, language='English',
+                            competitor_text=None, affiliate_tag=None, niche_prompt=None, review_url=None,
+                            mode=None):
+    """
+    Generates the article, platform captions and FAQs for one product.
+
+    mode (default: AI_GENERATION_MODE from config):
+        'structured' — one JSON-mode request via generate_structured_content();
+                       falls back to 'parallel' if it cannot produce valid output.
+        'parallel'   — three independent Gemini calls issued concurrently, so
+                       latency is the slowest call instead of the sum.
+
+    Returns:
+        (article_content, social_data, faqs) — social_data is the article's social
+        JSON block with the dedicated captions merged over it. article_content is
+        None when article generation failed.
+    """
+    if not product_data:
+        return None, None, []
+
+    if (mode or AI_GENERATION_MODE).lower() == 'structured':
+        article_content, social_data, faqs = generate_structured_content(
+            product_data,
+            similar_products,
+            internal_links,
+            language=language,
+            competitor_text=competitor_text,
+            affiliate_tag=affiliate_tag,
+            niche_prompt=niche_prompt,
+            review_url=review_url,
+        )
+        if article_content:
+            return article_content, social_data, faqs
+        print("[AI] Structured mode failed. Falling back to parallel generation...")
+
+    title      = product_data.get('title', '')
+    brand_name = title.split(' ')[0] if title else 'Brand'
+    review_url = review_url or product_data.get('product_url', '')
+
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="gemini") as pool:
+        article_future = pool.submit(
+            generate_article,
+            product_data,
+            similar_products,
+            internal_links,
+            language=language,
+            competitor_text=competitor_text,
+            affiliate_tag=affiliate_tag,
+            niche_prompt=niche_prompt,
+        )
+        captions_future = pool.submit(
+            generate_social_captions,
+            title=title,
+            brand=brand_name,
+            amazon_url=product_data.get('product_url', ''),
+            review_url=review_url,
+            niche_prompt=niche_prompt,
+        )
+        faqs_future = pool.submit(
+            generate_faqs,
+            title=title,
+            brand=brand_name,
+            model_number=product_data.get('asin', ''),
+            niche_prompt=niche_prompt,
+        )
+
+        article_content, social_data = article_future.result()
+        social_captions = captions_future.result()
+        faqs = faqs_future.result()
+
+    # Merge AI captions over any social_data from article generation
+    if social_data and isinstance(social_data, dict):
+        social_data.update(social_captions)
+    else:
+        social_data = social_captions
+
+    return article_content, social_data, faqs
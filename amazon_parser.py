@@ -0,0 +1,328 @@
+"""
+amazon_parser.py
+================
+Fast field extraction from a rendered Amazon product page (1-2 MB of HTML).
+
+The old parser ran ~8 independent `re.search` calls over the whole document,
+several of them `re.DOTALL` + lazy `.*?`, each scanning from byte 0 (and a
+miss scans all of it). Here the product-detail region is located once from
+the title anchor; every other anchor is then found with a bounded C-level
+`str.find` inside that region, and the precompiled pattern for the field
+runs only in a small window after its anchor:
+
+    pattern.search(html, anchor_pos, anchor_pos + WINDOW)
+
+Only the legacy fields (price, rating, image) fall back to a whole-page scan
+when their anchor is not in the region.
+
+Extracted fields: title, price, rating, review_count, image_url, images,
+brand, features (bullet points) and availability.
+
+parse_search_results() does the same for a search results page: one
+front-to-back walk over the result blocks, ranking order kept, ASINs
+de-duplicated with a set and sponsored slots skipped.
+"""
+
+import html as html_lib
+import re
+
+# ---------------------------------------------------------------------------
+# Anchors (searched with str.find) and precompiled in-window patterns
+# ---------------------------------------------------------------------------
+TITLE_ANCHORS = ('id="productTitle"', 'id="title"')
+PRICE_ANCHORS = (                                 # most common layout first
+    'id="corePriceDisplay_desktop_feature_div"',
+    'id="corePrice_feature_div"',
+    'id="apex_desktop"',
+    'id="price_inside_buybox"',
+    'id="priceblock_ourprice"',
+    'id="priceblock_dealprice"',
+)
+
+_TAG_TEXT      = re.compile(r">\s*([^<]+?)\s*<")
+_TITLE_TAG     = re.compile(r"<title[^>]*>([^<]*)</title>")
+_OFFSCREEN     = re.compile(r'class="a-offscreen">\s*([^<]+?)\s*<')
+_ICON_ALT      = re.compile(r'class="a-icon-alt">\s*([^<]+?)\s*<')
+_HIRES         = re.compile(r'"hiRes":"(https?://[^"]+)"')
+_IMG_SRC       = re.compile(r'(?:data-old-hires|src)="(https?://[^"]+)"')
+_BULLET        = re.compile(r'<span class="a-list-item">\s*(.*?)\s*</span>', re.DOTALL)
+_STRIP_TAGS    = re.compile(r"<[^>]+>")
+_SPACES        = re.compile(r"\s+")
+_BRAND_PREFIX  = re.compile(r"^(?:Visit the\s+(.+?)\s+Store|Brand:\s*(.+))$", re.IGNORECASE)
+
+REGION_BEFORE = 150000   # image block / gallery JSON precede the title
+REGION_AFTER  = 200000   # byline, rating, price, bullets, buy box follow it
+SMALL_WINDOW  = 600
+MEDIUM_WINDOW = 4000
+PRICE_WINDOW  = 8000
+LARGE_WINDOW  = 30000
+IMAGE_WINDOW  = 120000
+MAX_IMAGES    = 8
+MAX_FEATURES  = 10
+
+
+def _clean(text):
+    return _SPACES.sub(" ", html_lib.unescape(_STRIP_TAGS.sub(" ", text))).strip()
+
+
+def _anchor(page, anchors, region):
+    """Position of the first anchor present inside `region` (start, end), or -1."""
+    if region is None:
+        return -1
+    for anchor in anchors:
+        pos = page.find(anchor, *region)
+        if pos != -1:
+            return pos
+    return -1
+
+
+def _search_after(pattern, page, anchors, window, region):
+    """pattern.search limited to `window` chars after the first matching anchor."""
+    pos = _anchor(page, anchors, region)
+    if pos == -1:
+        return None
+    return pattern.search(page, pos, pos + window)
+
+
+def _product_region(page):
+    """
+    (title_pos, (start, end)) — the slice of the page holding the product details.
+    Region is None when there is no title anchor (not a product page / bot wall):
+    anchored lookups are skipped and only the legacy whole-page fallbacks run.
+    """
+    title_pos = _anchor(page, TITLE_ANCHORS, (0, len(page)))
+    if title_pos == -1:
+        return -1, None
+    return title_pos, (max(0, title_pos - REGION_BEFORE), min(len(page), title_pos + REGION_AFTER))
+
+
+def _title(page, title_pos):
+    if title_pos != -1:
+        m = _TAG_TEXT.search(page, title_pos, title_pos + MEDIUM_WINDOW)
+        if m:
+            return _clean(m.group(1))
+    head_end = page.find("</head>")
+    m = _TITLE_TAG.search(page, 0, head_end if head_end != -1 else len(page))
+    if m:
+        return _clean(m.group(1)).replace("Amazon.com:", "").replace(" : Clothing, Shoes & Jewelry", "").strip()
+    return None
+
+
+def _price(page, region):
+    m = _search_after(_OFFSCREEN, page, PRICE_ANCHORS, PRICE_WINDOW, region)
+    if not m:
+        m = _OFFSCREEN.search(page)  # same fallback the old parser used
+    return m.group(1) if m else None
+
+
+def _rating(page, region):
+    m = _search_after(_ICON_ALT, page, ('id="acrPopover"', 'id="averageCustomerReviews"'), MEDIUM_WINDOW, region)
+    if not m:
+        m = _ICON_ALT.search(page)
+    return m.group(1) if m else None
+
+
+def _review_count(page, region):
+    m = _search_after(_TAG_TEXT, page, ('id="acrCustomerReviewText"',), SMALL_WINDOW, region)
+    return m.group(1) if m else None
+
+
+def _images(page, region):
+    """Ordered, de-duplicated hi-res gallery images; landing image as fallback."""
+    images, seen = [], set()
+    start = _anchor(page, ("colorImages",), region)
+    if start == -1:
+        start = page.find('"hiRes":"')
+    if start != -1:
+        for m in _HIRES.finditer(page, start, start + IMAGE_WINDOW):
+            url = m.group(1)
+            if url not in seen:
+                seen.add(url)
+                images.append(url)
+                if len(images) >= MAX_IMAGES:
+                    break
+    if not images:
+        for anchor in ('id="landingImage"', 'id="imgBlkFront"'):
+            pos = _anchor(page, (anchor,), region)
+            if pos == -1:
+                pos = page.find(anchor)
+            if pos == -1:
+                continue
+            tag_start = page.rfind("<img", max(0, pos - SMALL_WINDOW), pos)
+            tag_end   = page.find(">", pos)
+            m = _IMG_SRC.search(page, tag_start if tag_start != -1 else pos, tag_end if tag_end != -1 else pos + SMALL_WINDOW)
+            if m:
+                images.append(m.group(1))
+                break
+    return images
+
+
+def _features(page, region):
+    pos = _anchor(page, ('id="feature-bullets"',), region)
+    if pos == -1:
+        return []
+    end = page.find("</ul>", pos, pos + LARGE_WINDOW)
+    end = end if end != -1 else pos + LARGE_WINDOW
+    features = []
+    for m in _BULLET.finditer(page, pos, end):
+        text = _clean(m.group(1))
+        if text:
+            features.append(text)
+            if len(features) >= MAX_FEATURES:
+                break
+    return features
+
+
+def _brand(page, region):
+    m = _search_after(_TAG_TEXT, page, ('id="bylineInfo"',), SMALL_WINDOW, region)
+    if not m:
+        return None
+    text = _clean(m.group(1))
+    prefixed = _BRAND_PREFIX.match(text)
+    if prefixed:
+        text = prefixed.group(1) or prefixed.group(2)
+    return text.strip() or None
+
+
+def _availability(page, region):
+    pos = _anchor(page, ('id="availability"',), region)
+    if pos == -1:
+        return None
+    for m in _TAG_TEXT.finditer(page, pos, pos + MEDIUM_WINDOW):
+        text = _clean(m.group(1))
+        if text:
+            return text
+    return None
+
+
+def parse_product_page(page, asin=None, product_url=None):
+    """
+    Parses a product page into the dict scraper.get_amazon_data() returns.
+    Missing fields fall back to the same defaults the old parser used.
+    """
+    title_pos, region = _product_region(page)
+    images = _images(page, region)
+    return {
+        "asin":         asin,
+        "title":        _title(page, title_pos) or "Unknown Title",
+        "price":        _price(page, region) or "N/A",
+        "rating":       _rating(page, region) or "N/A",
+        "review_count": _review_count(page, region) or "0",
+        "image_url":    images[0] if images else None,
+        "images":       images,
+        "brand":        _brand(page, region),
+        "features":     _features(page, region),
+        "availability": _availability(page, region),
+        "product_url":  product_url,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Search results page
+# ---------------------------------------------------------------------------
+# Each organic result is a <div data-asin="…" data-component-type="s-search-result">;
+# blocks are cut at the next result marker, so every pattern below only ever
+# scans one result (a few KB) and the page is walked once, front to back.
+RESULT_MARKER   = 'data-component-type="s-search-result"'
+SPONSORED_HINTS = ("AdHolder", "s-sponsored-label", "puis-sponsored-label", ">Sponsored<", "sp_atf", "sp_mtf", "sp_btf")
+
+_DATA_ASIN    = re.compile(r'data-asin="([A-Z0-9]{10})"')
+_RESULT_LINK  = re.compile(r'href="(/[^"?#]*/dp/([A-Z0-9]{10}))')
+_DP_LINK      = re.compile(r'href="(/[^"/]+/dp/([A-Z0-9]{10}))')
+_H2_TITLE     = re.compile(r"<h2[^>]*>(.*?)</h2>", re.DOTALL)
+_H2_ARIA      = re.compile(r'<h2[^>]*aria-label="([^"]+)"')
+_RESULT_IMAGE = re.compile(r'class="s-image"[^>]*?src="([^"]+)"|src="([^"]+)"[^>]*?class="s-image"')
+_RATING_COUNT = re.compile(r'aria-label="([\d,.]+[KkMm]?)(?:\s+ratings?)?"')
+_IMAGE_SIZE   = re.compile(r"\._[^/]*?_\.(jpe?g|png|webp)$", re.IGNORECASE)
+
+
+def full_size_image(url):
+    """Strips Amazon's resize modifier (`._AC_UL320_`) to get the original image."""
+    return _IMAGE_SIZE.sub(r".\1", url) if url else url
+
+
+def _result_blocks(page):
+    """Yields (div_start, block_end) for every result block, in page order."""
+    pos = page.find(RESULT_MARKER)
+    while pos != -1:
+        start = page.rfind("<div", 0, pos)
+        nxt = page.find(RESULT_MARKER, pos + len(RESULT_MARKER))
+        if nxt == -1:
+            end = len(page)
+        else:
+            end = page.rfind("<div", pos, nxt)  # opening tag of the next result
+            if end == -1:
+                end = nxt
+        yield (start if start != -1 else pos), end
+        pos = nxt
+
+
+def _parse_result(page, start, end):
+    tag_end = page.find(">", start, end)
+    m = _DATA_ASIN.search(page, start, tag_end if tag_end != -1 else end)
+    link = _RESULT_LINK.search(page, start, end)
+    asin = m.group(1) if m else (link.group(2) if link else None)
+    if not asin:
+        return None
+
+    block = page[start:end]
+    title_m = _H2_TITLE.search(block)
+    title = _clean(title_m.group(1)) if title_m else None
+    if not title:
+        aria = _H2_ARIA.search(block)
+        title = _clean(aria.group(1)) if aria else None
+
+    price  = _OFFSCREEN.search(block)
+    rating = _ICON_ALT.search(block)
+    count  = _RATING_COUNT.search(block, rating.end()) if rating else None
+    image  = _RESULT_IMAGE.search(block)
+    path   = link.group(1) if link and link.group(2) == asin else f"/dp/{asin}"
+
+    return {
+        "asin":         asin,
+        "title":        title,
+        "price":        price.group(1) if price else None,
+        "rating":       rating.group(1) if rating else None,
+        "review_count": count.group(1) if count else None,
+        "image_url":    full_size_image(image.group(1) or image.group(2)) if image else None,
+        "product_url":  f"https://www.amazon.com{path}",
+        "sponsored":    any(hint in block for hint in SPONSORED_HINTS),
+    }
+
+
+def parse_search_results(page, limit=None, include_sponsored=False):
+    """
+    Organic search results in Amazon's ranking order, de-duplicated by ASIN.
+
+    Returns a list of dicts: asin, title, price, rating, review_count,
+    image_url (full size), product_url and position (1-based organic rank).
+    Falls back to bare /dp/ links (ASIN + URL only) if the result markup
+    is not recognised.
+    """
+    results, seen = [], set()
+    for start, end in _result_blocks(page):
+        record = _parse_result(page, start, end)
+        if not record or record["asin"] in seen:
+            continue
+        if record["sponsored"] and not include_sponsored:
+            continue
+        seen.add(record["asin"])
+        record["position"] = len(results) + 1
+        results.append(record)
+        if limit and len(results) >= limit:
+            return results
+
+    if not results:
+        for m in _DP_LINK.finditer(page):
+            asin = m.group(2)
+            if asin in seen:
+                continue
+            seen.add(asin)
+            results.append({
+                "asin": asin, "title": None, "price": None, "rating": None, "review_count": None,
+                "image_url": None, "product_url": f"https://www.amazon.com{m.group(1)}",
+                "sponsored": False, "position": len(results) + 1,
+            })
+            if limit and len(results) >= limit:
+                break
+    return results
@@ -1,4 +1,4 @@
-import requests
+import http_client
 from config import SUPABASE_URL, SUPABASE_KEY
 
 headers = {
@@ -9,7 +9,7 @@ headers = {
 
 def check_products():
     url = f"{SUPABASE_URL}/rest/v1/products?select=asin,title,image_url,post_link&limit=5"
-    r = requests.get(url, headers=headers)
+    r = http_client.get(url, headers=headers)
     import pprint
     pprint.pprint(r.json())
 
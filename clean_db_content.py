@@ -3,7 +3,7 @@ sys.stdout.reconfigure(encoding='utf-8')
 sys.path.insert(0, '.')
 
 from config import SUPABASE_URL, SUPABASE_KEY
-import requests
+import http_client
 
 SOCIAL_KEYS = ['"fb_content"', '"pin_title"', '"ig_content"', '"x_content"']
 
@@ -39,7 +39,7 @@ headers = {
     'Prefer': 'return=representation'
 }
 
-resp = requests.get(
+resp = http_client.get(
     f'{SUPABASE_URL}/rest/v1/Post?select=id,content&limit=200',
     headers=headers
 )
@@ -56,7 +56,7 @@ for post in posts:
     cleaned, changed = clean_social_from_content(content)
     if changed:
         patch_url = f'{SUPABASE_URL}/rest/v1/Post?id=eq.{pid}'
-        r = requests.patch(patch_url, headers=headers, json={'content': cleaned})
+        r = http_client.patch(patch_url, headers=headers, json={'content': cleaned})
         status = 'FIXED' if r.status_code in [200, 204] else f'ERROR({r.status_code}: {r.text[:80]})'
         print(f'[{status}] id={pid}')
         if r.status_code in [200, 204]:
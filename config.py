@@ -9,6 +9,14 @@ load_dotenv()
 _scraping_keys_str = os.getenv("SCRAPINGANT_API_KEYS", "").replace("\n", ",")
 SCRAPINGANT_API_KEYS = [k.strip() for k in _scraping_keys_str.split(",") if k.strip()]
 
+# ScrapingAnt client (scrapingant_client.py): concurrent requests allowed per
+# key by the plan, overall HTTP worker threads, optional credit budget per key
+# per process (0 = unlimited) and how long a key that returned 402 is parked
+SCRAPINGANT_CONCURRENCY_PER_KEY    = int(os.getenv("SCRAPINGANT_CONCURRENCY_PER_KEY", "3"))
+SCRAPINGANT_MAX_PARALLEL           = int(os.getenv("SCRAPINGANT_MAX_PARALLEL", "10"))
+SCRAPINGANT_CREDIT_BUDGET_PER_KEY  = int(os.getenv("SCRAPINGANT_CREDIT_BUDGET_PER_KEY", "0"))
+SCRAPINGANT_EXHAUSTED_COOLDOWN_MIN = float(os.getenv("SCRAPINGANT_EXHAUSTED_COOLDOWN_MIN", "60"))
+
 # Gemini API Keys (Rotation Pool)
 # Gemini API Keys (Rotation Pool)
 # Loaded from .env file (Comma or newline separated)
@@ -60,6 +68,67 @@ GEMINI_API_KEYS = load_multiline_gemini_keys()
 # Legacy single key support (for backward compatibility)
 GEMINI_API_KEY = GEMINI_API_KEYS[0] if GEMINI_API_KEYS else None
 
+# Local cache directory (model availability, AI outputs, scrape results, ...)
+CACHE_DIR = os.getenv("BOT_CACHE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+# How long a "model X works / 404s on key Y" observation stays valid
+GEMINI_MODEL_CACHE_TTL_HOURS = float(os.getenv("GEMINI_MODEL_CACHE_TTL_HOURS", "24"))
+
+# Requests-per-minute budget per Gemini key (free tier flash models allow ~10)
+GEMINI_RPM_PER_KEY = int(os.getenv("GEMINI_RPM_PER_KEY", "10"))
+
+# AI generation mode per product:
+#   "parallel"   -> article, captions and FAQs as 3 concurrent Gemini calls
+#   "structured" -> 1 JSON-mode call returning all three (falls back to parallel)
+AI_GENERATION_MODE = os.getenv("AI_GENERATION_MODE", "parallel").strip().lower()
+
+# On-disk cache of Gemini outputs (see ai_cache.py). TTL 0 disables it.
+AI_CACHE_TTL_HOURS = float(os.getenv("AI_CACHE_TTL_HOURS", "72"))
+AI_CACHE_MAX_MB    = float(os.getenv("AI_CACHE_MAX_MB", "50"))
+
+# Local set of already-published ASINs per site (database.get_published_asins);
+# fully resynced from Supabase after this many hours, extended on every publish
+PUBLISHED_CACHE_TTL_HOURS = float(os.getenv("PUBLISHED_CACHE_TTL_HOURS", "6"))
+
+# Amazon product-page scrape cache (scrape_cache.py): static fields (title,
+# images) vs volatile fields (price, rating). STATIC TTL 0 disables the cache.
+SCRAPE_CACHE_STATIC_TTL_HOURS  = float(os.getenv("SCRAPE_CACHE_STATIC_TTL_HOURS", "168"))
+SCRAPE_CACHE_PRICE_TTL_MINUTES = float(os.getenv("SCRAPE_CACHE_PRICE_TTL_MINUTES", "60"))
+
+# Price tracker (price_tracker.py): ScrapingAnt credits one run may spend
+# (10 per product page), minimum gap between two checks of the same product,
+# and products scraped concurrently per batch (state is saved per batch)
+PRICE_TRACKER_CREDIT_BUDGET     = int(os.getenv("PRICE_TRACKER_CREDIT_BUDGET", "2000"))
+PRICE_TRACKER_MIN_RECHECK_HOURS = float(os.getenv("PRICE_TRACKER_MIN_RECHECK_HOURS", "12"))
+PRICE_TRACKER_BATCH_SIZE        = int(os.getenv("PRICE_TRACKER_BATCH_SIZE", "20"))
+# Rolling window of price history (price_history.py) a deal is judged against
+PRICE_HISTORY_WINDOW_DAYS       = float(os.getenv("PRICE_HISTORY_WINDOW_DAYS", "30"))
+
+# On-disk cache of background-removed product cutouts (image_composer), keyed
+# by source image bytes + segmentation model. 0 disables writing to it.
+CUTOUT_CACHE_MAX_MB = float(os.getenv("CUTOUT_CACHE_MAX_MB", "500"))
+
+# Background-removal model (rembg), loaded on first use; the other known models
+# are tried if it fails. REMBG_THREADS = ONNX Runtime threads (0 = all cores).
+REMBG_MODEL   = os.getenv("REMBG_MODEL", "isnet-general-use").strip()
+REMBG_THREADS = int(os.getenv("REMBG_THREADS", "0"))
+
+# Image rendering in worker processes (render_worker.py). RENDER_WORKERS = pool
+# size (0 = one per core). The bulk re-image scripts always use the pool; the
+# publish pipeline only when RENDER_PROCESS_POOL is on (each worker loads its
+# own rembg model, so this trades memory for throughput).
+RENDER_WORKERS      = int(os.getenv("RENDER_WORKERS", "0"))
+RENDER_PROCESS_POOL = os.getenv("RENDER_PROCESS_POOL", "false").strip().lower() in ("1", "true", "yes")
+
+# Modern encodings uploaded next to the JPEG of the website image, served as
+# <picture> sources (AVIF is skipped when Pillow can't encode it)
+IMAGE_FORMATS = [f.strip().lower() for f in os.getenv("IMAGE_FORMATS", "avif,webp").split(",") if f.strip()]
+
+# Durable per-product job queue (job_queue.py): failed attempts before a job
+# stops being resumed, and how long an unfinished job stays resumable
+JOB_MAX_ATTEMPTS  = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_MAX_AGE_HOURS = float(os.getenv("JOB_MAX_AGE_HOURS", "72"))
+
 # WordPress Credentials
 WP_URL = os.getenv("WP_URL", "")
 WP_USERNAME = os.getenv("WP_USERNAME", "")
@@ -1,9 +1,11 @@
 import os
 import uuid
-import requests
+import http_client
 import random
 import json
-from config import SUPABASE_URL, SUPABASE_KEY
+import threading
+import time
+from config import SUPABASE_URL, SUPABASE_KEY, CACHE_DIR, PUBLISHED_CACHE_TTL_HOURS
 
 
 # ---------------------------------------------------------------------------
@@ -30,7 +32,7 @@ def init_db():
         return
     try:
         url = f"{SUPABASE_URL}/rest/v1/products?select=count&limit=1"
-        response = requests.get(url, headers=get_headers(), timeout=5)
+        response = http_client.get(url, headers=get_headers(), timeout=5)
         if response.status_code == 200:
             print("[OK] Connected to Supabase (REST).")
         else:
@@ -38,6 +40,8 @@ def init_db():
     except Exception as e:
         print(f"[ERROR] Supabase connection error: {e}")
 
+    replay_write_journal()
+
 
 # ---------------------------------------------------------------------------
 # Product operations
@@ -52,9 +56,12 @@ def check_product_status(asin, site_id=None):
     """
     if not SUPABASE_URL:
         return None
+    pending = _pending_product_fields(asin, site_id) or {}
+    if pending.get('is_published'):
+        return 1
     try:
         url = f"{SUPABASE_URL}/rest/v1/products?asin=eq.{asin}&select=is_published" + (f"&site_id=eq.{site_id}" if site_id else "")
-        response = requests.get(url, headers=get_headers(), timeout=10)
+        response = http_client.get(url, headers=get_headers(), timeout=10)
         data = response.json()
         if data and len(data) > 0:
             return 1 if data[0].get('is_published') else 0
@@ -64,25 +71,29 @@ def check_product_status(asin, site_id=None):
         return None
 
 
+def _product_row(data_dict, site_id=None):
+    return {
+        "asin":         data_dict.get('asin'),
+        "title":        data_dict.get('title'),
+        "price":        data_dict.get('price'),
+        "rating":       data_dict.get('rating'),
+        "review_count": data_dict.get('review_count'),
+        "image_url":    data_dict.get('image_url'),
+        "product_url":  data_dict.get('product_url'),
+        "site_id": site_id,
+    }
+
+
 def save_product(data_dict, site_id=None):
     """Saves a new product to the database (Upsert)."""
     if not SUPABASE_URL:
         return
     try:
         url = f"{SUPABASE_URL}/rest/v1/products"
-        data = {
-            "asin":         data_dict.get('asin'),
-            "title":        data_dict.get('title'),
-            "price":        data_dict.get('price'),
-            "rating":       data_dict.get('rating'),
-            "review_count": data_dict.get('review_count'),
-            "image_url":    data_dict.get('image_url'),
-            "product_url":  data_dict.get('product_url'),
-            "site_id": site_id,
-        }
+        data = _product_row(data_dict, site_id)
         headers = get_headers()
         headers["Prefer"] = "resolution=merge-duplicates"
-        response = requests.post(url, headers=headers, json=data, timeout=10)
+        response = http_client.post(url, headers=headers, json=data, timeout=10)
         if response.status_code >= 400:
             print(f"DB Error (save_product): {response.text}")
     except Exception as e:
@@ -95,7 +106,8 @@ def mark_as_published(asin, site_id=None):
         return
     try:
         url = f"{SUPABASE_URL}/rest/v1/products?asin=eq.{asin}" + (f"&site_id=eq.{site_id}" if site_id else "")
-        requests.patch(url, headers=get_headers(), json={'is_published': True})
+        http_client.patch(url, headers=get_headers(), json={'is_published': True})
+        _remember_published(asin, site_id)
     except Exception as e:
         print(f"DB Error (mark_published): {e}")
 
@@ -106,11 +118,418 @@ def update_post_link(asin, post_link, site_id=None):
         return
     try:
         url = f"{SUPABASE_URL}/rest/v1/products?asin=eq.{asin}" + (f"&site_id=eq.{site_id}" if site_id else "")
-        requests.patch(url, headers=get_headers(), json={'post_link': post_link})
+        http_client.patch(url, headers=get_headers(), json={'post_link': post_link})
     except Exception as e:
         print(f"DB Error (update_link): {e}")
 
 
+# ---------------------------------------------------------------------------
+# Write-behind buffer (coalesced product / keyword status writes)
+# ---------------------------------------------------------------------------
+# Per product, main used to POST save_product, then PATCH is_published, then
+# PATCH post_link — three round trips for the same row. Queued writes are
+# merged per (asin, site_id) and sent in bulk by flush_writes() at keyword and
+# cycle boundaries. Every queued write is appended to a local JSONL journal
+# first, so a crash before the flush is replayed by init_db() on the next run.
+WRITE_JOURNAL_PATH = os.path.join(CACHE_DIR, "db_write_journal.jsonl")
+UPSERT_BATCH_SIZE  = 500
+
+_write_lock     = threading.RLock()
+_product_writes = {}   # (asin, site_id) -> merged column values
+_keyword_writes = {}   # site_id -> [keyword, ...] to mark completed
+
+
+def _journal_append(entry):
+    try:
+        os.makedirs(os.path.dirname(WRITE_JOURNAL_PATH), exist_ok=True)
+        with open(WRITE_JOURNAL_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+    except OSError as e:
+        print(f"DB Warning (journal): {e}")
+
+
+def _journal_rewrite():
+    """Replaces the journal with whatever is still buffered (called with _write_lock held)."""
+    try:
+        if not _product_writes and not _keyword_writes:
+            if os.path.exists(WRITE_JOURNAL_PATH):
+                os.remove(WRITE_JOURNAL_PATH)
+            return
+        os.makedirs(os.path.dirname(WRITE_JOURNAL_PATH), exist_ok=True)
+        tmp_path = f"{WRITE_JOURNAL_PATH}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for (asin, site_id), fields in _product_writes.items():
+                f.write(json.dumps({"op": "product", "asin": asin, "site_id": site_id, "fields": fields}) + "\n")
+            for site_id, keywords in _keyword_writes.items():
+                for kw in keywords:
+                    f.write(json.dumps({"op": "keyword", "keyword": kw, "site_id": site_id}) + "\n")
+        os.replace(tmp_path, WRITE_JOURNAL_PATH)
+    except OSError as e:
+        print(f"DB Warning (journal): {e}")
+
+
+def _buffer(entry):
+    if entry["op"] == "product":
+        key = (entry["asin"], entry.get("site_id"))
+        _product_writes.setdefault(key, {}).update(entry["fields"])
+    elif entry["op"] == "keyword":
+        keywords = _keyword_writes.setdefault(entry.get("site_id"), [])
+        if entry["keyword"] not in keywords:
+            keywords.append(entry["keyword"])
+
+
+def _queue(entry):
+    with _write_lock:
+        _journal_append(entry)
+        _buffer(entry)
+
+
+def _pending_product_fields(asin, site_id=None):
+    with _write_lock:
+        fields = _product_writes.get((asin, site_id))
+        return dict(fields) if fields is not None else None
+
+
+def queue_save_product(data_dict, site_id=None):
+    """Buffered save_product(): the row is upserted on the next flush_writes()."""
+    row = _product_row(data_dict, site_id)
+    _queue({"op": "product", "asin": row.pop("asin"), "site_id": row.pop("site_id"), "fields": row})
+
+
+def queue_product_update(asin, site_id=None, **fields):
+    """Buffered PATCH of a products row, e.g. queue_product_update(asin, is_published=True, post_link=url)."""
+    if fields:
+        _queue({"op": "product", "asin": asin, "site_id": site_id, "fields": fields})
+        if fields.get('is_published'):
+            _remember_published(asin, site_id)
+
+
+def queue_keyword_completed(keyword, site_id=None):
+    """Buffered mark_keyword_completed_in_pool()."""
+    _queue({"op": "keyword", "keyword": keyword, "site_id": site_id})
+
+
+def pending_writes():
+    with _write_lock:
+        return len(_product_writes) + sum(len(kws) for kws in _keyword_writes.values())
+
+
+def _in_list(values):
+    """PostgREST `in.(...)` operand with every value double-quoted."""
+    quoted = ['"' + str(v).replace('\\', '\\\\').replace('"', '\\"') + '"' for v in values]
+    return f"in.({','.join(quoted)})"
+
+
+def _flush_products(items):
+    """Sends buffered product rows. Returns the keys that were written."""
+    done = []
+    full_rows, partial = {}, []
+    for key, fields in items:
+        if "title" in fields:
+            # Full rows → bulk upsert, grouped by column set (PostgREST needs uniform keys)
+            row = {"asin": key[0], "site_id": key[1], **fields}
+            full_rows.setdefault(tuple(sorted(row)), []).append((key, row))
+        else:
+            partial.append((key, fields))
+
+    headers = get_headers()
+    headers["Prefer"] = "resolution=merge-duplicates,return=minimal"
+    for group in full_rows.values():
+        for i in range(0, len(group), UPSERT_BATCH_SIZE):
+            chunk = group[i:i + UPSERT_BATCH_SIZE]
+            try:
+                resp = http_client.post(f"{SUPABASE_URL}/rest/v1/products", headers=headers,
+                                        json=[row for _, row in chunk], timeout=15)
+                if resp.status_code >= 400:
+                    print(f"DB Error (flush upsert): {resp.text[:300]}")
+                    continue
+                done.extend(key for key, _ in chunk)
+            except Exception as e:
+                print(f"DB Error (flush upsert): {e}")
+
+    # Status-only updates for rows saved in an earlier run: one merged PATCH each
+    for (asin, site_id), fields in partial:
+        try:
+            url = f"{SUPABASE_URL}/rest/v1/products?asin=eq.{asin}" + (f"&site_id=eq.{site_id}" if site_id else "")
+            resp = http_client.patch(url, headers=get_headers(), json=fields, timeout=10)
+            if resp.status_code >= 400:
+                print(f"DB Error (flush patch {asin}): {resp.text[:300]}")
+                continue
+            done.append((asin, site_id))
+        except Exception as e:
+            print(f"DB Error (flush patch {asin}): {e}")
+    return done
+
+
+def _flush_keywords(items):
+    done = []
+    for site_id, keywords in items:
+        try:
+            params = {"keyword": _in_list(keywords)}
+            if site_id:
+                params["site_id"] = f"eq.{site_id}"
+            resp = http_client.patch(f"{SUPABASE_URL}/rest/v1/keyword_pool", params=params,
+                                     headers=get_headers(), json={"status": "completed"}, timeout=10)
+            if resp.status_code >= 400:
+                print(f"DB Error (flush keywords): {resp.text[:300]}")
+                continue
+            done.append((site_id, keywords))
+        except Exception as e:
+            print(f"DB Error (flush keywords): {e}")
+    return done
+
+
+def flush_writes():
+    """
+    Sends every buffered write to Supabase: product rows as bulk upserts (or
+    one merged PATCH for status-only rows), completed keywords as one PATCH
+    per site. Failed writes stay buffered and journaled for the next flush.
+    Returns the number of rows/keywords written.
+    """
+    if not SUPABASE_URL:
+        return 0
+    with _write_lock:
+        products = [(k, dict(v)) for k, v in _product_writes.items()]
+        keywords = [(k, list(v)) for k, v in _keyword_writes.items()]
+    if not products and not keywords:
+        return 0
+
+    written_products = _flush_products(products)
+    written_keywords = _flush_keywords(keywords)
+
+    with _write_lock:
+        sent = dict(products)
+        for key in written_products:
+            # Drop only what was sent; fields queued meanwhile stay for the next flush
+            current = _product_writes.get(key)
+            if current is not None and current == sent[key]:
+                del _product_writes[key]
+            elif current is not None:
+                for col, val in sent[key].items():
+                    if current.get(col) == val:
+                        current.pop(col)
+                if not current:
+                    del _product_writes[key]
+        for site_id, kws in written_keywords:
+            remaining = [kw for kw in _keyword_writes.get(site_id, []) if kw not in kws]
+            if remaining:
+                _keyword_writes[site_id] = remaining
+            else:
+                _keyword_writes.pop(site_id, None)
+        _journal_rewrite()
+
+    count = len(written_products) + sum(len(kws) for _, kws in written_keywords)
+    print(f"[DB] Flushed {count} buffered write(s)" + (f", {pending_writes()} still pending." if pending_writes() else "."))
+    return count
+
+
+def replay_write_journal():
+    """Reloads writes journaled by a run that crashed before flushing, then flushes them."""
+    try:
+        with open(WRITE_JOURNAL_PATH, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return
+    except OSError as e:
+        print(f"DB Warning (journal): {e}")
+        return
+
+    with _write_lock:
+        for line in lines:
+            try:
+                _buffer(json.loads(line))
+            except (ValueError, KeyError):
+                continue  # torn last line from a crash mid-append
+    if pending_writes():
+        print(f"[DB] Replaying {pending_writes()} journaled write(s) from an interrupted run...")
+        flush_writes()
+
+
+# ---------------------------------------------------------------------------
+# Bulk duplicate pre-check (+ local published-ASIN cache)
+# ---------------------------------------------------------------------------
+# One `asin=in.(...)` query per batch of discovered products instead of one
+# GET each. ASINs already known to be published on a site are kept in a local
+# set (CACHE_DIR/published_asins.json): replaced by a full resync from Supabase every
+# PUBLISHED_CACHE_TTL_HOURS and extended locally whenever we publish, so
+# repeats are filtered before any scrape credit or network call is spent.
+PUBLISHED_CACHE_PATH = os.path.join(CACHE_DIR, "published_asins.json")
+STATUS_BATCH_SIZE    = 100
+_PAGE_SIZE           = 1000
+
+_published_lock  = threading.Lock()
+_published_cache = None   # {site_key: {"synced_at": ts, "asins": set()}}
+
+
+def _site_key(site_id):
+    return str(site_id) if site_id else "_default"
+
+
+def _load_published_cache():
+    global _published_cache
+    if _published_cache is None:
+        try:
+            with open(PUBLISHED_CACHE_PATH, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            _published_cache = {k: {"synced_at": v.get("synced_at", 0), "asins": set(v.get("asins", []))}
+                                for k, v in raw.items()}
+        except (FileNotFoundError, ValueError, OSError):
+            _published_cache = {}
+    return _published_cache
+
+
+def _save_published_cache():
+    try:
+        os.makedirs(os.path.dirname(PUBLISHED_CACHE_PATH), exist_ok=True)
+        tmp_path = f"{PUBLISHED_CACHE_PATH}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({k: {"synced_at": v["synced_at"], "asins": sorted(v["asins"])}
+                       for k, v in _published_cache.items()}, f)
+        os.replace(tmp_path, PUBLISHED_CACHE_PATH)
+    except OSError as e:
+        print(f"DB Warning (published cache): {e}")
+
+
+def _remember_published(asins, site_id=None):
+    """Incremental add (after a publish or a status lookup) — no round trip needed."""
+    if isinstance(asins, str):
+        asins = [asins]
+    with _published_lock:
+        entry = _load_published_cache().setdefault(_site_key(site_id), {"synced_at": 0, "asins": set()})
+        new = set(asins) - entry["asins"]
+        if new:
+            entry["asins"] |= new
+            _save_published_cache()
+
+
+def _fetch_published_asins(site_id=None):
+    """Every published ASIN for a site, paged through PostgREST. None on error."""
+    asins, offset = set(), 0
+    while True:
+        url = (
+            f"{SUPABASE_URL}/rest/v1/products?is_published=eq.true&select=asin&order=asin"
+            f"&limit={_PAGE_SIZE}&offset={offset}" + (f"&site_id=eq.{site_id}" if site_id else "")
+        )
+        resp = http_client.get(url, headers=get_headers(), timeout=15)
+        if resp.status_code != 200:
+            print(f"DB Error (published sync): {resp.text[:200]}")
+            return None
+        rows = resp.json()
+        asins.update(row["asin"] for row in rows if row.get("asin"))
+        if len(rows) < _PAGE_SIZE:
+            return asins
+        offset += _PAGE_SIZE
+
+
+def iter_published_products(select="asin,title,price,product_url", page_size=_PAGE_SIZE):
+    """
+    Streams every published product row, one PostgREST page at a time, so
+    callers (price_tracker) never hold the whole catalogue response in memory.
+    Stops early on an HTTP error.
+    """
+    if not SUPABASE_URL:
+        return
+    offset = 0
+    while True:
+        url = (
+            f"{SUPABASE_URL}/rest/v1/products?is_published=eq.true&select={select}&order=asin"
+            f"&limit={page_size}&offset={offset}"
+        )
+        try:
+            resp = http_client.get(url, headers=get_headers(), timeout=15)
+        except Exception as e:
+            print(f"DB Error (published products): {e}")
+            return
+        if resp.status_code != 200:
+            print(f"DB Error (published products): {resp.text[:200]}")
+            return
+        rows = resp.json()
+        yield from rows
+        if len(rows) < page_size:
+            return
+        offset += page_size
+
+
+def get_published_asins(site_id=None, force_refresh=False):
+    """Set of ASINs already published on `site_id` (from the local cache, resynced when stale)."""
+    with _published_lock:
+        entry = _load_published_cache().get(_site_key(site_id))
+        fresh = entry and time.time() - entry["synced_at"] < PUBLISHED_CACHE_TTL_HOURS * 3600
+        if fresh and not force_refresh:
+            return set(entry["asins"])
+
+    if not SUPABASE_URL:
+        return set(entry["asins"]) if entry else set()
+    try:
+        synced = _fetch_published_asins(site_id)
+    except Exception as e:
+        print(f"DB Error (published sync): {e}")
+        synced = None
+
+    if synced is not None:
+        # A resync replaces the set (unpublished / deleted rows drop out); publishes
+        # still waiting in the write buffer aren't in Supabase yet, so keep those
+        with _write_lock:
+            synced |= {asin for (asin, sid), fields in _product_writes.items()
+                       if sid == site_id and fields.get('is_published')}
+
+    with _published_lock:
+        cache = _load_published_cache()
+        entry = cache.setdefault(_site_key(site_id), {"synced_at": 0, "asins": set()})
+        if synced is not None:
+            entry["asins"] = synced
+            entry["synced_at"] = time.time()
+            _save_published_cache()
+            print(f"[DB] Published-ASIN cache synced: {len(entry['asins'])} ASIN(s).")
+        return set(entry["asins"])
+
+
+def check_product_statuses(asins, site_id=None):
+    """
+    Batch version of check_product_status().
+    Returns {asin: None | 0 | 1} for every ASIN given, using the local
+    published cache first and one `asin=in.(...)` query for the rest.
+    """
+    statuses = {asin: None for asin in asins if asin}
+    if not statuses or not SUPABASE_URL:
+        return statuses
+
+    published = get_published_asins(site_id)
+    unknown = []
+    for asin in statuses:
+        if asin in published or (_pending_product_fields(asin, site_id) or {}).get('is_published'):
+            statuses[asin] = 1
+        else:
+            unknown.append(asin)
+
+    for i in range(0, len(unknown), STATUS_BATCH_SIZE):
+        chunk = unknown[i:i + STATUS_BATCH_SIZE]
+        try:
+            params = {"asin": _in_list(chunk), "select": "asin,is_published"}
+            if site_id:
+                params["site_id"] = f"eq.{site_id}"
+            resp = http_client.get(f"{SUPABASE_URL}/rest/v1/products", params=params,
+                                   headers=get_headers(), timeout=10)
+            rows = resp.json() if resp.status_code == 200 else []
+            if not isinstance(rows, list):
+                rows = []
+        except Exception as e:
+            print(f"DB Error (check_statuses): {e}")
+            # Unknown stays None here; process_product re-checks single ASINs as before
+            for asin in chunk:
+                statuses.pop(asin, None)
+            continue
+
+        for row in rows:
+            asin = row.get("asin")
+            if asin in statuses:
+                statuses[asin] = max(statuses[asin] or 0, 1 if row.get("is_published") else 0)
+        _remember_published([a for a in chunk if statuses.get(a) == 1], site_id)
+    return statuses
+
+
 # ---------------------------------------------------------------------------
 # Related / similar product helpers
 # ---------------------------------------------------------------------------
@@ -125,7 +544,7 @@ def get_similar_products(current_asin, site_id=None, limit=2):
             f"&select=title,price,rating,review_count,image_url,product_url"
             f"&limit=20" + (f"&site_id=eq.{site_id}" if site_id else "")
         )
-        response = requests.get(url, headers=get_headers())
+        response = http_client.get(url, headers=get_headers())
         products = response.json()
         if not products or not isinstance(products, list):
             if isinstance(products, dict):
@@ -152,7 +571,7 @@ def get_published_posts(site_id=None, limit=5):
             f"&order=created_at.desc"
             f"&limit={limit}" + (f"&site_id=eq.{site_id}" if site_id else "")
         )
-        response = requests.get(url, headers=get_headers())
+        response = http_client.get(url, headers=get_headers())
         data = response.json()
         return [{'title': p['title'], 'link': p['post_link']} for p in data]
     except Exception as e:
@@ -178,7 +597,7 @@ def get_relevant_posts(keyword, site_id=None, limit=5):
             f"&order=created_at.desc"
             f"&limit={limit}" + (f"&site_id=eq.{site_id}" if site_id else "")
         )
-        response = requests.get(url, headers=get_headers())
+        response = http_client.get(url, headers=get_headers())
         data = response.json()
 
         # Fallback: mix with recent posts if no specific matches
@@ -211,7 +630,7 @@ def check_keyword_pool_count(site_id=None):
         headers = get_headers()
         headers["Prefer"] = "count=exact"
         count_url = f"{SUPABASE_URL}/rest/v1/keyword_pool?status=eq.pending&select=keyword" + (f"&site_id=eq.{site_id}" if site_id else "")
-        resp = requests.get(count_url, headers=headers)
+        resp = http_client.get(count_url, headers=headers)
         if resp.status_code == 200:
             content_range = resp.headers.get("Content-Range", "")
             if "/" in content_range:
@@ -234,7 +653,7 @@ def get_pending_keywords_from_pool(site_id=None, limit=10):
             f"&select=keyword"
             f"&limit={limit}"
         ) + (f"&site_id=eq.{site_id}" if site_id else "")
-        resp = requests.get(url, headers=get_headers(), timeout=5)
+        resp = http_client.get(url, headers=get_headers(), timeout=5)
         if resp.status_code == 200:
             return [row['keyword'] for row in resp.json()]
     except Exception as e:
@@ -251,7 +670,7 @@ def add_keywords_to_pool(keywords, site_id=None):
         headers = get_headers()
         headers["Prefer"] = "resolution=ignore-duplicates"
         payload = [{"id": str(uuid.uuid4()), "keyword": kw, "status": "pending", "site_id": site_id} for kw in keywords]
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
+        response = http_client.post(url, headers=headers, json=payload, timeout=10)
         if response.status_code >= 400:
             print(f"DB Error (add_keywords): {response.text}")
     except Exception as e:
@@ -264,7 +683,7 @@ def mark_keyword_completed_in_pool(keyword, site_id=None):
         return
     try:
         url = f"{SUPABASE_URL}/rest/v1/keyword_pool?keyword=eq.{keyword}" + (f"&site_id=eq.{site_id}" if site_id else "")
-        requests.patch(url, headers=get_headers(), json={"status": "completed"}, timeout=5)
+        http_client.patch(url, headers=get_headers(), json={"status": "completed"}, timeout=5)
     except Exception as e:
         print(f"[ERROR] DB Error (mark_keyword_completed): {e}")
 
@@ -284,7 +703,7 @@ def get_bot_config_value(key: str, default=None):
         return default
     try:
         url = f"{SUPABASE_URL}/rest/v1/bot_config?key=eq.{key}&select=value&limit=1"
-        resp = requests.get(url, headers=get_headers(), timeout=5)
+        resp = http_client.get(url, headers=get_headers(), timeout=5)
         if resp.status_code == 200:
             data = resp.json()
             if data:
@@ -306,7 +725,7 @@ def set_bot_config_value(key: str, value: str):
         headers = get_headers()
         headers["Prefer"] = "resolution=merge-duplicates"
         payload = {"key": key, "value": str(value)}
-        resp = requests.post(url, headers=headers, json=payload, timeout=5)
+        resp = http_client.post(url, headers=headers, json=payload, timeout=5)
         if resp.status_code >= 400:
             print(f"[ERROR] DB Error (set_bot_config_value '{key}'): {resp.text}")
         else:
@@ -321,7 +740,7 @@ def get_all_bot_config() -> dict:
         return {}
     try:
         url = f"{SUPABASE_URL}/rest/v1/bot_config?select=key,value"
-        resp = requests.get(url, headers=get_headers(), timeout=5)
+        resp = http_client.get(url, headers=get_headers(), timeout=5)
         if resp.status_code == 200:
             return {row["key"]: row["value"] for row in resp.json()}
     except Exception as e:
@@ -0,0 +1,246 @@
+"""
+fluff_filter.py
+===============
+Post-processor that strips banned "AI-sounding" phrases from a generated
+article instead of regenerating the whole thing.
+
+  • One compiled, case-insensitive pattern finds every FLUFF_WORDS term
+    (plus common inflections) inside HTML text nodes only — tags,
+    attributes and URLs are never touched.
+  • Only figurative-only terms are swapped locally, and only in the context
+    that makes them figurative ("a tapestry of" → "a mix of").
+  • Sentences whose fluff has no safe local swap — "not only … but also",
+    or words that may be literal ("landscape mode", "unlock the phone",
+    "an elevated stand") — are sent, alone, to an optional rewrite
+    callback (a small Gemini call) that can tell the two apart.
+  • FLUFF_STATS counts how many full-article regenerations this avoided.
+"""
+
+import re
+import threading
+
+# Terms the article must not contain (same list the old regeneration loop used)
+FLUFF_WORDS = [
+    "unleash", "unlock", "realm", "landscape", "tapestry",
+    "symphony", "game-changer", "delve", "dive deep",
+    "bustling", "vibrant", "meticulous", "paramount", "elevate",
+    "testament", "not only", "in conclusion", "last but not least",
+    "when it comes to", "it is important to remember", "ultimately",
+]
+
+# Local substitutions (lower-case form → replacement), limited to terms that
+# are figurative wherever they appear. Inflected forms are listed explicitly
+# so the output stays grammatical. Words with a plausible literal sense in a
+# product review (unleash, unlock, landscape, elevate, vibrant, paramount, …)
+# are deliberately missing: their sentences go to the rewrite callback.
+FLUFF_REPLACEMENTS = {
+    "tapestry": "mix", "tapestries": "mixes",
+    "symphony": "blend", "symphonies": "blends",
+    "realm": "world", "realms": "worlds",
+    "game-changer": "big upgrade", "game-changers": "big upgrades", "game-changing": "standout",
+    "delve": "dig", "delves": "digs", "delved": "dug", "delving": "digging",
+    "dive deep": "look closely",
+    "meticulous": "careful", "meticulously": "carefully",
+    "in conclusion": "bottom line",
+    "last but not least": "finally",
+    "it is important to remember": "remember",
+    "ultimately": "in the end",
+}
+
+# Swaps that are only figurative in context: the term must be followed by
+# one of these words ("a tapestry of flavours", "the realm of smartwatches";
+# not "a woven tapestry", "Realm" the game), and delve must be "delve into".
+FLUFF_CONTEXT = {
+    "tapestry": ("of",), "tapestries": ("of",),
+    "symphony": ("of",), "symphonies": ("of",),
+    "realm":    ("of",), "realms":      ("of",),
+    "delve": ("into",), "delves": ("into",), "delved": ("into",), "delving": ("into",),
+}
+_NEXT_WORD = re.compile(r"\s+([A-Za-z]+)")
+
+FLUFF_PATTERN = re.compile(
+    r"\b(?:"
+    r"unleash(?:es|ed|ing)?|unlock(?:s|ed|ing)?|realms?|landscapes?|tapestr(?:y|ies)|"
+    r"symphon(?:y|ies)|game-chang(?:er|ers|ing)|delv(?:e|es|ed|ing)|dive deep|bustling|"
+    r"vibrant|meticulous(?:ly)?|paramount|elevat(?:e|es|ed|ing)|testaments?|not only|"
+    r"in conclusion|last but not least|when it comes to|it is important to remember|ultimately"
+    r")\b",
+    re.IGNORECASE,
+)
+
+_TAG_SPLIT      = re.compile(r"(<[^>]+>)")
+_SENTENCE_END   = re.compile(r"[.!?](?=\s|$)")
+_SKIP_CONTAINER = re.compile(r"<(script|style|iframe)\b", re.IGNORECASE)
+
+FLUFF_STATS = {
+    "articles_checked":      0,
+    "articles_with_fluff":   0,
+    "local_substitutions":   0,
+    "sentences_rewritten":   0,
+    "rewrite_calls":         0,
+    "regenerations_avoided": 0,
+}
+_stats_lock = threading.Lock()
+
+
+def _bump(key, amount=1):
+    with _stats_lock:
+        FLUFF_STATS[key] += amount
+
+
+def _match_case(original: str, replacement: str) -> str:
+    if original.isupper() and len(original) > 1:
+        return replacement.upper()
+    if original[:1].isupper():
+        return replacement[:1].upper() + replacement[1:]
+    return replacement
+
+
+def _local_swap(text: str, m):
+    """Replacement for the match `m` in `text`, or None when it needs a sentence rewrite."""
+    original = m.group(0)
+    replacement = FLUFF_REPLACEMENTS.get(original.lower())
+    if replacement is None:
+        return None
+    # Hyphenated compounds ("realm-based") are names or literal uses
+    if text[m.end():m.end() + 1] == "-" or text[m.start() - 1:m.start()] == "-":
+        return None
+    # Capitalised mid-sentence it is most likely a product or brand name
+    before = text[:m.start()].rstrip()
+    if original[:1].isupper() and before and before[-1] not in ".!?:":
+        return None
+    required = FLUFF_CONTEXT.get(original.lower())
+    if required:
+        nxt = _NEXT_WORD.match(text, m.end())
+        if not nxt or nxt.group(1).lower() not in required:
+            return None
+    return _match_case(original, replacement)
+
+
+def find_fluff(html: str) -> list[str]:
+    """Returns the distinct banned terms found in the article's visible text."""
+    found = []
+    for segment in _iter_text_segments(html):
+        for m in FLUFF_PATTERN.finditer(segment):
+            term = m.group(0).lower()
+            if term not in found:
+                found.append(term)
+    return found
+
+
+def _iter_text_segments(html: str):
+    inside_skip = False
+    for part in _TAG_SPLIT.split(html):
+        if part.startswith("<"):
+            if _SKIP_CONTAINER.match(part):
+                inside_skip = True
+            elif inside_skip and part.lower().startswith(("</script", "</style", "</iframe")):
+                inside_skip = False
+            continue
+        if not inside_skip:
+            yield part
+
+
+def _sentence_bounds(text: str, start: int, end: int) -> tuple[int, int]:
+    """Span of the sentence (inside one text node) that contains text[start:end]."""
+    left = 0
+    for m in _SENTENCE_END.finditer(text, 0, start):
+        left = m.end()
+    m = _SENTENCE_END.search(text, end)
+    right = m.end() if m else len(text)
+    while left < right and text[left].isspace():
+        left += 1
+    return left, right
+
+
+def clean_fluff(html: str, rewrite=None) -> str:
+    """
+    Removes FLUFF_WORDS from an HTML article body without regenerating it.
+
+    Args:
+        html    : article HTML
+        rewrite : optional callable(list[str]) -> list[str] that rewrites whole
+                  sentences whose fluff has no local substitution. Must return
+                  a list of the same length; any failure leaves them untouched.
+
+    Returns:
+        The cleaned HTML.
+    """
+    if not html:
+        return html
+
+    _bump("articles_checked")
+    parts = _TAG_SPLIT.split(html)
+    pending = []          # (part index, start, end) of sentences needing a rewrite
+    had_fluff = False
+    inside_skip = False
+
+    for idx, part in enumerate(parts):
+        if part.startswith("<"):
+            if _SKIP_CONTAINER.match(part):
+                inside_skip = True
+            elif inside_skip and part.lower().startswith(("</script", "</style", "</iframe")):
+                inside_skip = False
+            continue
+        if inside_skip or not FLUFF_PATTERN.search(part):
+            continue
+        had_fluff = True
+
+        # Pass 1: sentences with terms that have no safe local swap go to the rewriter
+        for m in FLUFF_PATTERN.finditer(part):
+            if _local_swap(part, m) is None:
+                bounds = _sentence_bounds(part, m.start(), m.end())
+                if (idx, *bounds) not in pending:
+                    pending.append((idx, *bounds))
+
+        # Pass 2: local substitutions (outside sentences queued for rewrite)
+        protected = [(s, e) for i, s, e in pending if i == idx]
+
+        def _swap(m, text=part):
+            if any(s <= m.start() < e for s, e in protected):
+                return m.group(0)
+            replacement = _local_swap(text, m)
+            if replacement is None:
+                return m.group(0)
+            _bump("local_substitutions")
+            return replacement
+
+        parts[idx] = FLUFF_PATTERN.sub(_swap, part)
+
+    if not had_fluff:
+        return html
+    _bump("articles_with_fluff")
+
+    if pending and rewrite is not None:
+        # Substituting locally may have shifted offsets inside a part; recompute
+        # sentence spans on the current text before handing them off.
+        targets = []
+        for idx in sorted({i for i, _, _ in pending}):
+            for m in FLUFF_PATTERN.finditer(parts[idx]):
+                if _local_swap(parts[idx], m) is None:
+                    span = _sentence_bounds(parts[idx], m.start(), m.end())
+                    if (idx, *span) not in targets:
+                        targets.append((idx, *span))
+        sentences = [parts[i][s:e] for i, s, e in targets]
+        try:
+            _bump("rewrite_calls")
+            rewritten = rewrite(sentences)
+        except Exception as e:
+            print(f"[FLUFF] Sentence rewrite failed: {e}")
+            rewritten = None
+        if rewritten and len(rewritten) == len(sentences):
+            # Apply right-to-left so earlier offsets stay valid
+            for (i, s, e), new_text in sorted(zip(targets, rewritten), key=lambda t: (t[0][0], -t[0][1])):
+                if isinstance(new_text, str) and new_text.strip() and "<" not in new_text:
+                    parts[i] = parts[i][:s] + new_text.strip() + parts[i][e:]
+                    _bump("sentences_rewritten")
+
+    cleaned = "".join(parts)
+    remaining = find_fluff(cleaned)
+    if remaining:
+        print(f"[FLUFF] Cleaned locally; left untouched: {remaining}")
+    else:
+        # Only a fully clean article counts as a regeneration avoided
+        _bump("regenerations_avoided")
+        print("[FLUFF] ✅ Fluff removed without regenerating the article.")
+    return cleaned
@@ -1,6 +1,6 @@
 import os
 import random
-import requests
+import http_client
 import json
 from config import SUPABASE_URL, SUPABASE_KEY
 from ai_content_generator import generate_content
@@ -17,7 +17,7 @@ def get_headers():
 
 def fetch_random_posts(limit=2):
     url = f"{SUPABASE_URL}/rest/v1/Post?select=id,title,brand,modelNumber,imageUrl,category,amazonAffiliateLink&isVsArticle=eq.false"
-    res = requests.get(url, headers=get_headers())
+    res = http_client.get(url, headers=get_headers())
     if res.status_code == 200:
         posts = res.json()
         if len(posts) >= limit:
@@ -89,7 +89,7 @@ def create_vs_article():
 
     print("[INFO] Saving to Supabase...")
     url = f"{SUPABASE_URL}/rest/v1/Post"
-    res = requests.post(url, headers=get_headers(), json=new_post)
+    res = http_client.post(url, headers=get_headers(), json=new_post)
     if res.status_code in [200, 201]:
         print(f"[SUCCESS] VS Article created: {title}")
     else:
@@ -4,6 +4,7 @@ Google Trends থেকে trending watch/gadget keywords discover করে।
 Suggestions API ব্যবহার করে — কোনো API key লাগে না।
 """
 import requests
+import http_client
 import json
 import re
 import time
@@ -33,7 +34,7 @@ def _get_google_suggestions(query: str) -> list[str]:
     """
     suggestions = []
     try:
-        resp = requests.get(
+        resp = http_client.get(
             GOOGLE_SUGGEST_URL,
             params={
                 "client": "firefox",  # Returns clean JSON
@@ -62,7 +63,7 @@ def _get_trends_suggestions(keyword: str) -> list[str]:
     suggestions = []
     try:
         url = f"https://trends.google.com/trends/api/autocomplete/{requests.utils.quote(keyword)}"
-        resp = requests.get(
+        resp = http_client.get(
             url,
             params={"hl": "en-US", "tz": "-360"},
             headers={
@@ -0,0 +1,151 @@
+"""
+http_client.py
+==============
+One place for every outbound HTTP call (Supabase, ScrapingAnt, Next.js API,
+Make.com, Telegram, Google, YouTube, image downloads).
+
+  • Keep-alive connection pool per host — a Supabase PATCH no longer pays a
+    fresh TCP + TLS handshake.
+  • Default (connect, read) timeout for callers that don't pass one.
+  • Retry with exponential backoff on connection errors and 502/503/504 for
+    idempotent methods (PATCH included — PostgREST PATCHes set absolute
+    values). POST is only retried when the request never left the machine.
+  • Metered hosts (NO_RETRY_HOSTS, ScrapingAnt by default) are only retried
+    when the connection failed — a read timeout or a 5xx may already have
+    been billed, so their client decides whether to try again.
+  • Optional HTTP/2 (httpx + h2) for hosts listed in HTTP2_HOSTS.
+
+Usage mirrors `requests`:
+    import http_client
+    resp = http_client.get(url, headers=..., timeout=10)
+"""
+
+import os
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+except ImportError:
+    httpx = None
+
+DEFAULT_TIMEOUT = (
+    float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+    float(os.getenv("HTTP_READ_TIMEOUT", "30")),
+)
+POOL_SIZE   = int(os.getenv("HTTP_POOL_SIZE", "10"))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP2_HOSTS = {h.strip().lower() for h in os.getenv("HTTP2_HOSTS", "").split(",") if h.strip()}
+NO_RETRY_HOSTS = {h.strip().lower() for h in os.getenv("HTTP_NO_RETRY_HOSTS", "api.scrapingant.com").split(",")
+                  if h.strip()}
+
+RETRY_STATUSES  = (502, 503, 504)
+RETRY_METHODS   = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "PATCH", "DELETE"})
+_HTTPX_KWARGS   = {"headers", "params", "json", "data", "timeout"}
+
+_sessions      = {}
+_http2_clients = {}
+_lock          = threading.Lock()
+
+
+def _retry_policy(host=""):
+    # Billed per request: a connect error never reached the server, anything else might have
+    metered = host in NO_RETRY_HOSTS
+    return Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=0 if metered else MAX_RETRIES,
+        status=0 if metered else MAX_RETRIES,
+        other=0 if metered else None,
+        backoff_factor=0.5,
+        status_forcelist=() if metered else RETRY_STATUSES,
+        allowed_methods=RETRY_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def get_session(url_or_host: str) -> requests.Session:
+    """Pooled keep-alive session for the host of `url_or_host` (created on first use)."""
+    host = urlsplit(url_or_host).netloc.lower() if "://" in url_or_host else url_or_host.lower()
+    session = _sessions.get(host)
+    if session is not None:
+        return session
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=_retry_policy(host))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+    return session
+
+
+def _http2_client(host):
+    client = _http2_clients.get(host)
+    if client is not None:
+        return client
+    with _lock:
+        client = _http2_clients.get(host)
+        if client is None:
+            client = httpx.Client(
+                http2=True,
+                timeout=httpx.Timeout(DEFAULT_TIMEOUT[1], connect=DEFAULT_TIMEOUT[0]),
+                limits=httpx.Limits(max_connections=POOL_SIZE),
+                transport=httpx.HTTPTransport(http2=True, retries=MAX_RETRIES),
+            )
+            _http2_clients[host] = client
+    return client
+
+
+def request(method: str, url: str, **kwargs):
+    """
+    Drop-in for requests.request() routed through the pooled session for the
+    URL's host. Returns a requests.Response (or an httpx.Response for HTTP/2
+    hosts — same status_code/text/json()/headers/content interface).
+    """
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    host = urlsplit(url).netloc.lower()
+    if httpx is not None and host in HTTP2_HOSTS and set(kwargs) <= _HTTPX_KWARGS:
+        timeout = kwargs["timeout"]
+        if isinstance(timeout, tuple):
+            kwargs["timeout"] = httpx.Timeout(timeout[1], connect=timeout[0])
+        return _http2_client(host).request(method, url, **kwargs)
+    return get_session(host).request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def patch(url, **kwargs):
+    return request("PATCH", url, **kwargs)
+
+
+def put(url, **kwargs):
+    return request("PUT", url, **kwargs)
+
+
+def delete(url, **kwargs):
+    return request("DELETE", url, **kwargs)
+
+
+def close_all():
+    """Closes every pooled connection (end of a cycle / process shutdown)."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        for client in _http2_clients.values():
+            client.close()
+        _sessions.clear()
+        _http2_clients.clear()
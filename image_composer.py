@@ -8,40 +8,100 @@ Creative Director spec:
   • High-contrast typography overlay (White product name + Amber CTA badge)
   • Text contrast-plate & stroke for readability on any screen
   • Aspect-ratio-safe LANCZOS resize — no distortion
+  • AVIF / WebP <picture> sources next to a progressive JPEG fallback
   • Cloudinary upload with graceful raw-URL fallback
 """
 
 import io
+import json
 import math
 import os
-import requests
+import http_client
 import random
 import glob
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
+import numpy as np
 from PIL import Image, ImageDraw, ImageFilter, ImageFont
 import cloudinary
 import cloudinary.uploader
 
-from config import CLOUDINARY_URL
+from config import (CLOUDINARY_URL, CACHE_DIR, CUTOUT_CACHE_MAX_MB, REMBG_MODEL, REMBG_THREADS,
+                    RENDER_PROCESS_POOL, IMAGE_FORMATS)
 
 try:
-    from rembg import remove
-    from rembg.session_factory import new_session
-    
-    # Try models in order of quality (isnet-general-use -> u2net -> u2netp)
-    REMBG_SESSION = None
-    for model_name in ["isnet-general-use", "u2net", "u2netp"]:
+    import pillow_avif  # noqa: F401  — AVIF encoder for Pillow builds without native AVIF
+except ImportError:
+    pass
+
+# ── Background removal (rembg) — loaded lazily ──────────────────────────────
+# Importing rembg + onnxruntime and building an ONNX session takes seconds and
+# hundreds of MB, so nothing is loaded until the first image actually needs a
+# cutout (or warmup() is called). Runs that never compose an image — price
+# tracker, dry runs, the GUI — don't pay for it.
+REMBG_FALLBACK_MODELS = ["isnet-general-use", "u2net", "u2netp"]
+
+_rembg      = None     # (remove, session, model_name) once loaded, False if unavailable
+_rembg_lock = threading.Lock()
+
+
+def _load_rembg():
+    # rembg sizes the ONNX Runtime intra/inter-op thread pools from OMP_NUM_THREADS.
+    # An explicit REMBG_THREADS wins; the all-cores default never overrides an inherited value.
+    if REMBG_THREADS:
+        os.environ["OMP_NUM_THREADS"] = str(REMBG_THREADS)
+    else:
+        os.environ.setdefault("OMP_NUM_THREADS", str(os.cpu_count() or 1))
+    try:
+        from rembg import remove
+        from rembg.session_factory import new_session
+    except Exception as exc:
+        print(f"[REMBG] Import failed or general initialization error: {exc}")
+        return False
+
+    # Configured model first, then the rest in order of quality
+    models = [REMBG_MODEL] + [m for m in REMBG_FALLBACK_MODELS if m != REMBG_MODEL]
+    for model_name in models:
         try:
             print(f"[REMBG] Attempting to load background removal model: {model_name}...")
-            REMBG_SESSION = new_session(model_name)
-            print(f"[REMBG] Successfully loaded model: {model_name}")
-            break
+            started = time.perf_counter()
+            session = new_session(model_name)
+            print(f"[REMBG] Successfully loaded model: {model_name} "
+                  f"({time.perf_counter() - started:.1f}s, {os.environ['OMP_NUM_THREADS']} threads)")
+            return remove, session, model_name
         except Exception as e:
             print(f"[REMBG] Failed to load model {model_name}: {e}")
-except Exception as exc:
-    print(f"[REMBG] Import failed or general initialization error: {exc}")
-    remove = None
-    REMBG_SESSION = None
+    return False
+
+
+def _get_rembg():
+    """(remove, session, model_name), loading the model on first use; None if rembg is unavailable."""
+    global _rembg
+    if _rembg is None:
+        with _rembg_lock:
+            if _rembg is None:
+                _rembg = _load_rembg()
+    return _rembg or None
+
+
+def warmup():
+    """
+    Loads the segmentation model and runs one tiny inference so the first real
+    product image doesn't pay the start-up cost. Returns the model name, or
+    None when rembg is unavailable.
+    """
+    rembg = _get_rembg()
+    if rembg is None:
+        return None
+    remove, session, model_name = rembg
+    started = time.perf_counter()
+    remove(Image.new("RGBA", (64, 64), (255, 255, 255, 255)), session=session)
+    print(f"[REMBG] Warm-up inference done in {time.perf_counter() - started:.1f}s.")
+    return model_name
 
 # ── Cloudinary bootstrap ────────────────────────────────────────────────────
 if CLOUDINARY_URL:
@@ -63,63 +123,75 @@ STROKE_COLOR       = (0, 0, 0)
 
 # ── Internal helpers ─────────────────────────────────────────────────────────
 
+BACKGROUND_DIR = os.path.join(os.path.dirname(__file__), "assets", "backgrounds")
+
+
+@lru_cache(maxsize=8)
+def _radial_gradient(size: tuple[int, int]) -> Image.Image:
+    """Cached master copy of the gradient for `size` — never hand it out directly."""
+    w, h = size
+    cx, cy = w / 2, h / 2
+    max_radius = math.hypot(cx, cy)
+
+    # Distance of every pixel from the centre in one broadcast (0 = centre, 1 = edge)
+    ys, xs = np.ogrid[:h, :w]
+    t = np.minimum(np.hypot(xs - cx, ys - cy) / max_radius, 1.0)[..., None]
+    centre = np.array(GRAD_CENTER_COLOR, dtype=np.float64)
+    edge   = np.array(GRAD_EDGE_COLOR, dtype=np.float64)
+    pixels = (centre + (edge - centre) * t).astype(np.uint8)
+    return Image.fromarray(pixels, "RGB")
+
+
 def _build_radial_gradient(size: tuple[int, int]) -> Image.Image:
     """
     Generates a radial gradient Image from GRAD_CENTER_COLOR (centre)
-    to GRAD_EDGE_COLOR (edges). Pure Pillow, no NumPy required.
+    to GRAD_EDGE_COLOR (edges). NumPy-vectorized and cached per size;
+    returns a fresh copy the caller may draw on.
     """
-    w, h = size
-    cx, cy = w / 2, h / 2
-    max_radius = math.hypot(cx, cy)
+    return _radial_gradient(tuple(size)).copy()
+
+
+@lru_cache(maxsize=1)
+def _background_files() -> tuple[str, ...]:
+    if not os.path.exists(BACKGROUND_DIR):
+        return ()
+    return tuple(sorted(glob.glob(os.path.join(BACKGROUND_DIR, "*.png")) +
+                        glob.glob(os.path.join(BACKGROUND_DIR, "*.jpg"))))
 
-    img = Image.new("RGB", size)
-    pixels = img.load()
 
-    rc, gc, bc = GRAD_CENTER_COLOR
-    re, ge, be = GRAD_EDGE_COLOR
+@lru_cache(maxsize=16)
+def _scaled_background(bg_path: str, size: tuple[int, int]) -> Image.Image:
+    """Background asset scaled to cover `size` and centre-cropped (cached master copy)."""
+    with Image.open(bg_path) as src:
+        bg = src.convert("RGB")
 
-    for y in range(h):
-        for x in range(w):
-            dist = math.hypot(x - cx, y - cy)
-            t = min(dist / max_radius, 1.0)          # 0 = centre, 1 = edge
-            r = int(rc + (re - rc) * t)
-            g = int(gc + (ge - gc) * t)
-            b = int(bc + (be - bc) * t)
-            pixels[x, y] = (r, g, b)
+    # Scale to cover and center crop
+    bg_w, bg_h = bg.size
+    target_w, target_h = size
+    scale = max(target_w / bg_w, target_h / bg_h)
+    new_w, new_h = int(bg_w * scale), int(bg_h * scale)
+    bg = bg.resize((new_w, new_h), Image.Resampling.LANCZOS)
 
-    return img
+    left = (new_w - target_w) / 2
+    top = (new_h - target_h) / 2
+    right = (new_w + target_w) / 2
+    bottom = (new_h + target_h) / 2
+    return bg.crop((left, top, right, bottom))
 
 
 def _get_random_background(size: tuple[int, int]) -> Image.Image:
     """
     Returns a random premium background image from assets/backgrounds.
     Falls back to radial gradient if none found or error occurs.
+    Each (asset, size) pair is decoded and resized once per process.
     """
-    bg_dir = os.path.join(os.path.dirname(__file__), "assets", "backgrounds")
-    if os.path.exists(bg_dir):
-        bg_files = glob.glob(os.path.join(bg_dir, "*.png")) + glob.glob(os.path.join(bg_dir, "*.jpg"))
-        if bg_files:
-            try:
-                bg_path = random.choice(bg_files)
-                bg = Image.open(bg_path).convert("RGB")
-                
-                # Scale to cover and center crop
-                bg_w, bg_h = bg.size
-                target_w, target_h = size
-                scale = max(target_w / bg_w, target_h / bg_h)
-                new_w, new_h = int(bg_w * scale), int(bg_h * scale)
-                bg = bg.resize((new_w, new_h), Image.Resampling.LANCZOS)
-                
-                left = (new_w - target_w) / 2
-                top = (new_h - target_h) / 2
-                right = (new_w + target_w) / 2
-                bottom = (new_h + target_h) / 2
-                bg = bg.crop((left, top, right, bottom))
-                
-                return bg
-            except Exception as e:
-                print(f"[COMPOSE] Error loading premium background: {e}")
-                
+    bg_files = _background_files()
+    if bg_files:
+        try:
+            return _scaled_background(random.choice(bg_files), tuple(size)).copy()
+        except Exception as e:
+            print(f"[COMPOSE] Error loading premium background: {e}")
+
     return _build_radial_gradient(size)
 
 def _add_drop_shadow(watch_img: Image.Image) -> Image.Image:
@@ -162,96 +234,130 @@ def _add_drop_shadow(watch_img: Image.Image) -> Image.Image:
     return composed
 
 
-def _load_font(size: int, bold: bool = False) -> ImageFont.ImageFont:
-    """
-    Tries to load a clean system font. Falls back to Pillow default if absent.
-    Bold/Regular variants attempted in order.
-    """
-    bold_paths = [
+FONT_PATHS = {
+    True: [     # bold
         "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
         "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
         "C:/Windows/Fonts/arialbd.ttf",
         "C:/Windows/Fonts/calibrib.ttf",
         "C:/Windows/Fonts/trebucbd.ttf",
-    ]
-    regular_paths = [
+    ],
+    False: [    # regular
         "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
         "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
         "C:/Windows/Fonts/arial.ttf",
         "C:/Windows/Fonts/calibri.ttf",
         "C:/Windows/Fonts/trebuc.ttf",
-    ]
-    paths = bold_paths if bold else regular_paths
-    for p in paths:
+    ],
+}
+
+
+@lru_cache(maxsize=2)
+def _font_path(bold: bool):
+    """First loadable font file for the weight — probed once per process. None = Pillow default."""
+    for p in FONT_PATHS[bold]:
         if os.path.exists(p):
             try:
-                return ImageFont.truetype(p, size)
+                ImageFont.truetype(p, 12)
+                return p
             except Exception:
                 continue
-    return ImageFont.load_default()
-
-
-def _draw_stroked_text(
-    draw: ImageDraw.ImageDraw,
-    pos: tuple[int, int],
-    text: str,
-    font: ImageFont.ImageFont,
-    fill: tuple,
-    stroke_width: int = 2,
-    stroke_fill: tuple = STROKE_COLOR,
-    anchor: str = "mm",
-) -> None:
-    """Draws text with an outer stroke for maximum readability."""
-    x, y = pos
-    for dx in range(-stroke_width, stroke_width + 1):
-        for dy in range(-stroke_width, stroke_width + 1):
-            if dx != 0 or dy != 0:
-                draw.text((x + dx, y + dy), text, font=font,
-                          fill=stroke_fill, anchor=anchor)
-    draw.text(pos, text, font=font, fill=fill, anchor=anchor)
+    return None
 
 
-def _draw_watermark(canvas: Image.Image) -> None:
-    """Stamps the 'WHIT LOGIC' watermark at the top-left."""
-    overlay = Image.new("RGBA", canvas.size, (0, 0, 0, 0))
-    draw    = ImageDraw.Draw(overlay)
-    font    = _load_font(20, bold=True)
+@lru_cache(maxsize=32)
+def _font(path, size: int) -> ImageFont.ImageFont:
+    """One ImageFont per (path, size), shared by every render in the process."""
+    if path is None:
+        return ImageFont.load_default()
+    return ImageFont.truetype(path, size)
+
+
+def _load_font(size: int, bold: bool = False) -> ImageFont.ImageFont:
+    """
+    Tries to load a clean system font. Falls back to Pillow default if absent.
+    Bold/Regular variants attempted in order.
+    """
+    return _font(_font_path(bold), size)
+
+
+@lru_cache(maxsize=64)
+def _text_layer(text: str, size: int, bold: bool, fill: tuple,
+                stroke_width: int = 0, stroke_fill: tuple = STROKE_COLOR):
+    """
+    Renders centred ("mm") text once per (text, style) onto a tight transparent
+    layer, outline included via Pillow's native stroke (one draw call).
+    Returns (layer, (dx, dy)) — the layer's top-left offset from the anchor.
+    Cached layers are shared: composite them, never draw on them.
+    """
+    font = _load_font(size, bold)
+    left, top, right, bottom = font.getbbox(text, anchor="mm", stroke_width=stroke_width)
+    layer = Image.new("RGBA", (max(right - left, 1), max(bottom - top, 1)), (0, 0, 0, 0))
+    ImageDraw.Draw(layer).text((-left, -top), text, font=font, fill=fill, anchor="mm",
+                               stroke_width=stroke_width, stroke_fill=stroke_fill)
+    return layer, (left, top)
+
+
+def _composite(canvas: Image.Image, layer: Image.Image, xy: tuple[int, int]) -> None:
+    """Alpha-composites an RGBA layer onto an RGB canvas in place, touching only the covered box."""
+    x, y = max(xy[0], 0), max(xy[1], 0)
+    crop = (x - xy[0], y - xy[1])
+    box = (x, y, min(xy[0] + layer.width, canvas.width), min(xy[1] + layer.height, canvas.height))
+    if box[2] <= x or box[3] <= y:
+        return
+    region = canvas.crop(box).convert("RGBA")
+    region.alpha_composite(layer, source=crop)
+    canvas.paste(region.convert("RGB"), box)
+
+
+def _draw_text(canvas: Image.Image, pos: tuple[int, int], text: str, size: int,
+               fill: tuple, bold: bool = True, stroke_width: int = 0) -> None:
+    """Stamps cached (optionally stroked) text centred on `pos`."""
+    layer, (dx, dy) = _text_layer(text, size, bold, fill, stroke_width)
+    _composite(canvas, layer, (pos[0] + dx, pos[1] + dy))
+
+
+@lru_cache(maxsize=1)
+def _watermark_layer() -> Image.Image:
+    """The 'WHIT LOGIC' mark (amber dot + brand name) on a small transparent layer."""
+    font  = _load_font(20, bold=True)
+    right = int(34 + font.getlength("WHIT LOGIC")) + 4
+    layer = Image.new("RGBA", (right, 40), (0, 0, 0, 0))
+    draw  = ImageDraw.Draw(layer)
 
     # Small amber accent dot + brand name
     draw.ellipse([16, 14, 28, 26], fill=(251, 191, 36, 200))
     draw.text((34, 20), "WHIT LOGIC", font=font,
               fill=WATERMARK_COLOR, anchor="lm")
+    return layer
+
 
-    canvas.paste(Image.alpha_composite(
-        canvas.convert("RGBA"), overlay).convert("RGB"))
+def _draw_watermark(canvas: Image.Image) -> None:
+    """Stamps the 'WHIT LOGIC' watermark at the top-left."""
+    _composite(canvas, _watermark_layer(), (0, 0))
 
 
-def _draw_text_overlay(canvas: Image.Image, title: str) -> None:
+@lru_cache(maxsize=4)
+def _ad_plate_layer(width: int) -> Image.Image:
     """
-    Renders a translucent dark plate at the bottom with:
-      • Product name  — Pure White, bold
-      • CTA badge     — Amber "BEST BUDGET TACTICAL WATCH"
+    The static part of the ad's bottom plate (translucent plate, amber accent,
+    CTA badge, footer micro-text) — identical for every product, drawn once.
     """
-    if not title:
-        return
-
-    overlay = Image.new("RGBA", canvas.size, (0, 0, 0, 0))
-    draw    = ImageDraw.Draw(overlay)
-
-    W, H = canvas.size
     plate_h = 150
-    plate_top = H - plate_h
+    overlay = Image.new("RGBA", (width, plate_h), (0, 0, 0, 0))
+    draw    = ImageDraw.Draw(overlay)
+    W = width
 
     # Draw translucent plate
-    draw.rectangle([0, plate_top, W, H], fill=PLATE_COLOR)
+    draw.rectangle([0, 0, W, plate_h], fill=PLATE_COLOR)
 
     # Thin amber accent line at top of plate
-    draw.rectangle([0, plate_top, W, plate_top + 3], fill=(251, 191, 36, 255))
+    draw.rectangle([0, 0, W, 3], fill=(251, 191, 36, 255))
 
     # ── CTA badge (amber pill) ───────────────────────────────────────────
     badge_text  = "✦  BEST BUDGET TACTICAL WATCH  ✦"
     badge_font  = _load_font(15, bold=True)
-    badge_y     = plate_top + 28
+    badge_y     = 28
 
     # Pill background
     bbox = draw.textbbox((W // 2, badge_y), badge_text,
@@ -264,200 +370,518 @@ def _draw_text_overlay(canvas: Image.Image, title: str) -> None:
     draw.text((W // 2, badge_y), badge_text, font=badge_font,
               fill=(15, 15, 20), anchor="mm")
 
+    # ── "Review on whitlogic.online" footer micro-text ───────────────────
+    micro_font = _load_font(14)
+    draw.text(
+        (W // 2, plate_h - 20),
+        "Full Review → whitlogic.online",
+        font=micro_font, fill=(200, 200, 200, 180), anchor="mm",
+    )
+    return overlay
+
+
+def _draw_text_overlay(canvas: Image.Image, title: str) -> None:
+    """
+    Renders a translucent dark plate at the bottom with:
+      • Product name  — Pure White, bold
+      • CTA badge     — Amber "BEST BUDGET TACTICAL WATCH"
+    """
+    if not title:
+        return
+
+    W, H = canvas.size
+    plate = _ad_plate_layer(W)
+    plate_top = H - plate.height
+    _composite(canvas, plate, (0, plate_top))
+
     # ── Product title (white, bold, wrapping) ────────────────────────────
-    title_font = _load_font(22, bold=True)
     # Truncate long titles gracefully
     max_chars = 52
     display_title = title[:max_chars].rsplit(" ", 1)[0] + "…" \
         if len(title) > max_chars else title
     display_title = display_title.upper()
 
-    title_y = plate_top + 72
-    _draw_stroked_text(
-        draw, (W // 2, title_y), display_title,
-        font=title_font, fill=TITLE_COLOR,
-        stroke_width=2, anchor="mm",
-    )
+    _draw_text(canvas, (W // 2, plate_top + 72), display_title, 22,
+               fill=TITLE_COLOR, stroke_width=2)
 
-    # ── "Review on whitlogic.online" footer micro-text ───────────────────
-    micro_font = _load_font(14)
-    draw.text(
-        (W // 2, H - 20),
-        "Full Review → whitlogic.online",
-        font=micro_font, fill=(200, 200, 200, 180), anchor="mm",
+
+@lru_cache(maxsize=4)
+def _pinterest_plate_layer(width: int) -> Image.Image:
+    """Static bottom plate of the pin: translucent plate, amber accent, 'Read Full Review' button."""
+    plate_h = 300
+    W = width
+    overlay = Image.new("RGBA", (W, plate_h), (0, 0, 0, 0))
+    overlay_draw = ImageDraw.Draw(overlay)
+    overlay_draw.rectangle([0, 0, W, plate_h], fill=PLATE_COLOR)
+    overlay_draw.rectangle([0, 0, W, 4], fill=(251, 191, 36, 255))
+
+    # Button/CTA
+    btn_font = _load_font(24, bold=True)
+    overlay_draw.rounded_rectangle([W // 2 - 150, 180, W // 2 + 150, 240], radius=30, fill=(251, 191, 36))
+    overlay_draw.text((W // 2, 210), "Read Full Review", font=btn_font, fill=(0,0,0), anchor="mm")
+    return overlay
+
+
+# ── Variant templates ────────────────────────────────────────────────────────
+
+def _render_ad(product_img: Image.Image, title: str, spec: dict) -> Image.Image:
+    """800×800 ad: centred floating product, watermark, bottom typography plate."""
+    W, H = spec["size"]
+
+    # Aspect-ratio-safe resize (LANCZOS, no distortion)
+    product_img.thumbnail(spec["product_box"], Image.Resampling.LANCZOS)
+
+    # Drop-shadow / glow
+    shadowed = _add_drop_shadow(product_img)
+
+    # Premium Lifestyle Canvas
+    canvas = _get_random_background((W, H))
+
+    # Centre-paste the shadowed watch
+    # Convert canvas to RGBA for compositing
+    canvas_rgba = canvas.convert("RGBA")
+    sx = (W - shadowed.width)  // 2
+    sy = (H - shadowed.height) // 2 - 20  # slight upward shift
+    canvas_rgba.paste(shadowed, (sx, sy), shadowed)
+    canvas = canvas_rgba.convert("RGB")
+
+    # Watermark + text overlay
+    _draw_watermark(canvas)
+    _draw_text_overlay(canvas, title)
+    return canvas
+
+
+def _render_pinterest(product_img: Image.Image, title: str, spec: dict) -> Image.Image:
+    """1000×1500 pin: headline on top, product centre, title + CTA plate at the bottom."""
+    W, H = spec["size"]
+
+    # Resize to fit within 800x800 for the center of Pinterest image
+    product_img.thumbnail(spec["product_box"], Image.Resampling.LANCZOS)
+    shadowed = _add_drop_shadow(product_img)
+
+    canvas = _get_random_background((W, H))
+
+    canvas_rgba = canvas.convert("RGBA")
+
+    # Center the shadowed watch
+    sx = (W - shadowed.width) // 2
+    sy = (H - shadowed.height) // 2
+    canvas_rgba.paste(shadowed, (sx, sy), shadowed)
+
+    canvas = canvas_rgba.convert("RGB")
+
+    # Top text
+    _draw_text(canvas, (W // 2, 150), "EXPERT REVIEW", 48, fill=(251, 191, 36), stroke_width=3)
+
+    # Bottom Plate
+    plate = _pinterest_plate_layer(W)
+    plate_top = H - plate.height
+    _composite(canvas, plate, (0, plate_top))
+
+    # Title in the bottom plate
+    max_chars = 60
+    display_title = title[:max_chars].rsplit(" ", 1)[0] + "…" if len(title) > max_chars else title
+    display_title = display_title.upper()
+
+    _draw_text(canvas, (W // 2, plate_top + 100), display_title, 36, fill=(255,255,255), stroke_width=2)
+    return canvas
+
+
+# Part of every Cloudinary public ID: bump it whenever a template's look changes
+# so the next run renders fresh assets instead of serving uploaded ones.
+TEMPLATE_VERSION = "2"
+
+# Encoders for the uploaded files. Every variant gets a JPEG (imageUrl, Make.com,
+# Pinterest); variants served on the website add the modern formats as
+# <picture> sources, best first.
+ENCODINGS = {
+    "avif": {"format": "AVIF", "extension": "avif", "mime": "image/avif",
+             "params": {"quality": 55, "speed": 6}},
+    "webp": {"format": "WEBP", "extension": "webp", "mime": "image/webp",
+             "params": {"quality": 80, "method": 4}},
+    "jpeg": {"format": "JPEG", "extension": "jpg",  "mime": "image/jpeg",
+             "params": {"optimize": True, "progressive": True}},     # quality per variant
+}
+
+# Every image format the pipeline can produce from one product cutout.
+# New formats (OG card, Story, ...) only need a render function and an entry here.
+VARIANTS = {
+    "ad": {
+        "size":        CANVAS_SIZE,
+        "product_box": (580, 580),      # max product area within 800×800
+        "render":      _render_ad,
+        "folder":      "whitlogic/composed",
+        "prefix":      "ad",
+        "quality":     85,              # JPEG
+        "formats":     ("avif", "webp", "jpeg"),
+        "label":       "Premium image",
+    },
+    "pinterest": {
+        "size":        (1000, 1500),
+        "product_box": (800, 800),
+        "render":      _render_pinterest,
+        "folder":      "whitlogic/pinterest",
+        "prefix":      "pin",
+        "quality":     88,              # JPEG — Pinterest only takes JPEG/PNG
+        "formats":     ("jpeg",),
+        "label":       "Pinterest image",
+    },
+}
+
+
+def _variant_formats(name: str) -> tuple:
+    """Encodings produced for a variant: its modern formats enabled in IMAGE_FORMATS and encodable here, then JPEG."""
+    Image.init()
+    return tuple(fmt for fmt in VARIANTS[name]["formats"]
+                 if fmt == "jpeg" or (fmt in IMAGE_FORMATS and ENCODINGS[fmt]["format"] in Image.SAVE))
+
+
+# ── Cutout cache ────────────────────────────────────────────────────────────
+# Background removal is by far the most expensive step and its result only
+# depends on the source pixels and the model, so cutouts are kept on disk
+# keyed by sha256(model + source bytes). Restyling old posts (update_old_images,
+# fix_images) then only re-composites. Oldest-used files are evicted once the
+# directory exceeds CUTOUT_CACHE_MAX_MB.
+CUTOUT_CACHE_DIR = os.path.join(CACHE_DIR, "cutouts")
+_cutout_lock     = threading.Lock()
+
+
+def _cutout_key(source_bytes: bytes, model_name: str) -> str:
+    digest = hashlib.sha256(model_name.encode("utf-8") + b"\0")
+    digest.update(source_bytes)
+    return digest.hexdigest()
+
+
+def _get_cached_cutout(key: str):
+    path = os.path.join(CUTOUT_CACHE_DIR, f"{key}.png")
+    try:
+        with Image.open(path) as cached:
+            cutout = cached.convert("RGBA")
+        os.utime(path)   # mark as recently used for eviction
+        return cutout
+    except (OSError, ValueError):
+        return None
+
+
+def _store_cutout(key: str, cutout: Image.Image) -> None:
+    if CUTOUT_CACHE_MAX_MB <= 0:
+        return
+    path = os.path.join(CUTOUT_CACHE_DIR, f"{key}.png")
+    try:
+        os.makedirs(CUTOUT_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        cutout.save(tmp_path, format="PNG", compress_level=3)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[COMPOSE] Cutout cache write failed: {e}")
+        return
+    _evict_cutouts()
+
+
+def _evict_cutouts() -> None:
+    """Deletes least-recently-used cutouts until the cache is under CUTOUT_CACHE_MAX_MB."""
+    max_bytes = CUTOUT_CACHE_MAX_MB * 1024 * 1024
+    with _cutout_lock:
+        entries, total = [], 0
+        try:
+            names = [n for n in os.listdir(CUTOUT_CACHE_DIR) if n.endswith(".png")]
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(CUTOUT_CACHE_DIR, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        if total <= max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+            if total <= max_bytes:
+                break
+
+
+# ── Upload manifest ──────────────────────────────────────────────────────────
+# Public IDs are a digest of what the render depends on, so the same product
+# always maps to the same Cloudinary asset, and CACHE_DIR/cloudinary_manifest.json
+# remembers which ones are already uploaded ({public_id: secure_url}).
+UPLOAD_MANIFEST_PATH = os.path.join(CACHE_DIR, "cloudinary_manifest.json")
+_manifest            = None
+_manifest_lock       = threading.Lock()
+
+
+def _asset_id(name: str, raw_image_url: str, title: str, fmt: str = "jpeg") -> str:
+    """Deterministic public ID (without folder) for one encoding of one variant of one product render."""
+    key = "\0".join((TEMPLATE_VERSION, name, raw_image_url, title or ""))
+    asset_id = f"{VARIANTS[name]['prefix']}_{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}"
+    return asset_id if fmt == "jpeg" else f"{asset_id}_{fmt}"
+
+
+def _load_manifest() -> dict:
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(UPLOAD_MANIFEST_PATH, "r", encoding="utf-8") as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            _manifest = {}
+    return _manifest
+
+
+def _record_upload(public_id: str, cdn_url: str) -> None:
+    with _manifest_lock:
+        manifest = _load_manifest()
+        manifest[public_id] = cdn_url
+        try:
+            os.makedirs(os.path.dirname(UPLOAD_MANIFEST_PATH), exist_ok=True)
+            tmp_path = f"{UPLOAD_MANIFEST_PATH}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, UPLOAD_MANIFEST_PATH)
+        except OSError as e:
+            print(f"[COMPOSE] Upload manifest write failed: {e}")
+
+
+def uploaded_variants(raw_image_url: str, title: str = "", variants=("ad", "pinterest")) -> dict:
+    """
+    {variant: {format: secure URL}} for the requested variants whose every
+    encoding (see _variant_formats) is already rendered and uploaded.
+    """
+    _check_variants(variants)
+    with _manifest_lock:
+        manifest = _load_manifest()
+        found = {}
+        for name in variants:
+            folder = VARIANTS[name]["folder"]
+            urls = {fmt: manifest.get(f"{folder}/{_asset_id(name, raw_image_url, title, fmt)}")
+                    for fmt in _variant_formats(name)}
+            if all(urls.values()):
+                found[name] = urls
+    return found
+
+
+def download_source(raw_image_url: str) -> bytes:
+    """Raw bytes of the source product image."""
+    resp = http_client.get(raw_image_url, timeout=15)
+    resp.raise_for_status()
+    return resp.content
+
+
+def _cutout_from_bytes(source_bytes: bytes) -> Image.Image:
+    """
+    Removes the background of an encoded product image. Segmentation results
+    are reused from the cutout cache when the same image bytes were already
+    processed by the same model.
+    """
+    rembg = _get_rembg()
+    if rembg is None:
+        return Image.open(io.BytesIO(source_bytes)).convert("RGBA")
+    remove, session, model_name = rembg
+
+    key = _cutout_key(source_bytes, model_name)
+    cutout = _get_cached_cutout(key)
+    if cutout is not None:
+        print("[COMPOSE] ♻️ Background-removed cutout served from cache.")
+        return cutout
+
+    # ── Background Removal (rembg) ───────────────────────────────────────
+    print("[COMPOSE] Applying AI background removal...")
+    started = time.perf_counter()
+    source_img = Image.open(io.BytesIO(source_bytes)).convert("RGBA")
+    cutout = remove(source_img, session=session)
+    print(f"[COMPOSE] Background removed in {time.perf_counter() - started:.1f}s.")
+    _store_cutout(key, cutout)
+    return cutout
+
+
+def _load_cutout(raw_image_url: str) -> Image.Image:
+    """Downloads the product image and removes its background (once per render job)."""
+    return _cutout_from_bytes(download_source(raw_image_url))
+
+
+def _encode_variant(name: str, product_img: Image.Image, title: str) -> dict:
+    """Renders one variant from a cutout copy and encodes it once per output format: {format: bytes}."""
+    spec   = VARIANTS[name]
+    canvas = spec["render"](product_img, title or "", spec)
+
+    encoded = {}
+    for fmt in _variant_formats(name):
+        encoding = ENCODINGS[fmt]
+        params = dict(encoding["params"], quality=spec["quality"]) if fmt == "jpeg" else encoding["params"]
+        buf = io.BytesIO()
+        canvas.save(buf, format=encoding["format"], **params)
+        encoded[fmt] = buf.getvalue()
+    return encoded
+
+
+def _upload_variant(name: str, fmt: str, data: bytes, raw_image_url: str, title: str = "") -> str:
+    """Uploads one encoding of a variant to Cloudinary under its stable public ID and returns its secure URL."""
+    spec   = VARIANTS[name]
+    asset_id = _asset_id(name, raw_image_url, title, fmt)
+    # (filename, bytes) goes into the multipart body as is — no file object to read into another copy
+    result = cloudinary.uploader.upload(
+        (f"{asset_id}.{ENCODINGS[fmt]['extension']}", data),
+        folder=spec["folder"],
+        public_id=asset_id,
+        overwrite=True,
+        resource_type="image",
     )
+    cdn_url = result.get("secure_url")
+    if not cdn_url:
+        raise ValueError("Cloudinary returned no secure_url.")
+    _record_upload(f"{spec['folder']}/{asset_id}", cdn_url)
+
+    print(f"[COMPOSE] ✅ {spec['label']} ({fmt.upper()}, {len(data) // 1024} KB) ready → {cdn_url}")
+    return cdn_url
 
-    # Merge overlay onto canvas
-    merged = Image.alpha_composite(canvas.convert("RGBA"), overlay)
-    canvas.paste(merged.convert("RGB"))
+
+def _check_variants(variants) -> None:
+    unknown = [name for name in variants if name not in VARIANTS]
+    if unknown:
+        raise ValueError(f"Unknown image variant(s): {unknown}. Known: {list(VARIANTS)}")
+
+
+def upload_encoded(encoded: dict, raw_image_url: str, title: str = "") -> dict:
+    """
+    Uploads {variant: {format: encoded bytes}} to Cloudinary concurrently.
+    Returns {variant: {format: URL}}. An encoding that failed is left out;
+    a failed JPEG maps to raw_image_url.
+    """
+    results = {name: {"jpeg": raw_image_url} for name in encoded}
+    jobs = [(name, fmt, data) for name, formats in encoded.items() for fmt, data in formats.items()]
+    if not jobs:
+        return results
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = {(name, fmt): pool.submit(_upload_variant, name, fmt, data, raw_image_url, title)
+                   for name, fmt, data in jobs}
+        for (name, fmt), future in futures.items():
+            try:
+                results[name][fmt] = future.result()
+            except cloudinary.exceptions.Error as ce:
+                print(f"[COMPOSE] Cloudinary API error for {name} {fmt} (fallback): {ce}")
+            except Exception as exc:
+                print(f"[COMPOSE] {VARIANTS[name]['label']} {fmt} upload failed ({exc}). Falling back to raw URL.")
+    return results
 
 
 # ── Public API ───────────────────────────────────────────────────────────────
 
-def compose_image(raw_image_url: str, title: str = "") -> str:
+def render_encoded(source_bytes: bytes, title: str = "", variants=("ad", "pinterest")) -> dict:
     """
-    Downloads a product image, composes a premium 800×800 ad-style graphic,
-    uploads to Cloudinary, and returns the CDN URL.
+    Pure CPU part of a render job — no network: background removal once, then
+    every requested variant rendered and encoded in each of its output formats.
+    Returns {variant: {format: bytes}}. Picklable in and out, so
+    render_worker runs it in worker processes.
+    """
+    _check_variants(variants)
+    cutout = _cutout_from_bytes(source_bytes)
+    return {name: _encode_variant(name, cutout.copy(), title) for name in variants}
 
-    Falls back gracefully to `raw_image_url` on any error.
+
+def render_sources(raw_image_url: str, title: str = "", variants=("ad", "pinterest")) -> dict:
+    """
+    One render job per product: downloads the source image and runs
+    background removal once, then renders every requested variant (see
+    VARIANTS) from that cutout, encodes it in each of its formats and uploads
+    everything to Cloudinary concurrently.
+    Variants already uploaded for the same image, title and TEMPLATE_VERSION
+    are returned from the upload manifest without rendering anything.
+    With RENDER_PROCESS_POOL on, the rendering runs in a render_worker
+    process instead of this one.
 
     Args:
         raw_image_url : Source product image URL (Amazon / any CDN)
-        title         : Product name for the bottom typography overlay
+        title         : Product name for the typography overlays
+        variants      : VARIANTS keys to produce
 
     Returns:
-        str: Cloudinary secure URL, or raw_image_url on failure.
+        dict: {variant: {format: Cloudinary secure URL}} — "jpeg" is always
+        present and maps to raw_image_url when the variant failed (or
+        Cloudinary is not configured); modern formats only when uploaded.
     """
+    _check_variants(variants)
+
+    results = {name: {"jpeg": raw_image_url} for name in variants}
     if not CLOUDINARY_URL:
         print("[COMPOSE] Cloudinary not configured. Using raw URL.")
-        return raw_image_url
+        return results
+
+    cached = uploaded_variants(raw_image_url, title, variants)
+    if cached:
+        print(f"[COMPOSE] ♻️ Already uploaded: {', '.join(cached)}.")
+        results.update(cached)
+    variants = tuple(name for name in variants if name not in cached)
+    if not variants:
+        return results
 
     try:
         print(f"[COMPOSE] Starting premium composition → {raw_image_url[:60]}…")
+        source_bytes = download_source(raw_image_url)
+        if RENDER_PROCESS_POOL:
+            import render_worker
+            encoded = render_worker.submit(source_bytes, title, variants).result()
+            results.update(upload_encoded(encoded, raw_image_url, title))
+            return results
+        cutout = _cutout_from_bytes(source_bytes)
+    except Exception as exc:
+        print(f"[COMPOSE] Composition failed ({exc}). Falling back to raw URL.")
+        return results
 
-        # ── 1. Download source image ─────────────────────────────────────
-        resp = requests.get(raw_image_url, timeout=15)
-        resp.raise_for_status()
-        source_img = Image.open(io.BytesIO(resp.content)).convert("RGBA")
+    # Each variant renders its own copy of the shared cutout, then uploads its encodings
+    copies = {name: cutout.copy() for name in variants}
 
-        # ── Background Removal (rembg) ───────────────────────────────────
-        if remove and REMBG_SESSION:
-            print("[COMPOSE] Applying AI background removal...")
-            source_img = remove(source_img, session=REMBG_SESSION)
+    def _render_and_upload(name):
+        return upload_encoded({name: _encode_variant(name, copies[name], title)}, raw_image_url, title)[name]
 
-        # ── 2. Aspect-ratio-safe resize (LANCZOS, no distortion) ─────────
-        source_img.thumbnail(
-            (580, 580),                     # max product area within 800×800
-            Image.Resampling.LANCZOS,
-        )
+    with ThreadPoolExecutor(max_workers=len(variants)) as pool:
+        futures = {name: pool.submit(_render_and_upload, name) for name in variants}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as exc:
+                print(f"[COMPOSE] {VARIANTS[name]['label']} failed ({exc}). Falling back to raw URL.")
+    return results
 
-        # ── 3. Drop-shadow / glow ────────────────────────────────────────
-        shadowed = _add_drop_shadow(source_img)
 
-        # ── 4. Premium Lifestyle Canvas ──────────────────────────────────
-        canvas = _get_random_background(CANVAS_SIZE)
+def render_variants(raw_image_url: str, title: str = "", variants=("ad", "pinterest")) -> dict:
+    """
+    Same as render_sources() but only the JPEG of each variant:
+    {variant: URL}, raw_image_url for a variant that failed.
+    """
+    return {name: urls["jpeg"] for name, urls in render_sources(raw_image_url, title, variants).items()}
 
-        # ── 5. Centre-paste the shadowed watch ───────────────────────────
-        # Convert canvas to RGBA for compositing
-        canvas_rgba = canvas.convert("RGBA")
-        sx = (CANVAS_SIZE[0] - shadowed.width)  // 2
-        sy = (CANVAS_SIZE[1] - shadowed.height) // 2 - 20  # slight upward shift
-        canvas_rgba.paste(shadowed, (sx, sy), shadowed)
-        canvas = canvas_rgba.convert("RGB")
 
-        # ── 6. Watermark ─────────────────────────────────────────────────
-        _draw_watermark(canvas)
+def picture_sources(urls: dict) -> list:
+    """
+    The modern encodings of one variant ({format: URL} from render_sources)
+    as <picture> sources, best first: [{"type": "image/avif", "url": ...}, ...].
+    The JPEG is the <img> fallback and is not included.
+    """
+    return [{"type": ENCODINGS[fmt]["mime"], "url": urls[fmt]}
+            for fmt in ENCODINGS if fmt != "jpeg" and urls.get(fmt)]
 
-        # ── 7. Text overlay ──────────────────────────────────────────────
-        _draw_text_overlay(canvas, title)
 
-        # ── 8. Encode to JPEG bytes ──────────────────────────────────────
-        buf = io.BytesIO()
-        canvas.save(buf, format="JPEG", quality=92, optimize=True)
-        buf.seek(0)
-
-        # ── 9. Upload to Cloudinary ──────────────────────────────────────
-        result = cloudinary.uploader.upload(
-            buf,
-            folder="whitlogic/composed",
-            public_id=f"ad_{abs(hash(raw_image_url))}",
-            overwrite=True,
-            resource_type="image",
-        )
-        cdn_url = result.get("secure_url")
-        if not cdn_url:
-            raise ValueError("Cloudinary returned no secure_url.")
-
-        print(f"[COMPOSE] ✅ Premium image ready → {cdn_url}")
-        return cdn_url
-
-    except cloudinary.exceptions.Error as ce:
-        print(f"[COMPOSE] Cloudinary API error (fallback): {ce}")
-        return raw_image_url
-    except Exception as exc:
-        print(f"[COMPOSE] Composition failed ({exc}). Falling back to raw URL.")
-        return raw_image_url
+def compose_image(raw_image_url: str, title: str = "") -> str:
+    """
+    Downloads a product image, composes a premium 800×800 ad-style graphic,
+    uploads to Cloudinary, and returns the CDN URL.
+
+    Falls back gracefully to `raw_image_url` on any error.
+    Use render_variants() when more than one format is needed for the same image.
+    """
+    return render_variants(raw_image_url, title, ("ad",))["ad"]
+
 
 def compose_pinterest_image(raw_image_url: str, title: str = "") -> str:
     """
     Downloads a product image, composes a 1000x1500 Pinterest-optimized graphic,
     uploads to Cloudinary, and returns the CDN URL.
     """
-    if not CLOUDINARY_URL:
-        return raw_image_url
-
-    try:
-        resp = requests.get(raw_image_url, timeout=15)
-        resp.raise_for_status()
-        source_img = Image.open(io.BytesIO(resp.content)).convert("RGBA")
-
-        # ── Background Removal (rembg) ───────────────────────────────────
-        if remove and REMBG_SESSION:
-            print("[COMPOSE] Applying AI background removal...")
-            source_img = remove(source_img, session=REMBG_SESSION)
-
-        # Resize to fit within 800x800 for the center of Pinterest image
-        source_img.thumbnail((800, 800), Image.Resampling.LANCZOS)
-        shadowed = _add_drop_shadow(source_img)
-
-        # 1000x1500 canvas
-        canvas = _get_random_background((1000, 1500))
-        
-        canvas_rgba = canvas.convert("RGBA")
-        
-        # Center the shadowed watch
-        sx = (1000 - shadowed.width) // 2
-        sy = (1500 - shadowed.height) // 2
-        canvas_rgba.paste(shadowed, (sx, sy), shadowed)
-        
-        canvas = canvas_rgba.convert("RGB")
-        draw = ImageDraw.Draw(canvas)
-
-        # Top text
-        top_font = _load_font(48, bold=True)
-        _draw_stroked_text(draw, (500, 150), "EXPERT REVIEW", font=top_font, fill=(251, 191, 36), stroke_width=3, anchor="mm")
-
-        # Bottom Plate
-        plate_h = 300
-        plate_top = 1500 - plate_h
-        
-        overlay = Image.new("RGBA", canvas.size, (0, 0, 0, 0))
-        overlay_draw = ImageDraw.Draw(overlay)
-        overlay_draw.rectangle([0, plate_top, 1000, 1500], fill=PLATE_COLOR)
-        overlay_draw.rectangle([0, plate_top, 1000, plate_top + 4], fill=(251, 191, 36, 255))
-        
-        # Button/CTA
-        btn_font = _load_font(24, bold=True)
-        overlay_draw.rounded_rectangle([350, plate_top + 180, 650, plate_top + 240], radius=30, fill=(251, 191, 36))
-        overlay_draw.text((500, plate_top + 210), "Read Full Review", font=btn_font, fill=(0,0,0), anchor="mm")
-        
-        canvas.paste(Image.alpha_composite(canvas.convert("RGBA"), overlay).convert("RGB"))
-        draw = ImageDraw.Draw(canvas)
-        
-        # Title in the bottom plate
-        title_font = _load_font(36, bold=True)
-        max_chars = 60
-        display_title = title[:max_chars].rsplit(" ", 1)[0] + "…" if len(title) > max_chars else title
-        display_title = display_title.upper()
-        
-        _draw_stroked_text(draw, (500, plate_top + 100), display_title, font=title_font, fill=(255,255,255), stroke_width=2, anchor="mm")
-
-        # Encode & Upload
-        buf = io.BytesIO()
-        canvas.save(buf, format="JPEG", quality=90, optimize=True)
-        buf.seek(0)
-
-        result = cloudinary.uploader.upload(
-            buf,
-            folder="whitlogic/pinterest",
-            public_id=f"pin_{abs(hash(raw_image_url))}",
-            overwrite=True,
-            resource_type="image",
-        )
-        print(f"[COMPOSE] ✅ Pinterest image ready → {result.get('secure_url')}")
-        return result.get("secure_url", raw_image_url)
-
-    except Exception as exc:
-        print(f"[COMPOSE] Pinterest composition failed ({exc}).")
-        return raw_image_url
-
+    return render_variants(raw_image_url, title, ("pinterest",))["pinterest"]
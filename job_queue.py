@@ -0,0 +1,245 @@
+"""
+job_queue.py
+============
+Durable per-product job queue for the publish pipeline (main.process_product),
+so a crash or a Railway restart mid-cycle doesn't throw away paid work.
+
+One row per (site, ASIN) in CACHE_DIR/job_queue.sqlite3 — point BOT_CACHE_DIR
+at a persistent volume on ephemeral hosts. Each row records the next stage to
+run and the artifacts of every completed one:
+
+    scrape  → product_data
+    ai      → article_content (schema included), social_data, faqs
+    image   → image_url, image_sources, pinterest_image_url
+    publish → post_link, wp_image_url
+    social  → (Make.com webhook sent)
+
+A job whose cycle died is picked up again by the next cycle (pending_jobs)
+and resumes at its first incomplete stage; finished stages are never re-run.
+A dry run parks its job as "dry_run" instead: it is never resumed — and so
+never published — on its own, only when a live run processes that product
+again (reusing the article already generated).
+Publish and webhook calls carry an Idempotency-Key derived from the job, so
+a request that reached the server just before a crash is recognisable as a
+repeat when the job resumes.
+
+    job = job_queue.open_job(asin, site_id=..., keyword=..., product_url=...)
+    if job_queue.needs(job, "ai"):
+        ...
+        job_queue.complete_stage(job, "ai", article_content=..., faqs=...)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from config import CACHE_DIR, JOB_MAX_ATTEMPTS, JOB_MAX_AGE_HOURS
+
+DB_PATH = os.path.join(CACHE_DIR, "job_queue.sqlite3")
+
+STAGES = ("scrape", "ai", "image", "publish", "social")
+
+_lock = threading.Lock()
+_conn = None
+
+
+def _connect():
+    """Shared connection (opened on first use); callers hold _lock."""
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+        _conn = sqlite3.connect(DB_PATH, timeout=10, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=FULL")
+        _conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                   job_id         TEXT PRIMARY KEY,
+                   site_id        TEXT NOT NULL,
+                   asin           TEXT NOT NULL,
+                   keyword        TEXT,
+                   product_url    TEXT,
+                   stage          TEXT NOT NULL,
+                   status         TEXT NOT NULL,
+                   attempts       INTEGER NOT NULL DEFAULT 0,
+                   artifacts_json TEXT NOT NULL,
+                   error          TEXT,
+                   created_at     REAL NOT NULL,
+                   updated_at     REAL NOT NULL
+               )"""
+        )
+        _conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, updated_at)")
+        _conn.commit()
+    return _conn
+
+
+def _job_id(asin, site_id=None):
+    return f"{site_id or ''}:{asin}"
+
+
+_COLUMNS = "job_id, site_id, asin, keyword, product_url, stage, status, attempts, artifacts_json, error, created_at"
+
+
+def _row_to_job(row):
+    if row is None:
+        return None
+    return {
+        "job_id":      row[0],
+        "site_id":     row[1] or None,
+        "asin":        row[2],
+        "keyword":     row[3],
+        "product_url": row[4],
+        "stage":       row[5],
+        "status":      row[6],
+        "attempts":    row[7],
+        "artifacts":   json.loads(row[8]),
+        "error":       row[9],
+        "created_at":  row[10],
+    }
+
+
+def get(asin, site_id=None):
+    """The job for `asin` on `site_id`, or None if it was never queued."""
+    try:
+        with _lock:
+            row = _connect().execute(f"SELECT {_COLUMNS} FROM jobs WHERE job_id = ?",
+                                     (_job_id(asin, site_id),)).fetchone()
+    except sqlite3.Error as e:
+        print(f"[JOBS] Read error: {e}")
+        return None
+    return _row_to_job(row)
+
+
+def open_job(asin, site_id=None, keyword=None, product_url=None):
+    """
+    Starts (or takes over) the job for a product and marks it running.
+    A new job starts at "scrape"; an existing one keeps its stage and
+    artifacts — a job that had exhausted its attempts gets a fresh set.
+    Finished jobs are returned untouched (status "done").
+    """
+    job_id, now = _job_id(asin, site_id), time.time()
+    try:
+        with _lock:
+            conn = _connect()
+            conn.execute(
+                """INSERT INTO jobs (job_id, site_id, asin, keyword, product_url, stage, status,
+                                     attempts, artifacts_json, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, 'running', 0, '{}', ?, ?)
+                   ON CONFLICT(job_id) DO UPDATE SET
+                       keyword     = COALESCE(jobs.keyword, excluded.keyword),
+                       product_url = COALESCE(jobs.product_url, excluded.product_url),
+                       attempts    = CASE WHEN jobs.status = 'failed' THEN 0 ELSE jobs.attempts END,
+                       status      = 'running',
+                       updated_at  = excluded.updated_at
+                   WHERE jobs.status != 'done'""",
+                (job_id, site_id or "", asin, keyword, product_url, STAGES[0], now, now),
+            )
+            conn.commit()
+            row = conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+    except sqlite3.Error as e:
+        # The pipeline still runs without checkpoints rather than not at all
+        print(f"[JOBS] Write error (continuing without checkpoints): {e}")
+        return {"job_id": job_id, "site_id": site_id, "asin": asin, "keyword": keyword,
+                "product_url": product_url, "stage": STAGES[0], "status": "running",
+                "attempts": 0, "artifacts": {}, "error": None, "created_at": now}
+    return _row_to_job(row)
+
+
+def _update(job, **fields):
+    fields["updated_at"] = time.time()
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    try:
+        with _lock:
+            conn = _connect()
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job["job_id"]))
+            conn.commit()
+    except sqlite3.Error as e:
+        print(f"[JOBS] Write error for {job['job_id']}: {e}")
+
+
+def needs(job, stage):
+    """True while `stage` (or an earlier one) has not completed for the job."""
+    if job["status"] == "done" or job["stage"] == "done":
+        return False
+    return STAGES.index(job["stage"]) <= STAGES.index(stage)
+
+
+def complete_stage(job, stage, **artifacts):
+    """
+    Checkpoints a finished stage: stores its artifacts and moves the job to
+    the next stage. Completing the last stage finishes the job in the same
+    write, so a crash before finish() can't leave it resumable.
+    """
+    job["artifacts"].update(artifacts)
+    idx = STAGES.index(stage) + 1
+    job["stage"] = STAGES[idx] if idx < len(STAGES) else "done"
+    job["error"] = None
+    fields = {}
+    if job["stage"] == "done":
+        job["status"] = fields["status"] = "done"
+    _update(job, stage=job["stage"], error=None, **fields,
+            artifacts_json=json.dumps(job["artifacts"], ensure_ascii=False, default=str))
+
+
+def finish(job):
+    """Marks the job done — no later cycle will touch the product again."""
+    job["status"] = "done"
+    _update(job, status="done")
+
+
+def fail(job, error):
+    """
+    Records a failed attempt at the job's current stage. The job stays
+    resumable there until it has failed JOB_MAX_ATTEMPTS times.
+    """
+    job["attempts"] += 1
+    job["error"]  = str(error)[:500]
+    job["status"] = "failed" if job["attempts"] >= JOB_MAX_ATTEMPTS else "pending"
+    _update(job, status=job["status"], attempts=job["attempts"], error=job["error"])
+
+
+def park_dry_run(job):
+    """Parks a job a dry run stopped before publishing: kept for reuse, never auto-resumed."""
+    job["status"] = "dry_run"
+    _update(job, status="dry_run")
+
+
+def release(job):
+    """Hands an unfinished job back to the queue (e.g. the cycle stops before its remaining stages)."""
+    if job["status"] == "running":
+        job["status"] = "pending"
+        _update(job, status="pending")
+
+
+def pending_jobs(site_id=None, limit=50):
+    """
+    Unfinished jobs of `site_id` to resume, oldest first: interrupted
+    ("running" when the process died) or waiting for a retry, and touched
+    within JOB_MAX_AGE_HOURS — older ones are left to expire. Dry-run jobs
+    are never listed.
+    """
+    since = time.time() - JOB_MAX_AGE_HOURS * 3600
+    try:
+        with _lock:
+            rows = _connect().execute(
+                f"""SELECT {_COLUMNS} FROM jobs
+                    WHERE site_id = ? AND status IN ('pending', 'running') AND stage != 'done'
+                      AND updated_at >= ?
+                    ORDER BY created_at LIMIT ?""",
+                (site_id or "", since, limit),
+            ).fetchall()
+    except sqlite3.Error as e:
+        print(f"[JOBS] Read error: {e}")
+        return []
+    return [_row_to_job(row) for row in rows]
+
+
+def idempotency_key(job, action):
+    """
+    Stable key for one side effect of one job ("publish", "social"): the same
+    on every retry and resume, different for a job re-created later.
+    """
+    raw = f"{job['job_id']}\0{job['created_at']!r}\0{action}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:40]
@@ -5,9 +5,8 @@ Saves them to the Supabase keyword_pool table for the bot to process.
 """
 import re
 import uuid
-import requests
 import database
-from config import SCRAPINGANT_API_KEYS
+import scrapingant_client
 
 # ── Amazon Best Seller category URLs to scrape ──
 BESTSELLER_URLS = [
@@ -23,32 +22,8 @@ BESTSELLER_URLS = [
     "https://www.amazon.com/Best-Sellers-Toys-Games/zgbs/toys-and-games/",
 ]
 
-# ── ScrapingAnt fetch helper ──
-_key_index = 0
-
-def _fetch_with_scrapingant(url: str) -> str | None:
-    """Fetches a URL via ScrapingAnt API. Rotates keys on failure."""
-    global _key_index
-    if not SCRAPINGANT_API_KEYS:
-        print("[DISCOVER] No ScrapingAnt keys configured.")
-        return None
-
-    for _ in range(len(SCRAPINGANT_API_KEYS)):
-        key = SCRAPINGANT_API_KEYS[_key_index % len(SCRAPINGANT_API_KEYS)]
-        _key_index += 1
-        try:
-            resp = requests.get(
-                "https://api.scrapingant.com/v2/general",
-                params={"url": url, "x-api-key": key, "browser": "true"},
-                timeout=45
-            )
-            if resp.status_code == 200:
-                return resp.text
-            print(f"[DISCOVER] ScrapingAnt returned {resp.status_code} for {url}")
-        except Exception as e:
-            print(f"[DISCOVER] ScrapingAnt error: {e}")
-    return None
-
+# Typical number of product titles on one Best Sellers page (sizes fetch waves)
+TITLES_PER_PAGE = 30
 
 def _extract_titles_from_html(html: str) -> list[str]:
     """Extracts ONLY real product titles from Amazon Best Seller HTML."""
@@ -119,23 +94,32 @@ def discover_keywords_from_bestsellers(limit: int = 20, custom_url: str = None)
     all_keywords = []
 
     urls_to_scrape = [custom_url] if custom_url else BESTSELLER_URLS
-    for url in urls_to_scrape:
-        if len(all_keywords) >= limit:
-            break
-        print(f"[DISCOVER] Scraping: {url}")
-        html = _fetch_with_scrapingant(url)
-        if not html:
-            print(f"[DISCOVER] Failed to fetch {url} — skipping.")
-            continue
-
-        titles = _extract_titles_from_html(html)
-        print(f"[DISCOVER] Found {len(titles)} titles from {url}")
-
-        for title in titles:
-            if len(all_keywords) >= limit:
-                break
-            kw = _title_to_keyword(title)
-            all_keywords.append(kw)
+    if not scrapingant_client.has_keys():
+        print("[DISCOVER] No ScrapingAnt keys configured.")
+        return all_keywords
+
+    # Fetch in waves sized to what `limit` still needs (~TITLES_PER_PAGE per
+    # page), so parallel fetches don't spend credits on pages we won't use.
+    pending = list(urls_to_scrape)
+    while pending and len(all_keywords) < limit:
+        wave_size = max(1, -(-(limit - len(all_keywords)) // TITLES_PER_PAGE))
+        wave, pending = pending[:wave_size], pending[wave_size:]
+        print(f"[DISCOVER] Scraping {len(wave)} page(s): {', '.join(wave)}")
+        pages = scrapingant_client.fetch_many(wave, browser=True, timeout=45)
+
+        for url, html in zip(wave, pages):
+            if not html:
+                print(f"[DISCOVER] Failed to fetch {url} — skipping.")
+                continue
+
+            titles = _extract_titles_from_html(html)
+            print(f"[DISCOVER] Found {len(titles)} titles from {url}")
+
+            for title in titles:
+                if len(all_keywords) >= limit:
+                    break
+                kw = _title_to_keyword(title)
+                all_keywords.append(kw)
 
     return all_keywords
 
@@ -1,8 +1,8 @@
-import requests
 import re
 import json
 import google.generativeai as genai
-from config import SCRAPINGANT_API_KEYS, GEMINI_API_KEYS
+import scrapingant_client
+from config import GEMINI_API_KEYS
 from ai_writer import get_current_gemini_key
 
 def scrape_and_extract_keywords(url):
@@ -11,28 +11,10 @@ def scrape_and_extract_keywords(url):
     2. Uses Gemini to analyze them and extract target keywords.
     """
     # 1. Scrape Content
-    html = ""
-    success = False
-    
     print(f" Spying on: {url}...")
-    
-    for api_key in SCRAPINGANT_API_KEYS:
-        try:
-            response = requests.get(
-                "https://api.scrapingant.com/v2/general",
-                params={'url': url, 'browser': 'true'},
-                headers={'x-api-key': api_key},
-                timeout=60
-            )
-            if response.status_code == 200:
-                html = response.text
-                success = True
-                break
-        except Exception as e:
-            print(f"Scrape error: {e}")
-            continue
-            
-    if not success:
+
+    html = scrapingant_client.fetch(url, browser=True, timeout=60)
+    if not html:
         return {"error": "Failed to scrape URL. Check validity or try again."}
 
     # 2. Extract Headings (Simple Regex)
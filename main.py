@@ -1,4 +1,6 @@
+import re
 import time
+import threading
 import scraper
 import database
 import ai_writer
@@ -6,9 +8,15 @@ import publisher
 import schema_helper
 import make_handler
 import image_composer
+import job_queue
+import render_worker
+import http_client
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from seo_utils import SEOChecker
 from niche_config import DEFAULT_NICHE, get_niche
+from config import RENDER_PROCESS_POOL
 
 # ---------------------------------------------------------------------------
 # Keyword management (file-based fallback)
@@ -84,6 +92,475 @@ def get_all_unprocessed_keywords(site_keywords=None, site_id=None):
     return unprocessed
 
 
+# ---------------------------------------------------------------------------
+# Concurrent execution helpers
+# ---------------------------------------------------------------------------
+# Per-stage caps used when products run in parallel (config['max_workers'] > 1).
+# Scrape / AI / publish are network-bound; image composition runs rembg on the
+# CPU, so it stays serial unless renders go to the render_worker process pool
+# (RENDER_PROCESS_POOL) or it is overridden via config['stage_limits'].
+DEFAULT_STAGE_LIMITS = {
+    'scrape':  2,
+    'ai':      3,
+    'image':   render_worker.worker_count() if RENDER_PROCESS_POOL else 1,
+    'publish': 2,
+}
+
+# Search-result fields that make a separate product-page scrape unnecessary
+SEARCH_DATA_FIELDS = ('title', 'price', 'rating', 'image_url')
+
+
+class CycleState:
+    """
+    Shared state for one bot cycle.
+    Products may run on worker threads, so the stats dict, the article budget
+    and the publish schedule are all guarded by a single lock.
+    """
+
+    def __init__(self, max_total_articles, stage_limits=None, start_time=None):
+        self.lock  = threading.Lock()
+        self.stats = {
+            'total_processed':    0,
+            'articles_generated': 0,
+            'articles_published': 0,
+            'errors':             0,
+        }
+        self.max_total_articles = max_total_articles
+        self.next_publish_time  = start_time or datetime.now()
+        self._reserved          = 0
+
+        limits = dict(DEFAULT_STAGE_LIMITS)
+        limits.update(stage_limits or {})
+        self._stages = {name: threading.BoundedSemaphore(max(1, int(n))) for name, n in limits.items()}
+
+    def incr(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def cap_reached(self):
+        """True once generated + in-flight articles fill the article cap."""
+        if self.max_total_articles <= 0:
+            return False
+        with self.lock:
+            return self.stats['articles_generated'] + self._reserved >= self.max_total_articles
+
+    def reserve_article(self):
+        """Claims one slot of the article cap. Returns False if the cap is full."""
+        with self.lock:
+            if self.max_total_articles > 0 and \
+                    self.stats['articles_generated'] + self._reserved >= self.max_total_articles:
+                return False
+            self._reserved += 1
+            return True
+
+    def release_article(self, generated=False):
+        """Returns a reserved slot; counts it as generated when the article was written."""
+        with self.lock:
+            self._reserved -= 1
+            if generated:
+                self.stats['articles_generated'] += 1
+            return self.stats['articles_generated']
+
+    def next_publish_slot(self, interval_minutes):
+        """Advances the shared schedule and returns the ISO publish date."""
+        with self.lock:
+            self.next_publish_time += timedelta(minutes=interval_minutes)
+            return self.next_publish_time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    @contextmanager
+    def stage(self, name):
+        """Limits how many products may run pipeline stage `name` at once."""
+        sem = self._stages.get(name)
+        if sem is None:
+            yield
+            return
+        with sem:
+            yield
+
+
+# ---------------------------------------------------------------------------
+# Single product pipeline
+# ---------------------------------------------------------------------------
+def process_product(url, product_idx, total, ctx):
+    """
+    Runs one discovered product through scrape → AI → image → publish → social.
+    `ctx` carries the cycle-wide settings; all shared counters live in
+    ctx['state'] so this is safe to call from worker threads. ctx['statuses']
+    (optional) holds DB statuses already resolved in bulk for this keyword;
+    ctx['search_records'] (optional) the search-page data for each ASIN.
+
+    Every finished stage is checkpointed in job_queue, so a product whose
+    cycle died resumes at its first incomplete stage instead of paying for
+    the scrape / AI / publish again.
+    """
+    site_id       = ctx['site_id']
+    keyword       = ctx['keyword']
+    state         = ctx['state']
+    log_function  = ctx['log']
+
+    log_function(f"\n{'-' * 70}")
+    log_function(f"[PRODUCT {product_idx}/{total}] {url}")
+    log_function(f"{'-' * 70}")
+
+    # Extract ASIN
+    asin = scraper.extract_asin(url)
+    if not asin:
+        log_function("[SKIP] Invalid Amazon URL.")
+        state.incr('errors')
+        return
+
+    job = job_queue.get(asin, site_id=site_id)
+    if job is not None and job['status'] == 'done':
+        log_function(f"[SKIP] {asin} already completed (job queue).")
+        return
+
+    # Only new articles count against the cap — a resumed job past the AI stage may always finish
+    if (job is None or job_queue.needs(job, 'ai')) and state.cap_reached():
+        log_function("[DONE] Max article limit reached. Moving to next keyword.")
+        return
+
+    if job is None:
+        # Check duplicate (pre-resolved in bulk by main() when available)
+        statuses = ctx.get('statuses') or {}
+        if asin in statuses:
+            status = statuses[asin]
+        else:
+            status = database.check_product_status(asin, site_id=site_id)
+        if status == 1:
+            log_function(f"[SKIP] {asin} already published.")
+            return
+        elif status == 0:
+            log_function(f"[RETRY] {asin} exists but not published. Retrying...")
+
+    job = job_queue.open_job(asin, site_id=site_id, keyword=keyword, product_url=url)
+    artifacts = job['artifacts']
+    if job['stage'] != job_queue.STAGES[0]:
+        log_function(f"[RESUME] {asin}: resuming at stage '{job['stage']}'.")
+        # DB writes are buffered until the keyword flush — a crash may have lost them
+        if artifacts.get('product_data'):
+            database.queue_save_product(artifacts['product_data'], site_id=site_id)
+        if artifacts.get('post_link'):
+            database.queue_product_update(asin, site_id=site_id, is_published=True, post_link=artifacts['post_link'])
+
+    try:
+        _run_product_stages(job, url, ctx)
+    except Exception as e:
+        job_queue.fail(job, e)
+        raise
+    finally:
+        # A job left unfinished without failing (article cap) stays resumable
+        job_queue.release(job)
+
+
+def _run_product_stages(job, url, ctx):
+    """The stages of process_product(); each one is skipped when the job already completed it."""
+    config        = ctx['config']
+    site_config   = ctx['site_config']
+    site_id       = ctx['site_id']
+    keyword       = ctx['keyword']
+    state         = ctx['state']
+    log_function  = ctx['log']
+    asin          = job['asin']
+    artifacts     = job['artifacts']
+
+    if job_queue.needs(job, 'ai'):
+        if not state.reserve_article():
+            log_function("[DONE] Max article limit reached. Moving to next keyword.")
+            return
+
+        generated = False
+        try:
+            product_data = artifacts.get('product_data')
+            if job_queue.needs(job, 'scrape'):
+                # Scrape product data — unless the search page already gave us everything the
+                # article needs (title, price, rating, image), which saves a browser-render credit
+                record = (ctx.get('search_records') or {}).get(asin)
+                if record and config.get('use_search_data', True) and all(record.get(k) for k in SEARCH_DATA_FIELDS):
+                    log_function("[SCRAPE] Using search-result data (product page scrape skipped).")
+                    product_data = {k: record.get(k) for k in ('asin', 'title', 'price', 'rating', 'review_count', 'image_url')}
+                    product_data['review_count'] = product_data['review_count'] or "0"
+                    product_data['product_url']  = url
+                    # Not written to scrape_cache: that tier holds full product-page scrapes only,
+                    # and the job checkpoint below already keeps this record for a resume
+                else:
+                    log_function("[SCRAPE] Fetching product data from Amazon...")
+                    with state.stage('scrape'):
+                        product_data = scraper.get_amazon_data(url)
+
+                if not product_data:
+                    log_function("[ERROR] Failed to scrape product data. Skipping.")
+                    state.incr('errors')
+                    job_queue.fail(job, "scrape failed")
+                    return
+
+                log_function(f"[SCRAPED] {product_data.get('title', 'Unknown')[:60]}")
+                log_function(f"          Price: {product_data.get('price', 'N/A')} | Rating: {product_data.get('rating', 'N/A')}")
+                job_queue.complete_stage(job, 'scrape', product_data=product_data)
+
+                # Save to DB (buffered — sent with the keyword's batch flush)
+                database.queue_save_product(product_data, site_id=site_id)
+                log_function(f"[DB] Queued save for {asin}.")
+
+            # Generate AI content
+            log_function("[AI] Generating article, social captions and FAQs...")
+
+            similar_products = None
+            if config['use_comparison']:
+                similar_products = database.get_similar_products(current_asin=asin, site_id=site_id, limit=2)
+                log_function(f"[AI] Using {len(similar_products)} similar products for comparison table.")
+
+            internal_links = None
+            if config['use_internal_links']:
+                internal_links = database.get_relevant_posts(keyword=keyword, site_id=site_id, limit=5)
+                log_function(f"[AI] Using {len(internal_links)} internal links for silo structure.")
+
+            # Article, captions and FAQs are independent Gemini calls — run them together
+            site_domain = site_config.get('domain', 'example.com') if site_config else 'example.com'
+            _tmp_post_link = f"https://{site_domain}/reviews/{product_data.get('asin','').lower()}"
+
+            brand_name = product_data.get('title', '').split(' ')[0] if product_data.get('title') else 'Brand'
+
+            with state.stage('ai'):
+                article_content, social_data, faqs = ai_writer.generate_content_bundle(
+                    product_data,
+                    similar_products,
+                    internal_links,
+                    language=config.get('language', 'English'),
+                    competitor_text=ctx['competitor_text'],
+                    affiliate_tag=site_config.get('affiliate_tracking_id') if site_config else None,
+                    niche_prompt=site_config.get('niche_prompt') if site_config else None,
+                    review_url=_tmp_post_link,
+                )
+
+            if not article_content:
+                log_function("[ERROR] AI content generation failed. Skipping.")
+                state.incr('errors')
+                job_queue.fail(job, "AI content generation failed")
+                return
+
+            generated = True
+            articles_generated = state.release_article(generated=True)
+            max_art = config['max_total_articles'] if config['max_total_articles'] > 0 else 'unlimited'
+            log_function(f"[AI] Article generated ({articles_generated}/{max_art}).")
+        finally:
+            if not generated:
+                state.release_article()
+
+        log_function("[AI] ✅ Social captions ready for all platforms.")
+        log_function(f"[AI] ✅ {len(faqs)} FAQ pairs generated.")
+
+        # SEO Analysis
+        seo_result = ctx['seo_checker'].analyze(article_content, keyword)
+        log_function(f"[SEO] Score: {seo_result['score']}/100")
+        if seo_result.get('feedback'):
+            log_function(f"[SEO] Tips: {' | '.join(seo_result['feedback'][:2])}")
+
+        # Append JSON-LD Schema
+        log_function("[SCHEMA] Generating JSON-LD schema...")
+        pros = social_data.get('pros') if isinstance(social_data, dict) else None
+        cons = social_data.get('cons') if isinstance(social_data, dict) else None
+        schema_script   = schema_helper.generate_product_schema(
+            product_data,
+            faqs=faqs,
+            brand_name=brand_name,
+            pros=pros,
+            cons=cons
+        )
+        article_content += f"\n\n{schema_script}"
+        job_queue.complete_stage(job, 'ai', article_content=article_content, social_data=social_data, faqs=faqs)
+
+    product_data    = artifacts['product_data']
+    article_content = artifacts['article_content']
+    social_data     = artifacts.get('social_data') or {}
+    faqs            = artifacts.get('faqs') or []
+
+    # ------------------------------------------------------------------
+    # Publish to Next.js / Vercel
+    # ------------------------------------------------------------------
+    if config['publish_nextjs']:
+        log_function("[PUBLISH] Publishing to Next.js API...")
+
+        # Image composition
+        if job_queue.needs(job, 'image'):
+            raw_image_url = product_data.get('image_url')
+            with state.stage('image'):
+                images = image_composer.render_sources(raw_image_url, title=product_data.get('title'),
+                                                       variants=("ad", "pinterest"))
+            job_queue.complete_stage(job, 'image',
+                                     image_url=images["ad"]["jpeg"],
+                                     image_sources=image_composer.picture_sources(images["ad"]),
+                                     pinterest_image_url=images["pinterest"]["jpeg"])
+        image_url           = artifacts['image_url']
+        image_sources       = artifacts.get('image_sources')
+        pinterest_image_url = artifacts.get('pinterest_image_url')
+
+        # Scheduling
+        publish_status   = 'publish'
+        publish_date_iso = None
+        if ctx['interval_minutes'] > 0:
+            publish_date_iso   = state.next_publish_slot(ctx['interval_minutes'])
+            publish_status     = 'future'
+            log_function(f"[SCHEDULE] Scheduled for: {publish_date_iso}")
+
+        # Build slug and brand
+        base_slug = re.sub(r'[^a-z0-9]+', '-', product_data['title'].lower()[:50]).strip('-')
+        slug      = f"{base_slug}-{asin.lower()}"
+
+        brand = product_data.get('title', '').split(' ')[0] if product_data.get('title') else 'Product Brand'
+
+        # Build affiliate link with tracking ID
+        affiliate_tag = site_config.get('affiliate_tracking_id') if site_config else None
+        if not affiliate_tag:
+            from config import AMAZON_AFFILIATE_TAG
+            affiliate_tag = AMAZON_AFFILIATE_TAG
+
+        product_link = product_data['product_url']
+        if affiliate_tag and product_link and product_link != '#':
+            sep = '&' if '?' in product_link else '?'
+            product_link_with_tag = f"{product_link}{sep}tag={affiliate_tag}"
+        else:
+            product_link_with_tag = product_link
+
+        if job_queue.needs(job, 'publish'):
+            with state.stage('publish'):
+                publish_result = publisher.publish_post(
+                    title=product_data['title'],
+                    slug=slug,
+                    content=article_content,
+                    image_url=image_url,
+                    image_sources=image_sources,
+                    model_number=asin,
+                    brand=brand,
+                    amazon_link=product_link_with_tag,
+                    faqs=faqs,
+                    site_url=site_config.get('url') if site_config else "https://whitlogic.online",
+                    idempotency_key=job_queue.idempotency_key(job, 'publish'),
+                )
+
+            if isinstance(publish_result, tuple):
+                post_link, wp_image_url = publish_result
+            else:
+                post_link    = publish_result
+                wp_image_url = image_url
+
+            if not post_link:
+                log_function("[ERROR] Publishing failed.")
+                state.incr('errors')
+                job_queue.fail(job, "publish failed")
+                state.incr('total_processed')
+                return
+
+            log_function(f"[PUBLISHED] {post_link}")
+            state.incr('articles_published')
+            job_queue.complete_stage(job, 'publish', post_link=post_link, wp_image_url=wp_image_url)
+            database.queue_product_update(asin, site_id=site_id, is_published=True, post_link=post_link)
+        post_link    = artifacts['post_link']
+        wp_image_url = artifacts.get('wp_image_url')
+
+        # Make.com social media webhook
+        if config['trigger_n8n'] and job_queue.needs(job, 'social'):
+            log_function("[MAKE] Triggering Make.com social media automation...")
+            make_image = wp_image_url or image_url or "https://dummyimage.com/800x800/eee/333.jpg&text=Product"
+
+            # ── Add Amazon Affiliate Tag to product URL ──
+            affiliate_tag = site_config.get('affiliate_tracking_id') if site_config else None
+            if not affiliate_tag:
+                from config import AMAZON_AFFILIATE_TAG
+                affiliate_tag = AMAZON_AFFILIATE_TAG
+
+            product_link = product_data.get('product_url', '')
+            if affiliate_tag and product_link:
+                sep = '&' if '?' in product_link else '?'
+                product_link = f"{product_link}{sep}tag={affiliate_tag}"
+
+            # ── Payload must match Make.com webhook field names ──
+            make_payload = {
+                "title":            product_data.get('title', ''),
+                "url":              post_link,
+                "imageUrl":         make_image,
+                "pinterestImageUrl": pinterest_image_url,
+                "amazonUrl":        product_link,
+                "keyword":          keyword,
+                "brand":            brand,
+                "fb_content":       social_data.get('fb_content', ''),
+                "pin_title":        social_data.get('pin_title', ''),
+                "pin_desc":         social_data.get('pin_desc', ''),
+                "ig_content":       social_data.get('ig_content', ''),
+                "linkedin_content": social_data.get('linkedin_content', ''),
+            }
+            webhook_url = None
+            if site_config:
+                webhook_url = site_config.get('make_webhook_url') or site_config.get('n8n_webhook')
+
+            make_success = make_handler.send_to_make_webhook(
+                make_payload, webhook_url=webhook_url,
+                idempotency_key=job_queue.idempotency_key(job, 'social'),
+            )
+
+            if make_success:
+                log_function("[MAKE] Webhook triggered — content sent to all social platforms.")
+                job_queue.complete_stage(job, 'social')
+            else:
+                log_function("[WARNING] Make.com webhook failed. Check logs.")
+                state.incr('errors')
+                job_queue.fail(job, "Make.com webhook failed")
+                state.incr('total_processed')
+                return
+
+        job_queue.finish(job)
+    else:
+        # The article stays checkpointed but is not queued: a later live cycle must not publish
+        # it on its own — only a live run that processes this product again reuses it
+        job_queue.park_dry_run(job)
+        log_function("[DRY RUN] Skipping Next.js publishing (user preference).")
+
+    state.incr('total_processed')
+
+
+def _product_logger(log_function, product_idx):
+    """Prefixes log lines so interleaved output from parallel products stays readable."""
+    def _log(message):
+        lead = len(message) - len(message.lstrip("\n"))
+        log_function(f"{message[:lead]}[P{product_idx}] {message[lead:]}")
+    return _log
+
+
+def _run_products(items, config, state, log_function, max_workers, stop_at_cap=True):
+    """
+    Runs (url, ctx) pairs through process_product — on a thread pool when
+    max_workers > 1, otherwise one by one with the per-product delay.
+    """
+    total = len(items)
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="product") as pool:
+            futures = {
+                pool.submit(
+                    process_product, url, product_idx, total,
+                    dict(ctx, log=_product_logger(log_function, product_idx)),
+                ): url
+                for product_idx, (url, ctx) in enumerate(items, 1)
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    log_function(f"[ERROR] Product worker crashed ({futures[future]}): {e}")
+                    state.incr('errors')
+    else:
+        for product_idx, (url, ctx) in enumerate(items, 1):
+
+            if stop_at_cap and state.cap_reached():
+                log_function("[DONE] Max article limit reached. Moving to next keyword.")
+                break
+
+            process_product(url, product_idx, total, ctx)
+
+            # Delay between products
+            if product_idx < total and config['delay_between_products'] > 0:
+                log_function(f"[WAIT] {config['delay_between_products']}s before next product...")
+                time.sleep(config['delay_between_products'])
+
+
 # ---------------------------------------------------------------------------
 # Main bot function
 # ---------------------------------------------------------------------------
@@ -109,6 +586,7 @@ def main(config=None, log_function=print, site_config=None):
                 'delay_between_products': 5,
                 'delay_between_keywords': 10,
                 'language':               'English',
+                'max_workers':            int(os.getenv("AUTO_MAX_WORKERS", "3")),
             }
         else:
             config = get_user_preferences()
@@ -126,6 +604,7 @@ def main(config=None, log_function=print, site_config=None):
             if 'publishing_rules' in settings:
                 config['max_total_articles'] = settings['publishing_rules'].get('articles_per_day', config['max_total_articles'])
                 config['delay_between_products'] = settings['publishing_rules'].get('delay_between_posts_minutes', config['delay_between_products']) * 60 # Convert min to sec
+                config['max_workers'] = settings['publishing_rules'].get('parallel_products', config.get('max_workers', 1))
                 
             if 'distribution' in settings:
                 config['publish_nextjs'] = settings['distribution'].get('publish_to_blog', config['publish_nextjs'])
@@ -148,29 +627,36 @@ def main(config=None, log_function=print, site_config=None):
     site_keywords = site_config.get('keywords', []) if site_config else None
     unprocessed_keywords = get_all_unprocessed_keywords(site_keywords, site_id=site_id)
 
-    if not unprocessed_keywords:
+    # Product jobs an earlier cycle left unfinished (crash / restart / failed publish)
+    resumable_jobs = job_queue.pending_jobs(site_id=site_id)
+
+    if not unprocessed_keywords and not resumable_jobs:
         log_function("[ERROR] No new keywords to process. Please add keywords to Supabase keyword_pool.")
         return
 
+    # Load the background-removal model while the first products are scraped
+    # and written, so the first composed image doesn't wait for it
+    if config['publish_nextjs']:
+        threading.Thread(target=image_composer.warmup, name="rembg-warmup", daemon=True).start()
+
     keywords_to_process = unprocessed_keywords
     log_function(
         f"[QUEUE] {len(unprocessed_keywords)} unprocessed keyword(s). "
         f"Target: process {config['max_keywords']} successfully."
     )
 
-    # Track statistics
-    stats = {
-        'total_processed':    0,
-        'articles_generated': 0,
-        'articles_published': 0,
-        'errors':             0,
-    }
+    # Track statistics (shared with worker threads through CycleState)
+    max_workers = max(1, int(config.get('max_workers', 1) or 1))
+    state = CycleState(config['max_total_articles'], stage_limits=config.get('stage_limits'))
+    stats = state.stats
 
     seo_checker        = SEOChecker()
-    next_publish_time  = datetime.now()
     interval_minutes   = config.get('interval_minutes', 0)
     processed_count    = 0
 
+    if max_workers > 1:
+        log_function(f"[PARALLEL] Processing up to {max_workers} products at once (per-product delay disabled).")
+
     # Skyscraper / competitor mode
     global_competitor_text = None
     if config.get('competitor_url'):
@@ -185,7 +671,28 @@ def main(config=None, log_function=print, site_config=None):
             log_function(f"[ERROR] Competitor scraping error: {e}")
 
     # ------------------------------------------------------------------
-    # 3. Process each keyword
+    # 3. Resume unfinished product jobs at their first incomplete stage
+    # ------------------------------------------------------------------
+    if resumable_jobs:
+        log_function(f"[RESUME] {len(resumable_jobs)} unfinished product job(s) from an earlier cycle.")
+        resume_ctx = {
+            'config':           config,
+            'site_config':      site_config,
+            'site_id':          site_id,
+            'state':            state,
+            'seo_checker':      seo_checker,
+            'competitor_text':  global_competitor_text,
+            'interval_minutes': interval_minutes,
+            'log':              log_function,
+        }
+        _run_products(
+            [(job['product_url'], dict(resume_ctx, keyword=job['keyword'] or '')) for job in resumable_jobs],
+            config, state, log_function, max_workers, stop_at_cap=False,
+        )
+        database.flush_writes()
+
+    # ------------------------------------------------------------------
+    # 4. Process each keyword
     # ------------------------------------------------------------------
     for keyword_idx, keyword in enumerate(keywords_to_process, 1):
 
@@ -193,7 +700,7 @@ def main(config=None, log_function=print, site_config=None):
             log_function(f"[DONE] Reached keyword limit ({config['max_keywords']}). Finishing batch.")
             break
 
-        if config['max_total_articles'] > 0 and stats['articles_generated'] >= config['max_total_articles']:
+        if state.cap_reached():
             log_function(f"[DONE] Reached max article limit ({config['max_total_articles']}). Stopping.")
             break
 
@@ -211,275 +718,54 @@ def main(config=None, log_function=print, site_config=None):
         niche_info = get_niche(active_niche)
         log_function(f"[NICHE] Active niche: '{active_niche}' ({niche_info['display_name']})")
 
-        # Search Amazon using the active niche
-        discovered_urls = scraper.search_amazon(
-            keyword,
-            limit=config['products_per_keyword'],
-            niche_key=active_niche,
-        )
+        # Search Amazon using the active niche — every organic result, in ranking order
+        search_results = scraper.search_amazon_results(keyword, limit=None, niche_key=active_niche)
 
-        if not discovered_urls:
+        if not search_results:
             log_function(f"[SKIP] No products found for '{keyword}'.")
             mark_keyword_processed(keyword)
-            try:
-                database.mark_keyword_completed_in_pool(keyword, site_id=site_id)
-            except Exception:
-                pass
+            database.queue_keyword_completed(keyword, site_id=site_id)
             continue
 
-        log_function(f"[FOUND] {len(discovered_urls)} product(s) discovered.")
-
-        # Process each product for this keyword
-        for product_idx, url in enumerate(discovered_urls, 1):
-
-            if config['max_total_articles'] > 0 and stats['articles_generated'] >= config['max_total_articles']:
-                log_function("[DONE] Max article limit reached. Moving to next keyword.")
-                break
-
-            log_function(f"\n{'-' * 70}")
-            log_function(f"[PRODUCT {product_idx}/{len(discovered_urls)}] {url}")
-            log_function(f"{'-' * 70}")
-
-            # Extract ASIN
-            asin = scraper.extract_asin(url)
-            if not asin:
-                log_function("[SKIP] Invalid Amazon URL.")
-                stats['errors'] += 1
-                continue
-
-            # Check duplicate
-            status = database.check_product_status(asin, site_id=site_id)
-            if status == 1:
-                log_function(f"[SKIP] {asin} already published.")
-                continue
-            elif status == 0:
-                log_function(f"[RETRY] {asin} exists but not published. Retrying...")
-
-            # Scrape product data
-            log_function("[SCRAPE] Fetching product data from Amazon...")
-            product_data = scraper.get_amazon_data(url)
-
-            if not product_data:
-                log_function("[ERROR] Failed to scrape product data. Skipping.")
-                stats['errors'] += 1
-                continue
-
-            log_function(f"[SCRAPED] {product_data.get('title', 'Unknown')[:60]}")
-            log_function(f"          Price: {product_data.get('price', 'N/A')} | Rating: {product_data.get('rating', 'N/A')}")
-
-            # Save to DB
-            database.save_product(product_data, site_id=site_id)
-            log_function(f"[DB] Saved/Updated {asin}.")
-
-            # Generate AI content
-            log_function("[AI] Generating article content...")
-
-            similar_products = None
-            if config['use_comparison']:
-                similar_products = database.get_similar_products(current_asin=asin, site_id=site_id, limit=2)
-                log_function(f"[AI] Using {len(similar_products)} similar products for comparison table.")
-
-            internal_links = None
-            if config['use_internal_links']:
-                internal_links = database.get_relevant_posts(keyword=keyword, site_id=site_id, limit=5)
-                log_function(f"[AI] Using {len(internal_links)} internal links for silo structure.")
-
-            article_content, social_data = ai_writer.generate_article(
-                product_data,
-                similar_products,
-                internal_links,
-                language=config.get('language', 'English'),
-                competitor_text=global_competitor_text,
-                affiliate_tag=site_config.get('affiliate_tracking_id') if site_config else None,
-                niche_prompt=site_config.get('niche_prompt') if site_config else None
-            )
-
-            if not article_content:
-                log_function("[ERROR] AI content generation failed. Skipping.")
-                stats['errors'] += 1
-                continue
-
-            stats['articles_generated'] += 1
-            max_art = config['max_total_articles'] if config['max_total_articles'] > 0 else 'unlimited'
-            log_function(f"[AI] Article generated ({stats['articles_generated']}/{max_art}).")
-
-            # Generate platform-specific social media captions
-            log_function("[AI] Generating platform-specific social media captions...")
-            
-            site_domain = site_config.get('domain', 'example.com') if site_config else 'example.com'
-            _tmp_post_link = f"https://{site_domain}/reviews/{product_data.get('asin','').lower()}"
-            
-            brand_name = product_data.get('title', '').split(' ')[0] if product_data.get('title') else 'Brand'
-            
-            social_captions = ai_writer.generate_social_captions(
-                title=product_data.get('title', ''),
-                brand=brand_name,
-                amazon_url=product_data.get('product_url', ''),
-                review_url=_tmp_post_link,
-                niche_prompt=site_config.get('niche_prompt') if site_config else None
-            )
-            # Merge AI captions over any social_data from article generation
-            if social_data and isinstance(social_data, dict):
-                social_data.update(social_captions)
-            else:
-                social_data = social_captions
-            log_function("[AI] ✅ Social captions ready for all platforms.")
-
-            # Generate FAQs for rich snippets
-            log_function("[AI] Generating FAQ rich snippets...")
-            faqs = ai_writer.generate_faqs(
-                title=product_data.get('title', ''),
-                brand=brand_name,
-                model_number=asin,
-                niche_prompt=site_config.get('niche_prompt') if site_config else None
-            )
-            log_function(f"[AI] ✅ {len(faqs)} FAQ pairs generated.")
-
-            # SEO Analysis
-            seo_result = seo_checker.analyze(article_content, keyword)
-            log_function(f"[SEO] Score: {seo_result['score']}/100")
-            if seo_result.get('feedback'):
-                log_function(f"[SEO] Tips: {' | '.join(seo_result['feedback'][:2])}")
-
-            # Append JSON-LD Schema
-            log_function("[SCHEMA] Generating JSON-LD schema...")
-            pros = social_data.get('pros') if isinstance(social_data, dict) else None
-            cons = social_data.get('cons') if isinstance(social_data, dict) else None
-            schema_script   = schema_helper.generate_product_schema(
-                product_data,
-                faqs=faqs,
-                brand_name=brand_name,
-                pros=pros,
-                cons=cons
-            )
-            article_content += f"\n\n{schema_script}"
-
-            # ------------------------------------------------------------------
-            # Publish to Next.js / Vercel
-            # ------------------------------------------------------------------
-            if config['publish_nextjs']:
-                log_function("[PUBLISH] Publishing to Next.js API...")
-
-                # Image composition
-                raw_image_url = product_data.get('image_url')
-                image_url     = image_composer.compose_image(raw_image_url, title=product_data.get('title'))
-                pinterest_image_url = image_composer.compose_pinterest_image(raw_image_url, title=product_data.get('title'))
-
-                # Scheduling
-                publish_status   = 'publish'
-                publish_date_iso = None
-                if interval_minutes > 0:
-                    next_publish_time += timedelta(minutes=interval_minutes)
-                    publish_date_iso   = next_publish_time.strftime("%Y-%m-%dT%H:%M:%S")
-                    publish_status     = 'future'
-                    log_function(f"[SCHEDULE] Scheduled for: {publish_date_iso}")
-
-                # Build slug and brand
-                import re
-                base_slug = re.sub(r'[^a-z0-9]+', '-', product_data['title'].lower()[:50]).strip('-')
-                slug      = f"{base_slug}-{asin.lower()}"
-
-                brand = product_data.get('title', '').split(' ')[0] if product_data.get('title') else 'Product Brand'
-
-                # Build affiliate link with tracking ID
-                affiliate_tag = site_config.get('affiliate_tracking_id') if site_config else None
-                if not affiliate_tag:
-                    from config import AMAZON_AFFILIATE_TAG
-                    affiliate_tag = AMAZON_AFFILIATE_TAG
-
-                product_link = product_data['product_url']
-                if affiliate_tag and product_link and product_link != '#':
-                    sep = '&' if '?' in product_link else '?'
-                    product_link_with_tag = f"{product_link}{sep}tag={affiliate_tag}"
-                else:
-                    product_link_with_tag = product_link
-
-                publish_result = publisher.publish_post(
-                    title=product_data['title'],
-                    slug=slug,
-                    content=article_content,
-                    image_url=image_url,
-                    model_number=asin,
-                    brand=brand,
-                    amazon_link=product_link_with_tag,
-                    faqs=faqs,
-                    site_url=site_config.get('url') if site_config else "https://whitlogic.online"
-                )
-
-                if isinstance(publish_result, tuple):
-                    post_link, wp_image_url = publish_result
-                else:
-                    post_link    = publish_result
-                    wp_image_url = image_url
-
-                if post_link:
-                    log_function(f"[PUBLISHED] {post_link}")
-                    stats['articles_published'] += 1
-                    database.mark_as_published(asin, site_id=site_id)
-                    database.update_post_link(asin, post_link, site_id=site_id)
-
-                    # Make.com social media webhook
-                    if config['trigger_n8n']:
-                        log_function("[MAKE] Triggering Make.com social media automation...")
-                        make_image = wp_image_url or image_url or "https://dummyimage.com/800x800/eee/333.jpg&text=Product"
-
-                        # ── Add Amazon Affiliate Tag to product URL ──
-                        affiliate_tag = site_config.get('affiliate_tracking_id') if site_config else None
-                        if not affiliate_tag:
-                            from config import AMAZON_AFFILIATE_TAG
-                            affiliate_tag = AMAZON_AFFILIATE_TAG
-                            
-                        product_link = product_data.get('product_url', '')
-                        if affiliate_tag and product_link:
-                            sep = '&' if '?' in product_link else '?'
-                            product_link = f"{product_link}{sep}tag={affiliate_tag}"
-
-                        # ── Payload must match Make.com webhook field names ──
-                        make_payload = {
-                            "title":            product_data.get('title', ''),
-                            "url":              post_link,
-                            "imageUrl":         make_image,
-                            "pinterestImageUrl": pinterest_image_url,
-                            "amazonUrl":        product_link,
-                            "keyword":          keyword,
-                            "brand":            brand,
-                            "fb_content":       social_data.get('fb_content', ''),
-                            "pin_title":        social_data.get('pin_title', ''),
-                            "pin_desc":         social_data.get('pin_desc', ''),
-                            "ig_content":       social_data.get('ig_content', ''),
-                            "linkedin_content": social_data.get('linkedin_content', ''),
-                        }
-                        webhook_url = None
-                        if site_config:
-                            webhook_url = site_config.get('make_webhook_url') or site_config.get('n8n_webhook')
-                            
-                        make_success = make_handler.send_to_make_webhook(make_payload, webhook_url=webhook_url)
-
-                        if make_success:
-                            log_function("[MAKE] Webhook triggered — content sent to all social platforms.")
-                        else:
-                            log_function("[WARNING] Make.com webhook failed. Check logs.")
-                            stats['errors'] += 1
-
-                else:
-                    log_function("[ERROR] Publishing failed.")
-                    stats['errors'] += 1
-            else:
-                log_function("[DRY RUN] Skipping Next.js publishing (user preference).")
+        log_function(f"[FOUND] {len(search_results)} product(s) discovered.")
+
+        # Bulk duplicate pre-check: one query (or none, via the local cache).
+        # Already-published products are dropped before any scrape credit is
+        # spent, and the next-ranked results fill their slots.
+        statuses = database.check_product_statuses([r['asin'] for r in search_results], site_id=site_id)
+        candidates = [r for r in search_results if statuses.get(r['asin']) != 1]
+        if len(candidates) < len(search_results):
+            log_function(f"[SKIP] {len(search_results) - len(candidates)} already published.")
+        candidates = candidates[:config['products_per_keyword']]
+        if not candidates:
+            mark_keyword_processed(keyword)
+            database.queue_keyword_completed(keyword, site_id=site_id)
+            continue
 
-            stats['total_processed'] += 1
+        discovered_urls = [r['product_url'] for r in candidates]
+        log_function(f"[QUEUE] {len(discovered_urls)} product(s) to process (search ranks {[r['position'] for r in candidates]}).")
+
+        ctx = {
+            'config':           config,
+            'site_config':      site_config,
+            'site_id':          site_id,
+            'keyword':          keyword,
+            'state':            state,
+            'seo_checker':      seo_checker,
+            'competitor_text':  global_competitor_text,
+            'interval_minutes': interval_minutes,
+            'statuses':         statuses,
+            'search_records':   {r['asin']: r for r in candidates},
+            'log':              log_function,
+        }
 
-            # Delay between products
-            if product_idx < len(discovered_urls) and config['delay_between_products'] > 0:
-                log_function(f"[WAIT] {config['delay_between_products']}s before next product...")
-                time.sleep(config['delay_between_products'])
+        # Process each product for this keyword
+        _run_products([(url, ctx) for url in discovered_urls], config, state, log_function, max_workers)
 
-        # Mark keyword as done
+        # Mark keyword as done and send this keyword's buffered DB writes in one batch
         mark_keyword_processed(keyword)
-        try:
-            database.mark_keyword_completed_in_pool(keyword, site_id=site_id)
-        except Exception:
-            pass
+        database.queue_keyword_completed(keyword, site_id=site_id)
+        database.flush_writes()
         log_function(f"[KW DONE] '{keyword}' completed.")
         log_function(f"[STATS] Generated: {stats['articles_generated']} | Published: {stats['articles_published']}")
 
@@ -489,6 +775,9 @@ def main(config=None, log_function=print, site_config=None):
 
         processed_count += 1
 
+    # Anything still buffered (skipped keywords, failed flushes)
+    database.flush_writes()
+
     # ------------------------------------------------------------------
     # Final Summary
     # ------------------------------------------------------------------
@@ -548,6 +837,7 @@ def get_user_preferences():
         'publish_nextjs':         ask_bool("Publish to Next.js API?", default=True),
         'delay_between_products': ask_int("Delay between products (sec)?", default=3, min_val=0, max_val=60),
         'delay_between_keywords': ask_int("Delay between keywords (sec)?", default=5, min_val=0, max_val=120),
+        'max_workers':            ask_int("Parallel product workers (1=sequential)?", default=1, min_val=1, max_val=8),
     }
 
     if config['publish_nextjs']:
@@ -572,14 +862,14 @@ def get_user_preferences():
 # ---------------------------------------------------------------------------
 def send_telegram_alert(message: str):
     """Sends a Telegram message if TELEGRAM_TOKEN and TELEGRAM_CHAT_ID are set."""
-    import os, requests as _req
+    import os
     token   = os.getenv("TELEGRAM_TOKEN", "")
     chat_id = os.getenv("TELEGRAM_CHAT_ID", "")
     if not token or not chat_id:
         print(f"[TELEGRAM] Skipped — token={'SET' if token else 'MISSING'}, chat_id={'SET' if chat_id else 'MISSING'}")
         return
     try:
-        resp = _req.post(
+        resp = http_client.post(
             f"https://api.telegram.org/bot{token}/sendMessage",
             json={"chat_id": chat_id, "text": message, "parse_mode": "HTML"},
             timeout=10
@@ -616,6 +906,7 @@ def run_autopilot():
         'trigger_n8n':            True,
         'delay_between_products': 5,
         'delay_between_keywords': 10,
+        'max_workers':            int(os.getenv("AUTO_MAX_WORKERS", "3")),
     }
 
     print("=" * 60)
@@ -623,6 +914,7 @@ def run_autopilot():
     print(f"  Cycle interval : every {interval_hours:.0f} hours")
     print(f"  Keywords/cycle : {auto_config['max_keywords']}")
     print(f"  Articles/cycle : {auto_config['max_total_articles']}")
+    print(f"  Workers        : {auto_config['max_workers']}")
     print("  Press Ctrl+C to stop.")
     print("=" * 60)
 
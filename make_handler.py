@@ -1,15 +1,18 @@
 import requests
+import http_client
 import json
 import time
 from config import MAKE_WEBHOOK_URL
 
-def send_to_make_webhook(payload, webhook_url=None):
+def send_to_make_webhook(payload, webhook_url=None, idempotency_key=None):
     """
     Sends the article data and social content to Make.com webhook.
     
     Args:
         payload (dict): The data to send.
         webhook_url (str, optional): Override default webhook URL.
+        idempotency_key (str, optional): Sent as the Idempotency-Key header
+            (and "idempotencyKey" field) so the scenario can drop repeats.
             
     Returns:
         bool: True if successful, False otherwise.
@@ -31,8 +34,11 @@ def send_to_make_webhook(payload, webhook_url=None):
         headers = {
             "Content-Type": "application/json"
         }
+        if idempotency_key:
+            headers["Idempotency-Key"] = idempotency_key
+            payload = dict(payload, idempotencyKey=idempotency_key)
         
-        response = requests.post(
+        response = http_client.post(
             target_url, 
             json=payload, 
             headers=headers, 
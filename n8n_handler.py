@@ -1,4 +1,5 @@
 import requests
+import http_client
 import json
 import re
 from config import N8N_WEBHOOK_URL
@@ -63,7 +64,7 @@ def trigger_n8n_workflow(title, amazon_link, image_url, social_caption, category
         print(f"📡 Sending data to n8n webhook: {target_url}")
         print(f"   Payload: title='{title[:50]}...', description='{description[:50]}...'")
         
-        response = requests.post(target_url, json=payload, timeout=90)  # Increased timeout for AI processing
+        response = http_client.post(target_url, json=payload, timeout=90)  # Increased timeout for AI processing
         
         if response.status_code == 200:
             try:
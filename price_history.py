@@ -0,0 +1,138 @@
+"""
+price_history.py
+================
+Append-only price history for every tracked ASIN plus a vectorized deal
+engine over it.
+
+Storage: CACHE_DIR/price_history.bin — fixed-size binary records
+(asin, checked_at, price) written with numpy tofile(); one run appends one
+block, nothing is rewritten. 22 bytes per observation, so a few hundred
+products checked twice a day stay well under a megabyte per year.
+
+Deal detection (evaluate_deals) is one numpy pass over the whole file: for
+each ASIN the latest observation is compared with its rolling window
+(PRICE_HISTORY_WINDOW_DAYS) of earlier prices — window min, median and the
+share of the window priced below the current price. ASINs with too little
+history fall back to "N% below the published price".
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from config import CACHE_DIR, PRICE_HISTORY_WINDOW_DAYS
+
+HISTORY_PATH = os.path.join(CACHE_DIR, "price_history.bin")
+
+RECORD_DTYPE = np.dtype([("asin", "S10"), ("checked_at", "<f8"), ("price", "<f4")])
+
+DEAL_MIN_DISCOUNT  = 5      # % below the window median (or published price)
+DEAL_MAX_PERCENTILE = 25    # current price must sit in the cheapest 25% of the window
+DEAL_MIN_POINTS    = 3      # earlier observations needed before the window is trusted
+
+_lock = threading.Lock()
+
+
+def append(observations):
+    """Appends (asin, checked_at, price) tuples to the history file."""
+    observations = [(a, t, p) for a, t, p in observations if a and p]
+    if not observations:
+        return
+    records = np.array(observations, dtype=RECORD_DTYPE)
+    with _lock:
+        os.makedirs(os.path.dirname(HISTORY_PATH), exist_ok=True)
+        with open(HISTORY_PATH, "ab") as f:
+            records.tofile(f)
+
+
+def load(since=None):
+    """Every stored observation (structured array), optionally only those after `since`."""
+    with _lock:
+        try:
+            size = os.path.getsize(HISTORY_PATH)
+        except OSError:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        # A torn final record (crash mid-append) is ignored rather than misaligning the rest
+        records = np.fromfile(HISTORY_PATH, dtype=RECORD_DTYPE, count=size // RECORD_DTYPE.itemsize)
+    if since is not None:
+        records = records[records["checked_at"] >= since]
+    return records
+
+
+def evaluate_deals(baselines=None, now=None, window_days=None):
+    """
+    Deal state for every ASIN in the history, from its latest observation.
+
+    baselines: {asin: published price} used when an ASIN has fewer than
+    DEAL_MIN_POINTS earlier observations in the window.
+
+    Returns {asin: {"is_deal", "discount", "price", "window_min",
+    "window_median", "percentile", "points"}} — discount is a "N%" string
+    (vs the window median, or the baseline on fallback) or None.
+    """
+    baselines = baselines or {}
+    now = time.time() if now is None else now
+    window_days = PRICE_HISTORY_WINDOW_DAYS if window_days is None else window_days
+    records = load(since=now - window_days * 86400)
+    if not len(records):
+        return {}
+
+    asins, group = np.unique(records["asin"], return_inverse=True)
+    prices = records["price"].astype(np.float64)
+
+    # Latest observation per ASIN = its current price; everything before it is the window
+    by_time = np.lexsort((records["checked_at"], group))
+    counts  = np.bincount(group, minlength=len(asins))
+    latest  = by_time[np.cumsum(counts) - 1]
+    current = prices[latest]
+
+    window = np.ones(len(records), dtype=bool)
+    window[latest] = False
+    w_group, w_price = group[window], prices[window]
+    points = np.bincount(w_group, minlength=len(asins))
+
+    # Window min / median per ASIN from one (asin, price) sort
+    by_price = np.lexsort((w_price, w_group))
+    sorted_price = w_price[by_price]
+    starts = np.cumsum(points) - points
+    has_window = points > 0
+    safe_starts = np.where(has_window, starts, 0)
+    window_min = np.full(len(asins), np.nan)
+    window_median = np.full(len(asins), np.nan)
+    if len(sorted_price):
+        window_min[has_window] = sorted_price[safe_starts[has_window]]
+        lo = safe_starts + np.maximum(points - 1, 0) // 2
+        hi = safe_starts + points // 2
+        window_median[has_window] = (sorted_price[lo[has_window]] + sorted_price[hi[has_window]]) / 2
+
+    # Share of the window priced strictly below the current price
+    below = np.bincount(w_group, weights=(w_price < current[w_group]), minlength=len(asins))
+    percentile = np.where(has_window, below / np.maximum(points, 1) * 100, np.nan)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        median_discount = (window_median - current) / window_median * 100
+    trusted = points >= DEAL_MIN_POINTS
+    window_deal = trusted & (median_discount >= DEAL_MIN_DISCOUNT) & (percentile <= DEAL_MAX_PERCENTILE)
+
+    baseline = np.array([baselines.get(a.decode(), np.nan) or np.nan for a in asins], dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        baseline_discount = (baseline - current) / baseline * 100
+    fallback_deal = ~trusted & (baseline_discount >= DEAL_MIN_DISCOUNT)
+
+    is_deal  = window_deal | fallback_deal
+    discount = np.where(trusted, median_discount, baseline_discount)
+
+    results = {}
+    for i, asin in enumerate(asins):
+        results[asin.decode()] = {
+            "is_deal":       bool(is_deal[i]),
+            "discount":      f"{int(discount[i])}%" if is_deal[i] else None,
+            "price":         round(float(current[i]), 2),
+            "window_min":    None if np.isnan(window_min[i]) else round(float(window_min[i]), 2),
+            "window_median": None if np.isnan(window_median[i]) else round(float(window_median[i]), 3),
+            "percentile":    None if np.isnan(percentile[i]) else round(float(percentile[i]), 1),
+            "points":        int(points[i]),
+        }
+    return results
@@ -1,9 +1,44 @@
-import requests
-import time
+"""
+price_tracker.py
+================
+Live price tracker for published reviews — an incremental scheduler rather
+than a full sequential sweep:
+
+  • streams published products from Supabase page by page
+  • ranks them by time since last check × observed price volatility
+    (never-checked products first) and scrapes only as many as the
+    per-run credit budget allows (PRICE_TRACKER_CREDIT_BUDGET)
+  • scrapes in concurrent batches through scrapingant_client (per-key caps)
+  • appends every scraped price to price_history and judges deals for the
+    whole catalogue in one vectorized pass over that history (window
+    median / min / percentile instead of "5% below the first-seen price")
+  • PATCHes the website only when a product's deal state actually changes
+
+Per-product state (last check, last price, volatility, deal flag) lives in
+CACHE_DIR/price_tracker_state.json and is saved after every batch, so an
+interrupted run resumes where it stopped and successive runs rotate through
+the whole catalogue.
+"""
+
+import heapq
+import json
+import os
 import re
-from config import NEXT_API_URL, BOT_API_SECRET
+import time
+
+import http_client
 import scraper
 import database
+import scrapingant_client
+import price_history
+from config import (NEXT_API_URL, BOT_API_SECRET, CACHE_DIR, PRICE_TRACKER_CREDIT_BUDGET,
+                    PRICE_TRACKER_MIN_RECHECK_HOURS, PRICE_TRACKER_BATCH_SIZE)
+
+STATE_PATH = os.path.join(CACHE_DIR, "price_tracker_state.json")
+
+VOLATILITY_WEIGHT = 20      # a product moving 5% per check is re-checked 2x as often
+VOLATILITY_DECAY  = 0.7     # EWMA factor for the relative price change per check
+
 
 def parse_price(price_str):
     """Extracts numeric value from a price string like '$19.99' or '£19.99'."""
@@ -17,103 +52,195 @@ def parse_price(price_str):
             return None
     return None
 
-def check_prices():
-    print("=" * 60)
-    print("🔥 STARTING LIVE PRICE TRACKER")
-    print("=" * 60)
-    
-    # Get published products from Supabase
+
+def load_state():
     try:
-        url = f"{database.SUPABASE_URL}/rest/v1/products?is_published=eq.true&select=asin,title,price,product_url"
-        response = requests.get(url, headers=database.get_headers(), timeout=10)
-        products = response.json()
-    except Exception as e:
-        print(f"[ERROR] Failed to fetch products from DB: {e}")
-        return
-
-    print(f"Found {len(products)} published products to track.")
-    
-    for idx, prod in enumerate(products, 1):
-        asin = prod.get('asin')
-        old_price_str = prod.get('price')
-        url = prod.get('product_url')
-        
-        old_price = parse_price(old_price_str)
-        if not old_price or not url:
-            print(f"[{idx}/{len(products)}] Skipping {asin} - Invalid old price or URL.")
+        with open(STATE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state):
+    try:
+        os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+        tmp_path = f"{STATE_PATH}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, STATE_PATH)
+    except OSError as e:
+        print(f"[PRICE] Warning: could not save state: {e}")
+
+
+def priority(entry, now):
+    """
+    Higher = check sooner. Hours since the last check, boosted for products
+    whose price tends to move. None when the product was checked too recently.
+    """
+    if not entry or not entry.get("last_checked"):
+        return float("inf")
+    hours = (now - entry["last_checked"]) / 3600
+    if hours < PRICE_TRACKER_MIN_RECHECK_HOURS:
+        return None
+    return hours * (1 + VOLATILITY_WEIGHT * entry.get("volatility", 0.0))
+
+
+def select_products(state, budget_items, now):
+    """
+    Streams published products and keeps the `budget_items` most urgent ones
+    (bounded heap — memory stays O(budget), not O(catalogue)).
+    """
+    heap, seen, total = [], set(), 0
+    for prod in database.iter_published_products():
+        asin = prod.get("asin")
+        if not asin or asin in seen:
+            continue
+        seen.add(asin)
+        total += 1
+        if not parse_price(prod.get("price")) or not prod.get("product_url"):
+            continue
+        score = priority(state.get(asin), now)
+        if score is None:
             continue
-            
-        print(f"[{idx}/{len(products)}] Checking {asin} (Old: {old_price_str})...")
-        
-        # Scrape current data
-        new_data = scraper.get_amazon_data(url)
+        item = (score, total, prod)
+        if len(heap) < budget_items:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+    ranked = [prod for _, _, prod in sorted(heap, key=lambda i: i[:2], reverse=True)]
+    return ranked, total
+
+
+def push_deal_state(asin, is_deal, discount_str):
+    """PATCHes the website's deal flag. True on success."""
+    headers = {
+        'Content-Type': 'application/json',
+        'x-bot-api-secret': BOT_API_SECRET
+    }
+    payload = {
+        "modelNumber": asin,
+        "isDeal": is_deal,
+        "discountPercentage": discount_str
+    }
+    try:
+        res = http_client.patch(NEXT_API_URL, headers=headers, json=payload, timeout=10)
+        if res.status_code == 200:
+            return True
+        print(f"  [API ERROR] {asin}: {res.status_code}: {res.text[:200]}")
+    except Exception as e:
+        print(f"  [API ERROR] {asin}: {e}")
+    return False
+
+
+def record_check(entry, new_price, now):
+    """Updates last check / last price / volatility for one scraped product."""
+    last_price = entry.get("last_price")
+    if last_price:
+        change = abs(new_price - last_price) / last_price
+        entry["volatility"] = VOLATILITY_DECAY * entry.get("volatility", 0.0) + (1 - VOLATILITY_DECAY) * change
+    entry["last_price"]   = new_price
+    entry["last_checked"] = now
+    entry["checks"]       = entry.get("checks", 0) + 1
+
+
+def process_batch(batch, state, counters):
+    """Scrapes one batch concurrently, records prices in state and price_history."""
+    pages = scraper.get_amazon_data_many([prod["product_url"] for prod in batch])
+    now = time.time()
+    observations = []
+    for prod in batch:
+        asin = prod["asin"]
+        entry = state.setdefault(asin, {})
+        entry["baseline"] = parse_price(prod["price"])
+        new_data = pages.get(prod["product_url"])
         if not new_data:
+            # Left due: retried first next run
+            counters["failed"] += 1
             print(f"  [ERROR] Failed to scrape {asin}.")
-            time.sleep(3)
             continue
-            
-        new_price_str = new_data.get('price')
-        new_price = parse_price(new_price_str)
-        
+        new_price = parse_price(new_data.get("price"))
         if not new_price:
-            print(f"  [WARNING] Could not parse new price for {asin}: {new_price_str}")
-            time.sleep(3)
+            # Counted as checked so an unavailable listing doesn't hog the queue
+            entry["last_checked"] = now
+            counters["failed"] += 1
+            print(f"  [WARNING] Could not parse new price for {asin}: {new_data.get('price')}")
+            continue
+
+        record_check(entry, new_price, now)
+        observations.append((asin, now, new_price))
+        counters["checked"] += 1
+    price_history.append(observations)
+
+
+def sync_deals(state, counters):
+    """
+    Evaluates every tracked product against its price history in one pass and
+    PATCHes the website for the ones whose deal state changed. A product whose
+    observations all aged out of the window has no current price to back a
+    deal, so a deal still published for it is cleared.
+    """
+    baselines = {asin: entry.get("baseline") for asin, entry in state.items()}
+    verdicts  = price_history.evaluate_deals(baselines)
+    for asin, verdict in verdicts.items():
+        entry = state.get(asin)
+        if entry is None:
             continue
-            
-        print(f"  Current: {new_price_str}")
-        
-        if new_price < old_price:
-            discount = ((old_price - new_price) / old_price) * 100
-            if discount >= 5: # Only flag if discount is at least 5%
-                discount_str = f"{int(discount)}%"
-                print(f"  🔥 DEAL FOUND! {discount_str} OFF!")
-                
-                # Update Next.js API
-                try:
-                    patch_url = NEXT_API_URL
-                    headers = {
-                        'Content-Type': 'application/json',
-                        'x-bot-api-secret': BOT_API_SECRET
-                    }
-                    payload = {
-                        "modelNumber": asin,
-                        "isDeal": True,
-                        "discountPercentage": discount_str
-                    }
-                    res = requests.patch(patch_url, headers=headers, json=payload, timeout=10)
-                    if res.status_code == 200:
-                        print("  [API] Successfully updated Deal status on website!")
-                    else:
-                        print(f"  [API ERROR] {res.status_code}: {res.text}")
-                except Exception as e:
-                    print(f"  [API ERROR] {e}")
+        is_deal, discount_str = verdict["is_deal"], verdict["discount"]
+        if is_deal:
+            counters["deals"] += 1
+        if "deal" in entry and entry["deal"] == is_deal and entry.get("discount") == discount_str:
+            continue
+        if push_deal_state(asin, is_deal, discount_str):
+            entry["deal"], entry["discount"] = is_deal, discount_str
+            counters["patched"] += 1
+            if is_deal:
+                median = verdict["window_median"] or entry.get("baseline")
+                print(f"  [API] {asin}: 🔥 DEAL {discount_str} OFF (${verdict['price']:.2f} vs ${median:.2f})")
             else:
-                print(f"  Minor drop ({int(discount)}%), ignoring.")
-        else:
-            print("  No deal.")
-            
-            # Optionally remove deal if price went back up
-            if new_price >= old_price:
-                try:
-                    patch_url = NEXT_API_URL
-                    headers = {
-                        'Content-Type': 'application/json',
-                        'x-bot-api-secret': BOT_API_SECRET
-                    }
-                    payload = {
-                        "modelNumber": asin,
-                        "isDeal": False,
-                        "discountPercentage": None
-                    }
-                    requests.patch(patch_url, headers=headers, json=payload, timeout=10)
-                except:
-                    pass
-
-        time.sleep(4) # Delay to respect rate limits
+                print(f"  [API] {asin}: deal cleared (${verdict['price']:.2f})")
+
+    for asin, entry in state.items():
+        if asin in verdicts or not entry.get("deal"):
+            continue
+        if push_deal_state(asin, False, None):
+            entry["deal"], entry["discount"] = False, None
+            counters["patched"] += 1
+            print(f"  [API] {asin}: deal expired (no price check in the last {price_history.PRICE_HISTORY_WINDOW_DAYS:g} days)")
+
+
+def check_prices(credit_budget=None, batch_size=None):
+    """
+    One tracker run: checks the most urgent published products that fit into
+    `credit_budget` ScrapingAnt credits (default PRICE_TRACKER_CREDIT_BUDGET).
+    """
+    print("=" * 60)
+    print("🔥 STARTING LIVE PRICE TRACKER")
+    print("=" * 60)
+
+    credit_budget = PRICE_TRACKER_CREDIT_BUDGET if credit_budget is None else credit_budget
+    batch_size    = batch_size or PRICE_TRACKER_BATCH_SIZE
+    budget_items  = max(0, int(credit_budget // scrapingant_client.credit_cost(browser=True)))
+
+    state = load_state()
+    products, total = select_products(state, budget_items, time.time())
+    print(f"Found {total} published products; {len(products)} due for a check "
+          f"(budget {credit_budget} credits ≈ {budget_items} scrapes).")
+
+    counters = {"checked": 0, "failed": 0, "deals": 0, "patched": 0}
+    for start in range(0, len(products), batch_size):
+        batch = products[start:start + batch_size]
+        print(f"[{start + len(batch)}/{len(products)}] Checking {len(batch)} product(s)...")
+        process_batch(batch, state, counters)
+        save_state(state)
+
+    sync_deals(state, counters)
+    save_state(state)
 
     print("=" * 60)
-    print("✅ PRICE TRACKING COMPLETE")
+    print(f"✅ PRICE TRACKING COMPLETE — checked {counters['checked']}, failed {counters['failed']}, "
+          f"deals {counters['deals']}, website updates {counters['patched']}")
     print("=" * 60)
+    return counters
 
 if __name__ == "__main__":
     database.init_db()
@@ -1,4 +1,5 @@
 import requests
+import http_client
 import time
 from config import NEXT_API_URL, BOT_API_SECRET
 
@@ -10,7 +11,7 @@ def ping_google_sitemap(domain_url: str = "https://whitlogic.online"):
             base_url = f"https://{base_url}"
         sitemap_url = f"{base_url}/sitemap.xml"
         ping_url = f"https://www.google.com/ping?sitemap={sitemap_url}"
-        response = requests.get(ping_url, timeout=10)
+        response = http_client.get(ping_url, timeout=10)
         if response.status_code == 200:
             print(f" [SEO] Successfully pinged Google with new sitemap.")
         else:
@@ -25,7 +26,7 @@ def publish_to_nextjs_with_retry(post_data, headers, max_retries=3):
     for attempt in range(max_retries):
         try:
             print(f" Publishing to Next.js API: {NEXT_API_URL} (Attempt {attempt + 1}/{max_retries})")
-            response = requests.post(NEXT_API_URL, json=post_data, headers=headers, timeout=15)
+            response = http_client.post(NEXT_API_URL, json=post_data, headers=headers, timeout=15)
             
             if response.status_code in [200, 201]:
                 return response
@@ -60,15 +61,24 @@ def detect_category(title: str, keyword: str = '') -> str:
     return 'tactical'
 
 
-def publish_post(title, slug, content, image_url, model_number, brand, amazon_link, faqs=None, keyword='', site_url: str = "https://whitlogic.online"):
+def publish_post(title, slug, content, image_url, model_number, brand, amazon_link, faqs=None, keyword='', site_url: str = "https://whitlogic.online",
+                 image_sources=None, idempotency_key=None):
     """
     Creates a new post via the Next.js Custom API endpoint.
+
+    image_sources: modern encodings of the cover image for a <picture> element,
+    best first — [{"type": "image/avif", "url": ...}, ...] (see
+    image_composer.picture_sources). image_url stays the JPEG fallback.
+    idempotency_key: sent as the Idempotency-Key header on every attempt, so
+    the API can recognise a retried or resumed publish of the same post.
     """
     try:
         headers = {
             'Content-Type': 'application/json',
             'x-bot-api-secret': BOT_API_SECRET
         }
+        if idempotency_key:
+            headers['Idempotency-Key'] = idempotency_key
         
         post_data = {
             'title': title,
@@ -82,6 +92,8 @@ def publish_post(title, slug, content, image_url, model_number, brand, amazon_li
 
         if faqs:
             post_data['faqs'] = faqs
+        if image_sources:
+            post_data['imageSources'] = image_sources
         
         response = publish_to_nextjs_with_retry(post_data, headers)
         
@@ -0,0 +1,133 @@
+"""
+render_worker.py
+================
+Process pool for the CPU-bound part of image composition (background
+removal, PIL resizes, shadow blur, stroked text, AVIF/WebP/JPEG encoding),
+so renders run on every core instead of serialising on the bot's GIL.
+
+A job is plain data — source image bytes + title + variant names — and the
+result is {variant: {format: bytes}}; downloads and Cloudinary uploads stay in
+the calling process (threads), only pixels cross the process boundary.
+
+    import render_worker
+    encoded = render_worker.submit(source_bytes, title, ("ad",)).result()
+
+    for job, urls in render_worker.compose_many(jobs):   # bulk re-imaging
+        ...
+
+Each worker loads its own rembg session on first use; ONNX Runtime threads
+per worker are set to cores / workers so the pool doesn't oversubscribe the
+CPU (unless REMBG_THREADS is set explicitly). Workers are spawned, never
+forked, so a parent that already holds an ONNX session stays safe.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import image_composer
+from config import RENDER_WORKERS, REMBG_THREADS
+
+IO_THREADS = 8      # concurrent downloads / uploads in compose_many()
+
+_pool      = None
+_pool_lock = threading.Lock()
+
+
+def worker_count() -> int:
+    return RENDER_WORKERS or os.cpu_count() or 1
+
+
+def _init_worker(onnx_threads: int) -> None:
+    if not REMBG_THREADS:
+        os.environ["OMP_NUM_THREADS"] = str(onnx_threads)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                workers = worker_count()
+                onnx_threads = max(1, (os.cpu_count() or 1) // workers)
+                print(f"[RENDER] Starting {workers} render worker process(es), "
+                      f"{onnx_threads} ONNX thread(s) each.")
+                _pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(onnx_threads,),
+                )
+    return _pool
+
+
+def submit(source_bytes: bytes, title: str = "", variants=("ad", "pinterest")):
+    """Queues one render job; the Future resolves to {variant: {format: bytes}}."""
+    return _get_pool().submit(image_composer.render_encoded, source_bytes, title or "", tuple(variants))
+
+
+def compose_many(jobs, variants=("ad",)):
+    """
+    Bulk render pipeline: downloads (threads) → render (process pool) →
+    Cloudinary upload (threads), all three stages overlapping.
+
+    jobs: iterable of (key, raw_image_url, title).
+    Yields ((key, raw_image_url, title), {variant: {format: URL}}) as each
+    job finishes, in completion order — the shape of
+    image_composer.render_sources(); a failed variant is
+    {"jpeg": raw_image_url}. Jobs whose variants are all in the upload
+    manifest are yielded without any work.
+    """
+    jobs = list(jobs)
+    if not image_composer.CLOUDINARY_URL:
+        print("[RENDER] Cloudinary not configured. Using raw URLs.")
+        for job in jobs:
+            yield job, {name: {"jpeg": job[1]} for name in variants}
+        return
+
+    pool = _get_pool()
+    with ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix="render-io") as io_pool:
+        # One wait loop over every in-flight future: each job moves to its next
+        # stage the moment its current one finishes, so job A can upload while
+        # job B renders and job C is still downloading.
+        in_flight, cached = {}, []
+        for job in jobs:
+            # Variants already uploaded for this image + title are never re-rendered
+            done = image_composer.uploaded_variants(job[1], job[2] or "", variants)
+            missing = tuple(name for name in variants if name not in done)
+            if not missing:
+                cached.append((job, done))
+                continue
+            in_flight[io_pool.submit(image_composer.download_source, job[1])] = ("download", job, done, missing)
+
+        # Every download is queued before the consumer sees a result
+        yield from cached
+
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage, job, done, missing = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    print(f"[RENDER] {stage.capitalize()} failed for {job[0]}: {exc}")
+                    yield job, {name: done.get(name, {"jpeg": job[1]}) for name in variants}
+                    continue
+                if stage == "download":
+                    render = pool.submit(image_composer.render_encoded, result, job[2] or "", missing)
+                    in_flight[render] = ("render", job, done, missing)
+                elif stage == "render":
+                    upload = io_pool.submit(image_composer.upload_encoded, result, job[1], job[2] or "")
+                    in_flight[upload] = ("upload", job, done, missing)
+                else:
+                    yield job, {**done, **result}
+
+
+def shutdown() -> None:
+    """Stops the worker processes (end of a bulk run / process shutdown)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
@@ -6,7 +6,7 @@ Loop নেই — GitHub Actions নিজেই প্রতি 6 ঘন্ট
 import os
 import sys
 import traceback
-import requests
+import http_client
 import json
 
 # Ensure UTF-8 output
@@ -28,7 +28,7 @@ def load_active_sites() -> list[dict]:
             "apikey": SUPABASE_KEY,
             "Authorization": f"Bearer {SUPABASE_KEY}"
         }
-        r = requests.get(url, headers=headers, timeout=10)
+        r = http_client.get(url, headers=headers, timeout=10)
         if r.status_code == 200:
             return r.json()
         print(f"[ERROR] Could not load sites: {r.text}")
@@ -111,16 +111,11 @@ if __name__ == "__main__":
             config.GEMINI_API_KEYS = GEMINI_API_KEYS
             ai_writer.GEMINI_API_KEYS = GEMINI_API_KEYS
             
+        import scrapingant_client
         if site.get("scrapingant_api_key"):
-            import keyword_discoverer
-            import scraper
-            keyword_discoverer.SCRAPINGANT_API_KEYS = [site.get("scrapingant_api_key")]
-            scraper.SCRAPINGANT_API_KEYS = [site.get("scrapingant_api_key")]
+            scrapingant_client.set_api_keys([site.get("scrapingant_api_key")])
         else:
-            import keyword_discoverer
-            import scraper
-            keyword_discoverer.SCRAPINGANT_API_KEYS = SCRAPINGANT_API_KEYS
-            scraper.SCRAPINGANT_API_KEYS = SCRAPINGANT_API_KEYS
+            scrapingant_client.set_api_keys(SCRAPINGANT_API_KEYS)
 
         # Base config merged with site specific
         site_config_dict = {
@@ -133,6 +128,7 @@ if __name__ == "__main__":
             'trigger_n8n':            True,
             'delay_between_products': 5,
             'delay_between_keywords': 10,
+            'max_workers':            site.get("max_workers") or int(os.getenv("AUTO_MAX_WORKERS", "3")),
         }
 
         try:
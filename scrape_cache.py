@@ -0,0 +1,145 @@
+"""
+scrape_cache.py
+===============
+Persistent cache of Amazon product-page scrapes (one ScrapingAnt browser
+render = one paid credit, ~10-60s), keyed by ASIN.
+
+Each row keeps the raw HTML (zlib-compressed, for re-parsing) plus the parsed
+fields split into two freshness tiers:
+
+  • static   — title, images, brand, bullets  → SCRAPE_CACHE_STATIC_TTL_HOURS
+  • volatile — price, rating, review count     → SCRAPE_CACHE_PRICE_TTL_MINUTES
+
+Callers pick what they need:
+    get(asin, freshness="fresh_price")  → only if price/rating are still fresh
+    get(asin, freshness="any")          → any row whose static fields are fresh
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from config import CACHE_DIR, SCRAPE_CACHE_STATIC_TTL_HOURS, SCRAPE_CACHE_PRICE_TTL_MINUTES
+
+DB_PATH = os.path.join(CACHE_DIR, "scrape_cache.sqlite3")
+
+VOLATILE_FIELDS = ("price", "rating", "review_count", "availability")
+FRESHNESS_TIERS = ("fresh_price", "any")
+
+_lock     = threading.Lock()
+_conn     = None
+_counters = {"hits": 0, "misses": 0, "stores": 0}
+
+
+def _connect():
+    """Shared connection (opened and pruned on first use); callers hold _lock."""
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+        _conn = sqlite3.connect(DB_PATH, timeout=10, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute(
+            """CREATE TABLE IF NOT EXISTS product_pages (
+                   asin          TEXT PRIMARY KEY,
+                   product_url   TEXT,
+                   html_z        BLOB,
+                   static_json   TEXT NOT NULL,
+                   volatile_json TEXT NOT NULL,
+                   static_at     REAL NOT NULL,
+                   volatile_at   REAL NOT NULL
+               )"""
+        )
+        _conn.execute(
+            "DELETE FROM product_pages WHERE static_at < ?",
+            (time.time() - SCRAPE_CACHE_STATIC_TTL_HOURS * 3600,),
+        )
+        _conn.commit()
+    return _conn
+
+
+def get(asin, freshness="fresh_price"):
+    """
+    Cached product dict for `asin` (same shape scraper.get_amazon_data returns),
+    or None when nothing usable is cached for the requested freshness tier.
+    """
+    if freshness not in FRESHNESS_TIERS:
+        raise ValueError(f"freshness must be one of {FRESHNESS_TIERS}, got {freshness!r}")
+    if not asin or SCRAPE_CACHE_STATIC_TTL_HOURS <= 0:
+        return None
+
+    now = time.time()
+    try:
+        with _lock:
+            row = _connect().execute(
+                "SELECT static_json, volatile_json, static_at, volatile_at FROM product_pages WHERE asin = ?",
+                (asin,),
+            ).fetchone()
+    except sqlite3.Error as e:
+        print(f"[SCRAPE:cache] Read error: {e}")
+        return None
+
+    usable = (
+        row is not None
+        and now - row[2] < SCRAPE_CACHE_STATIC_TTL_HOURS * 3600
+        and (freshness == "any" or now - row[3] < SCRAPE_CACHE_PRICE_TTL_MINUTES * 60)
+    )
+    with _lock:
+        _counters["hits" if usable else "misses"] += 1
+    if not usable:
+        return None
+
+    data = json.loads(row[0])
+    data.update(json.loads(row[1]))
+    data["cached_at"]       = row[2]
+    data["price_cached_at"] = row[3]
+    return data
+
+
+def get_html(asin):
+    """Raw HTML of the last scrape of `asin` (for re-parsing), or None."""
+    try:
+        with _lock:
+            row = _connect().execute("SELECT html_z FROM product_pages WHERE asin = ?", (asin,)).fetchone()
+    except sqlite3.Error:
+        return None
+    if not row or row[0] is None:
+        return None
+    return zlib.decompress(row[0]).decode("utf-8", errors="replace")
+
+
+def put(asin, data, html=None):
+    """Stores a fresh scrape: parsed fields (split by tier) plus compressed HTML."""
+    if not asin or not data or SCRAPE_CACHE_STATIC_TTL_HOURS <= 0:
+        return
+    volatile = {k: data[k] for k in VOLATILE_FIELDS if k in data}
+    static   = {k: v for k, v in data.items() if k not in VOLATILE_FIELDS and k not in ("cached_at", "price_cached_at")}
+    html_z   = zlib.compress(html.encode("utf-8"), 6) if html else None
+    now      = time.time()
+    try:
+        with _lock:
+            conn = _connect()
+            conn.execute(
+                """INSERT INTO product_pages (asin, product_url, html_z, static_json, volatile_json, static_at, volatile_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(asin) DO UPDATE SET
+                       product_url   = excluded.product_url,
+                       html_z        = COALESCE(excluded.html_z, product_pages.html_z),
+                       static_json   = excluded.static_json,
+                       volatile_json = excluded.volatile_json,
+                       static_at     = excluded.static_at,
+                       volatile_at   = excluded.volatile_at""",
+                (asin, data.get("product_url"), html_z, json.dumps(static), json.dumps(volatile), now, now),
+            )
+            conn.commit()
+            _counters["stores"] += 1
+    except sqlite3.Error as e:
+        print(f"[SCRAPE:cache] Write error: {e}")
+
+
+def stats():
+    """Hit/miss/store counters for this process."""
+    with _lock:
+        return dict(_counters)
@@ -1,6 +1,7 @@
 import re
-import requests
-from config import SCRAPINGANT_API_KEYS
+import scrape_cache
+import amazon_parser
+import scrapingant_client
 from niche_config import get_niche, DEFAULT_NICHE
 
 def extract_asin(url):
@@ -11,138 +12,70 @@ def extract_asin(url):
         return match.group(1)
     return None
 
-def get_amazon_data(product_url):
+def get_amazon_data(product_url, freshness="fresh_price"):
     """
     Scrapes Amazon product data using ScrapingAnt with key rotation.
     Returns a dictionary of product data or None if all keys fail.
+
+    freshness (see scrape_cache):
+        "fresh_price" — reuse a cached scrape only while price/rating are fresh
+        "any"         — reuse any cached scrape whose static fields are fresh
+        None          — always spend a ScrapingAnt credit
     """
     asin = extract_asin(product_url)
     if not asin:
         print(f"Could not extract ASIN from {product_url}")
         return None
 
-    for api_key in SCRAPINGANT_API_KEYS:
-        print(f"Trying with key: {api_key[:5]}...") # Log partial key for safety
-        
-        try:
-            # Construct the request to ScrapingAnt
-            # api_url = "https://api.scrapingant.com/v2/general"
-            # params = {
-            #     'url': product_url,
-            #     'x-api-key': api_key,
-            #     'browser': 'true' 
-            # }
-            # Note: The prompt asked to send request to https://api.scrapingant.com/v2/general
-            # But the user also said "with params {'url': product_url, 'browser': 'true'}".
-            # Usually the key is a header or query param. 
-            # ScrapingAnt docs usually use x-api-key header or key query param.
-            # I will follow standard practice and put key in header or assume it's part of auth.
-            # Looking at prompt: "Import SCRAPINGANT_API_KEYS... For each key, send a request..."
-            # Let's use the 'x-api-key' header approach for cleaner code, 
-            # or pass it as a query param if that's what the endpoint requires.
-            # Common pattern is headers={'x-api-key': key}.
-            
-            response = requests.get(
-                "https://api.scrapingant.com/v2/general",
-                params={
-                    'url': product_url,
-                    'browser': 'true'
-                },
-                headers={
-                    'x-api-key': api_key
-                },
-                timeout=60 # Add a timeout
-            )
-
-            if response.status_code == 200:
-                html = response.text
-                
-                # Simple parsing logic (This is a simplified example as requested)
-                # In a real scenario, we would use BeautifulSoup.
-                # Since the user said "Parse HTML", I'll add a minimal BS4 parser here 
-                # or just regex if dependencies are strict. 
-                # The user added `requests` to requirements but didn't explicitly say `beautifulsoup4`.
-                # BUT "Act as a Senior Python Developer" -> I should probably use BS4 or regex.
-                # However, the user prompt Step 1 didn't include bs4. I'll stick to regex or simple parsing to be safe,
-                # BUT robust scraping needs parsing. I'll stick to Regex/String manipulation as per "standard libraries" implication 
-                # OR just add bs4 implicitly? 
-                # Re-reading prompt: "Create requirements.txt with: requests, google-generativeai, python-dotenv (optional), and standard libraries."
-                # It didn't forbid other libs but listed specific ones. 
-                # I'll use regex for now to stick strictly to the prompt's implied minimal env, 
-                # but adding bs4 would be better. I'll stick to regex to be safe with the "standard libraries" constraint 
-                # unless I want to be "proactive". 
-                # Let's try to do it with Regex to minimize external deps if not asked.
-                
-                # Placeholder parsing logic using Regex
-                title_match = re.search(r'<span id="productTitle"[^>]*>(.*?)</span>', html, re.DOTALL)
-                if not title_match:
-                    title_match = re.search(r'<h1[^>]*id="title"[^>]*>(.*?)</h1>', html, re.DOTALL)
-                if not title_match:
-                    title_match = re.search(r'<title>(.*?)</title>', html, re.DOTALL)
-                price_match = re.search(r'<span class="a-offscreen">([^<]+)</span>', html)
-                rating_match = re.search(r'<span class="a-icon-alt">([^<]+)</span>', html)
-                review_count_match = re.search(r'<span id="acrCustomerReviewText"[^>]*>([^<]+)</span>', html)
-                image_match = re.search(r'"hiRes":"([^"]+)"', html) # Common in Amazon JSON data embedded in page
-
-                title = title_match.group(1).strip() if title_match else "Unknown Title"
-                # Clean up title if it contains "Amazon.com:" prefix (common in <title> tag)
-                title = title.replace("Amazon.com:", "").replace(" : Clothing, Shoes & Jewelry", "").strip()
-                price = price_match.group(1).strip() if price_match else "N/A"
-                rating = rating_match.group(1).strip() if rating_match else "N/A"
-                review_count = review_count_match.group(1).strip() if review_count_match else "0"
-                image_url = image_match.group(1).strip() if image_match else None
-                
-                # If image not found in JSON, try regex on img tag (less reliable dynamic)
-                if not image_url:
-                     # Try landingImage (common on many pages)
-                     image_match_alt = re.search(r'<img[^>]+id="landingImage"[^>]+src="([^"]+)"', html)
-                     if image_match_alt:
-                         image_url = image_match_alt.group(1)
-                     else:
-                         # Try imgBlkFront (books/media)
-                         image_match_blk = re.search(r'<img[^>]+id="imgBlkFront"[^>]+src="([^"]+)"', html)
-                         if image_match_blk:
-                             image_url = image_match_blk.group(1)
+    if freshness:
+        cached = scrape_cache.get(asin, freshness=freshness)
+        if cached:
+            print(f"[SCRAPE:cache] ♻️ {asin} served from cache ({freshness}) — no credit spent.")
+            cached["product_url"] = product_url
+            return cached
 
-                return {
-                    "asin": asin,
-                    "title": title,
-                    "price": price,
-                    "rating": rating,
-                    "review_count": review_count,
-                    "image_url": image_url,
-                    "product_url": product_url
-                }
+    html = scrapingant_client.fetch(product_url, browser=True, timeout=60)
+    if not html:
+        print("All keys failed.")
+        return None
 
-            elif response.status_code in [429, 402]:
-                print(f"Key {api_key[:5]} exhausted (Status {response.status_code}). Switching...")
-                continue
-            
-            else:
-                print(f"Error {response.status_code}: {response.reason}")
-                # Don't switch keys for 500s or 404s, just log? 
-                # Prompt says: "If other errors: Log them." -> It implies we might retry or just fail for this key?
-                # "If all keys fail, return None". 
-                # So we should probably continue to next key only on specific errors, 
-                # but if it's a 404 (product not found), switching keys won't help.
-                # However, for simplicity and robustness against "soft" blocks that look like 503s, 
-                # we might just return None immediately for 404, but continue for others?
-                # Prompt only explicitly says continue on 429/402. 
-                # I will just log and NOT continue (break?) or just let the loop finish?
-                # Actually "If all keys fail" implies we try them all? 
-                # No, "If status is ... 429 ... continue". 
-                # "If other errors ... Log them". It doesn't say continue.
-                # So I will assume we abort this attempt for this URL if it's a non-retriable error e.g. 404.
-                # But let's be safe: if it's a 5xx, maybe try another key?
-                # For now, I'll stick to the prompt: only continue on 429/402.
-                pass 
+    product = amazon_parser.parse_product_page(html, asin, product_url)
+    scrape_cache.put(asin, product, html=html)
+    return product
 
-        except Exception as e:
-            print(f"Exception with key {api_key[:5]}: {e}")
+def get_amazon_data_many(product_urls, freshness="fresh_price"):
+    """
+    Batch get_amazon_data(): cache hits are served locally, every miss is
+    scraped concurrently through scrapingant_client.fetch_many().
+    Returns {product_url: product dict or None}.
+    """
+    results, to_fetch, hits = {}, {}, 0
+    for url in product_urls:
+        asin = extract_asin(url)
+        if not asin:
+            print(f"Could not extract ASIN from {url}")
+            results[url] = None
             continue
-
-    print("All keys failed.")
-    return None
+        cached = scrape_cache.get(asin, freshness=freshness) if freshness else None
+        if cached:
+            cached["product_url"] = url
+            results[url] = cached
+            hits += 1
+        else:
+            to_fetch[url] = asin
+
+    if hits:
+        print(f"[SCRAPE:cache] ♻️ {hits} of {len(results) + len(to_fetch)} product(s) served from cache ({freshness}).")
+
+    pages = scrapingant_client.fetch_many(list(to_fetch), browser=True, timeout=60)
+    for (url, asin), html in zip(to_fetch.items(), pages):
+        if not html:
+            results[url] = None
+            continue
+        product = amazon_parser.parse_product_page(html, asin, url)
+        scrape_cache.put(asin, product, html=html)
+        results[url] = product
+    return results
 
 def scrape_competitor_text(url):
     """
@@ -150,39 +83,30 @@ def scrape_competitor_text(url):
     Returns truncated text suitable for AI context.
     """
     print(f" Scraping Competitor: {url}")
-    for api_key in SCRAPINGANT_API_KEYS:
-        try:
-            response = requests.get(
-                "https://api.scrapingant.com/v2/general",
-                params={'url': url, 'browser': 'true'}, # Javascript support for modern blogs
-                headers={'x-api-key': api_key},
-                timeout=60
-            )
-            if response.status_code == 200:
-                html = response.text
-                # Simple cleanup: Remove scripts, styles, nav, footer
-                clean_text = re.sub(r'<(script|style|nav|footer|header).*?>.*?</\1>', '', html, flags=re.DOTALL)
-                clean_text = re.sub(r'<[^>]+>', ' ', clean_text) # Strip remaining tags
-                clean_text = re.sub(r'\s+', ' ', clean_text).strip() # Normalize whitespace
-                
-                # Limit to 5000 chars for context
-                return clean_text[:5000]
-        except Exception as e:
-            print(f"Competitor scrape error: {e}")
-            continue
-    return None
+    html = scrapingant_client.fetch(url, browser=True, timeout=60)  # Javascript support for modern blogs
+    if not html:
+        return None
+    # Simple cleanup: Remove scripts, styles, nav, footer
+    clean_text = re.sub(r'<(script|style|nav|footer|header).*?>.*?</\1>', '', html, flags=re.DOTALL)
+    clean_text = re.sub(r'<[^>]+>', ' ', clean_text) # Strip remaining tags
+    clean_text = re.sub(r'\s+', ' ', clean_text).strip() # Normalize whitespace
+
+    # Limit to 5000 chars for context
+    return clean_text[:5000]
 
 # Legacy constant kept for backward-compat imports (now driven by niche_config)
 _WATCH_TERMS = tuple(get_niche(DEFAULT_NICHE)["niche_terms"])
 
-def search_amazon(keyword, limit=3, niche_key: str = DEFAULT_NICHE):
+def search_amazon_results(keyword, limit=3, niche_key: str = DEFAULT_NICHE):
     """
-    Searches Amazon for a keyword and returns a list of product URLs.
+    Searches Amazon for a keyword and returns structured organic results in
+    Amazon's ranking order (see amazon_parser.parse_search_results):
+    asin, title, price, rating, review_count, image_url, product_url, position.
     Niche-aware: uses Amazon category filter + niche guard from niche_config.
 
     Args:
         keyword   : Search term from keyword pool
-        limit     : Max number of product URLs to return
+        limit     : Max number of results to return (None = every organic result)
         niche_key : Key from NICHE_REGISTRY (e.g. 'watches', 'headphones')
     """
     niche = get_niche(niche_key)
@@ -205,56 +129,18 @@ def search_amazon(keyword, limit=3, niche_key: str = DEFAULT_NICHE):
         f"&rh={amazon_cat}&s={sort_by}"
     )
 
-    
-    # Re-use scraping logic (simplified for now, ideally specific function)
-    # We need to reuse the key rotation logic.
-    # Let's verify if we can adapt get_amazon_data or just write a simpler loop here
-    # reusing the keys directly.
-    
-    for api_key in SCRAPINGANT_API_KEYS:
-        try:
-             response = requests.get(
-                "https://api.scrapingant.com/v2/general",
-                params={
-                    'url': base_search_url,
-                    'browser': 'true'
-                },
-                headers={
-                    'x-api-key': api_key
-                },
-                timeout=60
-            )
-             
-             if response.status_code == 200:
-                 html = response.text
-                 product_urls = []
-                 
-                 # Regex to find product links
-                 # Pattern for partial links: /dp/B0........
-                 # We look for links inside result items usually
-                 
-                 # Find all ASIN links
-                 matches = re.findall(r'href="(/[^/]+/dp/[A-Z0-9]{10})', html)
-                 
-                 unique_urls = set()
-                 for match in matches:
-                     full_url = f"https://www.amazon.com{match}"
-                     
-                     # Simple dedup based on ASIN
-                     asin = extract_asin(full_url)
-                     if asin and asin not in [extract_asin(u) for u in unique_urls]:
-                         unique_urls.add(full_url)
-                         
-                 # Add some filtering logic if possible (regex complexity increased)
-                 # For now, just return top N unique results
-                 final_list = list(unique_urls)[:limit]
-                 print(f"Found {len(final_list)} products for '{keyword}'")
-                 return final_list
+    html = scrapingant_client.fetch(base_search_url, browser=True, timeout=60)
+    if not html:
+        return []
 
-             elif response.status_code in [429, 402]:
-                continue
-        except Exception as e:
-            print(f"Search error {api_key[:5]}: {e}")
-            continue
-            
-    return []
+    results = amazon_parser.parse_search_results(html, limit=limit)
+    print(f"Found {len(results)} products for '{keyword}'")
+    return results
+
+
+def search_amazon(keyword, limit=3, niche_key: str = DEFAULT_NICHE):
+    """
+    Searches Amazon for a keyword and returns a list of product URLs
+    (organic results, Amazon's ranking order). See search_amazon_results().
+    """
+    return [r["product_url"] for r in search_amazon_results(keyword, limit=limit, niche_key=niche_key)]
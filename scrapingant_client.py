@@ -0,0 +1,302 @@
+"""
+scrapingant_client.py
+=====================
+One ScrapingAnt client for the whole bot (product pages, Amazon search,
+Best Sellers discovery, Google SERPs, competitor pages, YouTube fallback).
+
+  • Runs on a single asyncio event loop in a background thread, so any caller
+    (sync code, worker threads, the price tracker) can fan out dozens of
+    fetches with fetch_many() while the blocking HTTP calls go through the
+    pooled http_client session on a bounded thread pool.
+  • Per-key concurrency cap (SCRAPINGANT_CONCURRENCY_PER_KEY) — the plan's
+    concurrent-request limit is per key, so more keys = more parallelism.
+  • Credit accounting per key (browser render = 10 credits, residential
+    proxy = 25/250, plain = 1) with an optional per-key budget.
+  • 429 → short cool-down (Retry-After honoured, else exponential);
+    402 / budget spent → key parked until SCRAPINGANT_EXHAUSTED_COOLDOWN_MIN.
+  • Identical in-flight requests (same URL + params) are coalesced: the second
+    caller awaits the first request instead of paying for it again.
+  • http_client never re-sends a ScrapingAnt request after a read timeout or
+    a 5xx (NO_RETRY_HOSTS): every retry, and its credits, is decided here and
+    bounded by MAX_ATTEMPTS_PER_KEY.
+
+Usage:
+    import scrapingant_client
+    html  = scrapingant_client.fetch(url)                      # str or None
+    pages = scrapingant_client.fetch_many(urls, browser=False)  # [str|None, ...]
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+import http_client
+from config import (SCRAPINGANT_API_KEYS, SCRAPINGANT_CONCURRENCY_PER_KEY, SCRAPINGANT_MAX_PARALLEL,
+                    SCRAPINGANT_CREDIT_BUDGET_PER_KEY, SCRAPINGANT_EXHAUSTED_COOLDOWN_MIN)
+
+API_URL = "https://api.scrapingant.com/v2/general"
+
+BASE_COOLDOWN = 20      # seconds, first 429 without Retry-After
+MAX_COOLDOWN  = 600     # seconds, cap for repeated 429s
+MAX_WAIT      = 90      # longest a request waits for a key to leave cool-down
+MAX_ATTEMPTS_PER_KEY = 3  # per request, so a key stuck on 429 can't be retried forever
+
+# Target errors: the page itself is missing/invalid, another key won't help
+FINAL_STATUSES = (400, 404, 410, 422)
+
+_api_keys = list(SCRAPINGANT_API_KEYS)
+_keys     = {}          # key -> state dict (only touched on the loop thread)
+_inflight = {}          # (url, params) -> asyncio.Task
+_loop     = None
+_executor = None
+_lock     = threading.Lock()
+
+
+def set_api_keys(keys):
+    """Replaces the key pool (per-site override in run_single_cycle.py). Key stats survive."""
+    global _api_keys
+    _api_keys = [k for k in (keys or []) if k]
+
+
+def has_keys():
+    """True when at least one ScrapingAnt key is configured."""
+    return bool(_api_keys)
+
+
+def credit_cost(browser=True, proxy_type=None, **_):
+    """ScrapingAnt credits one successful request costs."""
+    if proxy_type == "residential":
+        return 250 if browser else 25
+    return 10 if browser else 1
+
+
+def _state(key):
+    state = _keys.get(key)
+    if state is None:
+        state = {
+            "semaphore":      asyncio.Semaphore(max(1, SCRAPINGANT_CONCURRENCY_PER_KEY)),
+            "active":         0,
+            "cooldown_until": 0.0,
+            "rate_strikes":   0,
+            "credits":        0,
+            "successes":      0,
+            "failures":       0,
+        }
+        _keys[key] = state
+    return state
+
+
+def _label(key):
+    idx = _api_keys.index(key) + 1 if key in _api_keys else "?"
+    return f"key {idx}/{len(_api_keys)} ({key[:5]}…)"
+
+
+def _over_budget(state, cost):
+    return SCRAPINGANT_CREDIT_BUDGET_PER_KEY > 0 and state["credits"] + cost > SCRAPINGANT_CREDIT_BUDGET_PER_KEY
+
+
+def _pick_key(tried, cost):
+    """Least busy usable key not yet tried for this request, else (None, seconds until one frees up)."""
+    now = time.time()
+    ready, next_ready = [], None
+    for key in _api_keys:
+        if key in tried:
+            continue
+        state = _state(key)
+        if _over_budget(state, cost):
+            continue
+        if state["cooldown_until"] <= now:
+            ready.append(key)
+        elif next_ready is None or state["cooldown_until"] < next_ready:
+            next_ready = state["cooldown_until"]
+    if ready:
+        return min(ready, key=lambda k: (_keys[k]["active"], _keys[k]["credits"])), 0
+    return None, (next_ready - now if next_ready else None)
+
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _cool_down(key, response):
+    state = _keys[key]
+    if response.status_code == 402:
+        wait = SCRAPINGANT_EXHAUSTED_COOLDOWN_MIN * 60
+        print(f"[SCRAPE:ant] {_label(key)} out of credits (402). Parked for {wait / 60:.0f} min.")
+    else:
+        state["rate_strikes"] += 1
+        wait = _retry_after(response) or min(BASE_COOLDOWN * 2 ** (state["rate_strikes"] - 1), MAX_COOLDOWN)
+        print(f"[SCRAPE:ant] {_label(key)} rate limited (429). Cooling down {wait:.0f}s.")
+    state["cooldown_until"] = max(state["cooldown_until"], time.time() + wait)
+
+
+async def _fetch(url, params, timeout, reject):
+    loop  = asyncio.get_running_loop()
+    cost  = credit_cost(**params)
+    tried = set()
+    waited = 0.0
+    attempts = 0
+
+    while True:
+        if not _api_keys:
+            print("[SCRAPE:ant] No ScrapingAnt keys configured.")
+            return None
+        if attempts >= MAX_ATTEMPTS_PER_KEY * len(_api_keys):
+            print(f"[SCRAPE:ant] Giving up on {url[:80]} after {attempts} attempts.")
+            return None
+        key, delay = _pick_key(tried, cost)
+        if key is None:
+            if delay is None or waited + delay > MAX_WAIT:
+                print(f"[SCRAPE:ant] All keys failed for {url[:80]}")
+                return None
+            await asyncio.sleep(delay)
+            waited += delay
+            continue
+
+        state = _keys[key]
+        tried.add(key)
+        attempts += 1
+        async with state["semaphore"]:
+            state["active"] += 1
+            try:
+                response = await loop.run_in_executor(
+                    _executor,
+                    lambda: http_client.get(
+                        API_URL,
+                        params={"url": url, **{k: _param(v) for k, v in params.items()}},
+                        headers={"x-api-key": key},
+                        timeout=(http_client.DEFAULT_TIMEOUT[0], timeout),
+                    ),
+                )
+            except Exception as e:
+                state["failures"] += 1
+                print(f"[SCRAPE:ant] {_label(key)} error: {e}")
+                continue
+            finally:
+                state["active"] -= 1
+
+        if response.status_code == 200:
+            state["credits"]     += cost
+            state["rate_strikes"] = 0
+            html = response.text
+            if reject is not None and reject(html):
+                state["failures"] += 1
+                print(f"[SCRAPE:ant] {_label(key)} got a blocked page for {url[:80]}. Trying next key...")
+                continue
+            state["successes"] += 1
+            return html
+
+        state["failures"] += 1
+        if response.status_code in (429, 402):
+            _cool_down(key, response)
+            tried.discard(key)   # usable again once the cool-down ends
+            continue
+        print(f"[SCRAPE:ant] {_label(key)} HTTP {response.status_code} for {url[:80]}")
+        if response.status_code in FINAL_STATUSES:
+            return None
+
+
+def _param(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+async def fetch_async(url, browser=True, timeout=60, reject=None, **params):
+    """
+    Awaitable fetch on the client loop. Identical in-flight requests (same URL
+    and params) share one ScrapingAnt call. `reject(html) -> bool` marks a 200
+    response as a block page (retried on the next key); it is not part of the
+    sharing key, so per-call lambdas still coalesce — each caller applies its
+    own `reject` to the shared page and fetches on its own if it rejects it.
+    """
+    params["browser"] = browser
+    ident = (url, tuple(sorted((k, str(v)) for k, v in params.items())))
+    task = _inflight.get(ident)
+    joined = task is not None
+    if not joined:
+        task = asyncio.ensure_future(_fetch(url, params, timeout, reject))
+        _inflight[ident] = task
+        task.add_done_callback(lambda _t: _inflight.pop(ident, None))
+    html = await asyncio.shield(task)
+    if joined and html is not None and reject is not None and reject(html):
+        html = await _fetch(url, params, timeout, reject)
+    return html
+
+
+async def fetch_many_async(urls, browser=True, timeout=60, reject=None, **params):
+    return await asyncio.gather(
+        *(fetch_async(url, browser=browser, timeout=timeout, reject=reject, **params) for url in urls)
+    )
+
+
+def _get_loop():
+    global _loop, _executor
+    if _loop is not None:
+        return _loop
+    with _lock:
+        if _loop is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(1, SCRAPINGANT_MAX_PARALLEL), thread_name_prefix="scrapingant"
+            )
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="scrapingant-loop", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def _run(coro):
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+
+def fetch(url, browser=True, timeout=60, reject=None, **params):
+    """
+    Fetches `url` through ScrapingAnt and returns the page HTML, or None when
+    every key failed. Extra keyword args are passed as ScrapingAnt params
+    (proxy_type="residential", proxy_country="US", ...).
+    """
+    return _run(fetch_async(url, browser=browser, timeout=timeout, reject=reject, **params))
+
+
+def fetch_many(urls, browser=True, timeout=60, reject=None, **params):
+    """
+    Fetches every URL concurrently (bounded by the per-key caps) and returns
+    the HTML (or None) for each, in the same order as `urls`.
+    """
+    urls = list(urls)
+    if not urls:
+        return []
+    return _run(fetch_many_async(urls, browser=browser, timeout=timeout, reject=reject, **params))
+
+
+def credits_used():
+    """Credits spent by this process across every key."""
+    return _run(_credits_used())
+
+
+async def _credits_used():
+    return sum(state["credits"] for state in _keys.values())
+
+
+def snapshot():
+    """Per-key health summary (keys masked) for logging / dashboards."""
+    return _run(_snapshot())
+
+
+async def _snapshot():
+    now = time.time()
+    return [
+        {
+            "key":        f"{key[:5]}…",
+            "active":     _state(key)["active"],
+            "cooldown_s": max(0, round(_state(key)["cooldown_until"] - now)),
+            "credits":    _state(key)["credits"],
+            "successes":  _state(key)["successes"],
+            "failures":   _state(key)["failures"],
+        }
+        for key in _api_keys
+    ]
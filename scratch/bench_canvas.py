@@ -0,0 +1,79 @@
+"""
+Benchmark: canvas preparation in image_composer — legacy per-pixel gradient
+and per-call background decode/resize vs the NumPy gradient and the
+(path, size) background cache.
+
+    python scratch/bench_canvas.py
+"""
+
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageChops  # noqa: E402
+
+import image_composer  # noqa: E402
+
+SIZES = [image_composer.CANVAS_SIZE, (1000, 1500)]
+
+
+def legacy_gradient(size):
+    w, h = size
+    cx, cy = w / 2, h / 2
+    max_radius = math.hypot(cx, cy)
+    img = Image.new("RGB", size)
+    pixels = img.load()
+    rc, gc, bc = image_composer.GRAD_CENTER_COLOR
+    re_, ge, be = image_composer.GRAD_EDGE_COLOR
+    for y in range(h):
+        for x in range(w):
+            t = min(math.hypot(x - cx, y - cy) / max_radius, 1.0)
+            pixels[x, y] = (int(rc + (re_ - rc) * t), int(gc + (ge - gc) * t), int(bc + (be - bc) * t))
+    return img
+
+
+def legacy_background(path, size):
+    bg = Image.open(path).convert("RGB")
+    bg_w, bg_h = bg.size
+    scale = max(size[0] / bg_w, size[1] / bg_h)
+    new_w, new_h = int(bg_w * scale), int(bg_h * scale)
+    bg = bg.resize((new_w, new_h), Image.Resampling.LANCZOS)
+    left, top = (new_w - size[0]) / 2, (new_h - size[1]) / 2
+    return bg.crop((left, top, left + size[0], top + size[1]))
+
+
+def bench(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    print(f"{'step':<34}{'size':>11}{'legacy ms':>12}{'new ms':>10}{'speedup':>10}")
+    for size in SIZES:
+        label = f"{size[0]}x{size[1]}"
+        old_ms = bench(lambda: legacy_gradient(size), 1)
+        image_composer._radial_gradient.cache_clear()
+        cold_ms = bench(lambda: image_composer._radial_gradient(size), 1)
+        new_ms = bench(lambda: image_composer._build_radial_gradient(size), 20)
+        diff = ImageChops.difference(legacy_gradient(size), image_composer._build_radial_gradient(size)).getbbox()
+        print(f"{'gradient (uncached numpy)':<34}{label:>11}{old_ms:>12.1f}{cold_ms:>10.1f}{old_ms / cold_ms:>9.0f}x")
+        print(f"{'gradient (cached copy)':<34}{label:>11}{old_ms:>12.1f}{new_ms:>10.2f}{old_ms / new_ms:>9.0f}x"
+              f"   identical={diff is None}")
+
+    for path in image_composer._background_files():
+        for size in SIZES:
+            label = f"{size[0]}x{size[1]}"
+            old_ms = bench(lambda: legacy_background(path, size), 3)
+            image_composer._scaled_background(path, size)
+            new_ms = bench(lambda: image_composer._scaled_background(path, size).copy(), 20)
+            name = f"background {os.path.basename(path)}"
+            print(f"{name:<34}{label:>11}{old_ms:>12.1f}{new_ms:>10.2f}{old_ms / new_ms:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
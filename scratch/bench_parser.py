@@ -0,0 +1,123 @@
+"""
+Benchmark: legacy regex product parser (scraper.get_amazon_data before
+amazon_parser) vs amazon_parser.parse_product_page.
+
+    python scratch/bench_parser.py [page.html ...]
+
+Defaults to every scratch/*.html page plus a product-page fixture built from
+scratch/scraped.html: the real page is used as filler and the product regions
+(title, price block, rating, hiRes JSON, bullets) sit at the depths they
+usually have on a ~1.5 MB rendered product page.
+"""
+
+import glob
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import amazon_parser  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def legacy_parse(html):
+    title_match = re.search(r'<span id="productTitle"[^>]*>(.*?)</span>', html, re.DOTALL)
+    if not title_match:
+        title_match = re.search(r'<h1[^>]*id="title"[^>]*>(.*?)</h1>', html, re.DOTALL)
+    if not title_match:
+        title_match = re.search(r'<title>(.*?)</title>', html, re.DOTALL)
+    price_match = re.search(r'<span class="a-offscreen">([^<]+)</span>', html)
+    rating_match = re.search(r'<span class="a-icon-alt">([^<]+)</span>', html)
+    review_count_match = re.search(r'<span id="acrCustomerReviewText"[^>]*>([^<]+)</span>', html)
+    image_match = re.search(r'"hiRes":"([^"]+)"', html)
+    image_url = image_match.group(1).strip() if image_match else None
+    if not image_url:
+        image_match_alt = re.search(r'<img[^>]+id="landingImage"[^>]+src="([^"]+)"', html)
+        if image_match_alt:
+            image_url = image_match_alt.group(1)
+        else:
+            image_match_blk = re.search(r'<img[^>]+id="imgBlkFront"[^>]+src="([^"]+)"', html)
+            if image_match_blk:
+                image_url = image_match_blk.group(1)
+    return {
+        "title": title_match.group(1).strip() if title_match else "Unknown Title",
+        "price": price_match.group(1).strip() if price_match else "N/A",
+        "rating": rating_match.group(1).strip() if rating_match else "N/A",
+        "review_count": review_count_match.group(1).strip() if review_count_match else "0",
+        "image_url": image_url,
+    }
+
+
+def product_fixture(filler, gallery_json=True):
+    """
+    ~1.3 MB page with product regions at typical depths inside real Amazon markup.
+    gallery_json=False mimics pages whose gallery has "hiRes":null, where only
+    the landingImage <img> carries the picture.
+    """
+    body = filler[filler.find("<body"):]
+    chunk = body[: len(body) // 3]
+    title = '<h1 id="title"><span id="productTitle" class="a-size-large">  SKMEI Men\'s Digital Sports Watch, 50M Waterproof  </span></h1>'
+    byline = '<a id="bylineInfo" class="a-link-normal" href="/stores/SKMEI">Visit the SKMEI Store</a>'
+    rating = ('<div id="averageCustomerReviews"><span id="acrPopover" class="reviewCountTextLinkedHistogram">'
+              '<i class="a-icon a-icon-star"><span class="a-icon-alt">4.4 out of 5 stars</span></i></span>'
+              '<span id="acrCustomerReviewText" class="a-size-base">12,873 ratings</span></div>')
+    price = ('<div id="corePriceDisplay_desktop_feature_div"><span class="a-price">'
+             '<span class="a-offscreen">$19.99</span><span aria-hidden="true">$19.99</span></span></div>')
+    availability = '<div id="availability" class="a-section"> <span class="a-size-medium a-color-success"> In Stock </span></div>'
+    bullets = '<div id="feature-bullets"><ul class="a-unordered-list">' + "".join(
+        f'<li><span class="a-list-item"> Feature {i}: 50M water resistance &amp; LED backlight </span></li>' for i in range(6)
+    ) + "</ul></div>"
+    images = "<script>var data = {'colorImages': { 'initial': [" + ",".join(
+        f'{{"hiRes":"https://m.media-amazon.com/images/I/71img{i}._AC_SL1500_.jpg","thumb":"x"}}' for i in range(7)
+    ) + "]}};</script>"
+    if not gallery_json:
+        images = ('<div id="imgTagWrapperId"><img alt="SKMEI watch" data-old-hires="" '
+                  'src="https://m.media-amazon.com/images/I/71landing._AC_SX679_.jpg" id="landingImage" '
+                  'data-a-dynamic-image="{}"></div>')
+    head = filler[: filler.find("<body")]
+    # nav + image block | gallery JSON | centre column | buy box | carousels + reviews
+    return (head + chunk + images + chunk[:40000] + title + byline + rating + chunk[:60000]
+            + price + availability + chunk[:30000] + bullets + chunk * 6)
+
+
+def bench(fn, html, rounds):
+    fn(html)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(html)
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    paths = sys.argv[1:] or sorted(glob.glob(os.path.join(HERE, "*.html")))
+    pages = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            pages.append((os.path.basename(path), f.read()))
+    if pages:
+        pages.append(("product fixture", product_fixture(pages[0][1])))
+        pages.append(("fixture, no hiRes", product_fixture(pages[0][1], gallery_json=False)))
+
+    rounds = 30
+    print(f"{'page':<22}{'size':>10}{'legacy ms':>12}{'new ms':>10}{'speedup':>9}")
+    for name, html in pages:
+        old_ms = bench(legacy_parse, html, rounds)
+        new_ms = bench(amazon_parser.parse_product_page, html, rounds)
+        print(f"{name:<22}{len(html) / 1024:>8.0f}KB{old_ms:>12.2f}{new_ms:>10.2f}{old_ms / new_ms:>8.1f}x")
+
+    if pages:
+        print("\nproduct fixture fields")
+        legacy = legacy_parse(pages[-2][1])
+        new = amazon_parser.parse_product_page(pages[-2][1])
+        for key in ("title", "price", "rating", "review_count", "image_url"):
+            print(f"  {key:<13} legacy={str(legacy[key])[:45]!r:<50} new={str(new[key])[:45]!r}")
+        for key in ("brand", "availability", "features", "images"):
+            value = new[key]
+            print(f"  {key:<13} new={(f'{len(value)} item(s)' if isinstance(value, list) else value)!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Benchmark: cold start of the bot (`import main` in a fresh interpreter) and
+the one-off cost of loading the rembg model via image_composer.warmup().
+
+    python scratch/bench_startup.py [runs]
+
+Before lazy loading, the model load was part of every `import main`; now it
+only happens on the first cutout (or an explicit warmup()).
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def timed(code):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    baseline = [timed("pass") for _ in range(runs)]
+    cold     = [timed("import main") for _ in range(runs)]
+    warm     = [timed("import image_composer; image_composer.warmup()") for _ in range(max(1, runs // 2))]
+
+    print(f"interpreter start          {statistics.median(baseline):6.2f}s")
+    print(f"import main (cold start)   {statistics.median(cold):6.2f}s")
+    print(f"import + rembg warmup()    {statistics.median(warm):6.2f}s")
+
+    sys.path.insert(0, ROOT)
+    import image_composer
+    print(f"rembg available: {image_composer._get_rembg() is not None}")
+
+
+if __name__ == "__main__":
+    main()
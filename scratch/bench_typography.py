@@ -0,0 +1,76 @@
+"""
+Benchmark: typography in image_composer — legacy font loading and the
+(2w+1)²-draw fake outline vs cached fonts, Pillow's native stroke and the
+cached text / plate layers.
+
+    python scratch/bench_typography.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont  # noqa: E402
+
+import image_composer  # noqa: E402
+
+TITLE = "CASIO G-SHOCK GA2100 CARBON CORE GUARD ANALOG…"
+
+
+def legacy_font(size, bold=True):
+    for p in image_composer.FONT_PATHS[bold]:
+        if os.path.exists(p):
+            try:
+                return ImageFont.truetype(p, size)
+            except Exception:
+                continue
+    return ImageFont.load_default()
+
+
+def legacy_stroked(canvas, pos, text, size, stroke_width):
+    draw = ImageDraw.Draw(canvas)
+    font = legacy_font(size)
+    x, y = pos
+    for dx in range(-stroke_width, stroke_width + 1):
+        for dy in range(-stroke_width, stroke_width + 1):
+            if dx != 0 or dy != 0:
+                draw.text((x + dx, y + dy), text, font=font, fill=image_composer.STROKE_COLOR, anchor="mm")
+    draw.text(pos, text, font=font, fill=(255, 255, 255), anchor="mm")
+
+
+def native_stroked(canvas, pos, text, size, stroke_width):
+    ImageDraw.Draw(canvas).text(pos, text, font=image_composer._load_font(size, bold=True), fill=(255, 255, 255),
+                                anchor="mm", stroke_width=stroke_width, stroke_fill=image_composer.STROKE_COLOR)
+
+
+def bench(fn, rounds=50):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    canvas = Image.new("RGB", (1000, 1500), (30, 30, 40))
+    rows = [
+        ("load font (36px bold)", lambda: legacy_font(36), lambda: image_composer._load_font(36, True)),
+    ]
+    for text, size, width in ((TITLE, 22, 2), (TITLE, 36, 2), ("EXPERT REVIEW", 48, 3)):
+        label = f"stroke w={width} {size}px"
+        rows.append((f"{label} native", lambda t=text, s=size, w=width: legacy_stroked(canvas, (500, 150), t, s, w),
+                     lambda t=text, s=size, w=width: native_stroked(canvas, (500, 150), t, s, w)))
+        rows.append((f"{label} cached layer", lambda t=text, s=size, w=width: legacy_stroked(canvas, (500, 150), t, s, w),
+                     lambda t=text, s=size, w=width: image_composer._draw_text(canvas, (500, 150), t, s,
+                                                                              fill=(255, 255, 255), stroke_width=w)))
+
+    print(f"{'step':<36}{'legacy ms':>12}{'new ms':>10}{'speedup':>10}")
+    for label, old, new in rows:
+        new()   # warm the caches
+        old_ms, new_ms = bench(old), bench(new)
+        print(f"{label:<36}{old_ms:>12.2f}{new_ms:>10.3f}{old_ms / new_ms:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
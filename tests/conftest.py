@@ -0,0 +1,12 @@
+"""
+Shared pytest setup. The bot's modules read CACHE_DIR at import time, so it
+is pointed at a throwaway directory before any of them is imported — tests
+never touch the real .cache/.
+"""
+
+import os
+import sys
+import tempfile
+
+os.environ["BOT_CACHE_DIR"] = tempfile.mkdtemp(prefix="bot-tests-")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,94 @@
+import json
+import os
+import time
+
+import pytest
+
+from ai_cache import AIOutputCache, template_hash
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AIOutputCache(str(tmp_path / "ai"), ttl_seconds=3600, max_bytes=10_000)
+
+
+def _age(cache, key, seconds):
+    """Back-dates an entry's creation stamp and mtime by `seconds`."""
+    path = cache._path(key)
+    with open(path, encoding="utf-8") as f:
+        entry = json.load(f)
+    entry["created"] = time.time() - seconds
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.utime(path, (entry["created"], entry["created"]))
+
+
+def test_roundtrip_and_hit_counters(cache):
+    key = cache.make_key("article", "B1", "English")
+    assert cache.get(key) is None
+    cache.put(key, {"content": "<p>x</p>"}, kind="article")
+    assert cache.get(key) == {"content": "<p>x</p>"}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_depends_on_every_part():
+    base = dict(kind="article", asin="B1", language="English", niche_prompt="watches", template="t1")
+    key = AIOutputCache.make_key(**base)
+    assert AIOutputCache.make_key(**{**base, "language": "english"}) == key   # case-insensitive
+    for change in ({"asin": "B2"}, {"language": "German"}, {"template": "t2"}, {"niche_prompt": "shoes"}):
+        assert AIOutputCache.make_key(**{**base, **change}) != key
+    assert AIOutputCache.make_key(**base, inputs="a") != AIOutputCache.make_key(**base, inputs="b")
+    assert AIOutputCache.make_key(**base, affiliate_tag=None) == key        # None extras are ignored
+
+
+def test_template_hash_changes_with_prompt_source():
+    def prompt_a():
+        return "Write a review."
+
+    def prompt_b():
+        return "Write a long review."
+
+    assert template_hash(prompt_a) == template_hash(prompt_a)
+    assert template_hash(prompt_a) != template_hash(prompt_b)
+    assert template_hash({"a": 1}) != template_hash({"a": 2})
+
+
+def test_expired_entry_is_a_miss_and_removed(cache):
+    key = cache.make_key("faqs", "B1")
+    cache.put(key, [1, 2, 3])
+    _age(cache, key, cache.ttl + 60)
+    assert cache.get(key) is None
+    assert not os.path.exists(cache._path(key))
+
+
+def test_eviction_drops_expired_then_least_recently_used(tmp_path):
+    cache = AIOutputCache(str(tmp_path / "ai"), ttl_seconds=3600, max_bytes=3_300)   # room for three ~1 KB entries
+    keys = [cache.make_key("article", f"B{i}") for i in range(3)]
+    for age, key in zip((300, 200, 100), keys):
+        cache.put(key, "x" * 1000)
+        _age(cache, key, age)
+    cache.get(keys[0])            # touch: now the most recently used
+
+    cache.put(cache.make_key("article", "B9"), "x" * 1000)
+    remaining = {k for k in keys if os.path.exists(cache._path(k))}
+    assert remaining == {keys[0], keys[2]}      # B1 was least recently used
+
+    stale = cache.make_key("article", "old")
+    cache.put(stale, "y")
+    _age(cache, stale, cache.ttl + 60)
+    cache.put(cache.make_key("article", "new"), "z")
+    assert not os.path.exists(cache._path(stale))
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = AIOutputCache(str(tmp_path / "ai"), ttl_seconds=0, max_bytes=10_000)
+    key = cache.make_key("article", "B1")
+    cache.put(key, "value")
+    assert cache.get(key) is None
+    assert not os.path.exists(str(tmp_path / "ai"))
+
+
+def test_none_is_never_cached(cache):
+    key = cache.make_key("article", "B1")
+    cache.put(key, None)
+    assert not os.path.exists(cache._path(key))
@@ -0,0 +1,150 @@
+import json
+import os
+
+import pytest
+
+import database
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, payload=None):
+        self.status_code = status_code
+        self.text = json.dumps(payload or [])
+        self._payload = payload or []
+
+    def json(self):
+        return self._payload
+
+
+class FakeSupabase:
+    """Records every request; `fail` makes the next requests return HTTP 500."""
+
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+        self.published = []
+        self.during_request = None
+
+    def _respond(self, method, url, kwargs):
+        self.calls.append((method, url, kwargs.get("json")))
+        if self.during_request:
+            hook, self.during_request = self.during_request, None
+            hook()
+        return FakeResponse(500 if self.fail else 201)
+
+    def post(self, url, **kwargs):
+        return self._respond("POST", url, kwargs)
+
+    def patch(self, url, **kwargs):
+        return self._respond("PATCH", url, kwargs)
+
+    def get(self, url, **kwargs):
+        self.calls.append(("GET", url, None))
+        return FakeResponse(200, [{"asin": a} for a in self.published])
+
+
+@pytest.fixture
+def supabase(tmp_path, monkeypatch):
+    fake = FakeSupabase()
+    monkeypatch.setattr(database, "SUPABASE_URL", "https://db.example")
+    monkeypatch.setattr(database, "WRITE_JOURNAL_PATH", str(tmp_path / "journal.jsonl"))
+    monkeypatch.setattr(database, "PUBLISHED_CACHE_PATH", str(tmp_path / "published.json"))
+    monkeypatch.setattr(database, "_product_writes", {})
+    monkeypatch.setattr(database, "_keyword_writes", {})
+    monkeypatch.setattr(database, "_published_cache", None)
+    monkeypatch.setattr(database.http_client, "post", fake.post)
+    monkeypatch.setattr(database.http_client, "patch", fake.patch)
+    monkeypatch.setattr(database.http_client, "get", fake.get)
+    return fake
+
+
+def _journal():
+    if not os.path.exists(database.WRITE_JOURNAL_PATH):
+        return []
+    with open(database.WRITE_JOURNAL_PATH, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_writes_are_merged_per_row_and_journaled(supabase):
+    database.queue_save_product({"asin": "B1", "title": "Watch"}, site_id="s1")
+    database.queue_product_update("B1", site_id="s1", is_published=True)
+    database.queue_product_update("B1", site_id="s1", post_link="https://site/b1")
+    database.queue_keyword_completed("best watch", site_id="s1")
+
+    assert database.pending_writes() == 2
+    assert len(_journal()) == 4
+    assert supabase.calls == []
+
+
+def test_flush_sends_bulk_upsert_and_patch_then_clears_journal(supabase):
+    database.queue_save_product({"asin": "B1", "title": "Watch"}, site_id="s1")
+    database.queue_product_update("B1", site_id="s1", is_published=True)
+    database.queue_product_update("B2", site_id="s1", is_published=True)
+    database.queue_keyword_completed("best watch", site_id="s1")
+
+    assert database.flush_writes() == 3
+    methods = [method for method, _, _ in supabase.calls]
+    assert methods.count("POST") == 1 and methods.count("PATCH") == 2
+    upsert = next(body for method, _, body in supabase.calls if method == "POST")
+    assert upsert == [{**database._product_row({"asin": "B1", "title": "Watch"}, "s1"), "is_published": True}]
+    assert database.pending_writes() == 0
+    assert not os.path.exists(database.WRITE_JOURNAL_PATH)
+
+
+def test_failed_flush_keeps_writes_buffered_and_journaled(supabase):
+    database.queue_product_update("B1", site_id="s1", is_published=True)
+    supabase.fail = True
+    assert database.flush_writes() == 0
+    assert database.pending_writes() == 1
+    assert _journal()[0]["fields"] == {"is_published": True}
+
+    supabase.fail = False
+    assert database.flush_writes() == 1
+    assert database.pending_writes() == 0
+
+
+def test_field_queued_during_flush_survives_partial_ack(supabase):
+    database.queue_product_update("B1", site_id="s1", is_published=True)
+    supabase.during_request = lambda: database.queue_product_update("B1", site_id="s1", post_link="https://site/b1")
+
+    database.flush_writes()
+    assert database._pending_product_fields("B1", "s1") == {"post_link": "https://site/b1"}
+    assert _journal()[0]["fields"] == {"post_link": "https://site/b1"}
+
+    database.flush_writes()
+    assert supabase.calls[-1][2] == {"post_link": "https://site/b1"}
+    assert database.pending_writes() == 0
+
+
+def test_fully_acked_partial_entry_is_dropped(supabase):
+    database.queue_product_update("B1", site_id="s1", is_published=True, post_link="https://site/b1")
+    # The entry changed during the request but holds nothing the flush didn't send
+    supabase.during_request = lambda: database._product_writes.__setitem__(("B1", "s1"), {"is_published": True})
+
+    database.flush_writes()
+    assert database.pending_writes() == 0
+    assert not os.path.exists(database.WRITE_JOURNAL_PATH)
+    calls = len(supabase.calls)
+    database.flush_writes()
+    assert len(supabase.calls) == calls   # no empty PATCH for the row
+
+
+def test_replay_after_crash_sends_journaled_writes(supabase):
+    database.queue_product_update("B1", site_id="s1", is_published=True)
+    database.queue_keyword_completed("best watch", site_id="s1")
+    # Crash: in-memory buffer lost, journal survives
+    database._product_writes.clear()
+    database._keyword_writes.clear()
+
+    database.replay_write_journal()
+    assert [method for method, _, _ in supabase.calls] == ["PATCH", "PATCH"]
+    assert database.pending_writes() == 0
+
+
+def test_published_resync_drops_unpublished_and_keeps_buffered_publishes(supabase):
+    supabase.published = ["B1", "B2"]
+    assert database.get_published_asins("s1", force_refresh=True) == {"B1", "B2"}
+
+    supabase.published = ["B1"]                                      # B2 unpublished in Supabase
+    database.queue_product_update("B3", site_id="s1", is_published=True)   # not flushed yet
+    assert database.get_published_asins("s1", force_refresh=True) == {"B1", "B3"}
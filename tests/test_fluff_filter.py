@@ -0,0 +1,97 @@
+import pytest
+
+import fluff_filter
+from fluff_filter import clean_fluff, find_fluff
+
+
+@pytest.fixture(autouse=True)
+def reset_stats(monkeypatch):
+    monkeypatch.setattr(fluff_filter, "FLUFF_STATS", dict.fromkeys(fluff_filter.FLUFF_STATS, 0))
+
+
+class Rewriter:
+    """Stand-in for the Gemini sentence rewrite: records its input, returns fixed output."""
+
+    def __init__(self, replacements=None, fail=False):
+        self.replacements = replacements or {}
+        self.fail = fail
+        self.calls = []
+
+    def __call__(self, sentences):
+        self.calls.append(list(sentences))
+        if self.fail:
+            raise RuntimeError("quota")
+        return [self.replacements.get(s, s) for s in sentences]
+
+
+def test_clean_article_is_returned_unchanged():
+    html = "<h2>Verdict</h2><p>A solid watch for the price.</p>"
+    assert clean_fluff(html) == html
+    assert fluff_filter.FLUFF_STATS["articles_with_fluff"] == 0
+
+
+def test_figurative_phrases_are_swapped_locally():
+    html = "<p>In conclusion, we delve into a tapestry of features. It is ultimately a game-changer.</p>"
+    cleaned = clean_fluff(html)
+    assert cleaned == "<p>Bottom line, we dig into a mix of features. It is in the end a big upgrade.</p>"
+    assert find_fluff(cleaned) == []
+    assert fluff_filter.FLUFF_STATS["regenerations_avoided"] == 1
+
+
+@pytest.mark.parametrize("sentence", [
+    "Rotate the screen to landscape mode.",
+    "Unlock the phone with your fingerprint.",
+    "Put the monitor on an elevated stand.",
+    "The colours are vibrant outdoors.",
+    "Stream shows on Paramount Plus.",
+])
+def test_possibly_literal_words_go_to_the_rewrite(sentence):
+    rewrite = Rewriter()
+    clean_fluff(f"<p>{sentence}</p>", rewrite=rewrite)
+    assert rewrite.calls == [[sentence]]
+    assert fluff_filter.FLUFF_STATS["local_substitutions"] == 0
+
+
+@pytest.mark.parametrize("html", [
+    "<p>The wall tapestry is hand-woven.</p>",        # no "of": literal
+    "<p>We played Realm of Kings all night.</p>",     # capitalised mid-sentence: a name
+    "<p>The realm-based scoring works.</p>",          # hyphenated compound
+])
+def test_context_checks_block_local_swaps(html):
+    rewrite = Rewriter()
+    assert clean_fluff(html, rewrite=rewrite) == html
+    assert len(rewrite.calls) == 1
+
+
+def test_rewritten_sentences_are_spliced_back_and_markup_kept():
+    html = ('<p>Great value. <a href="https://amzn.to/unlock">Not only</a> is it cheap, but also tough.</p>'
+            '<p>Unlock the phone first.</p>')
+    rewrite = Rewriter({"Unlock the phone first.": "Open the phone's lock screen first."})
+    cleaned = clean_fluff(html, rewrite=rewrite)
+    assert 'href="https://amzn.to/unlock"' in cleaned            # attributes are never touched
+    assert "<p>Open the phone's lock screen first.</p>" in cleaned
+    assert rewrite.calls == [["Not only", "Unlock the phone first."]]
+
+
+def test_script_and_style_content_is_ignored():
+    html = "<script>var unlock = true;</script><p>Plain text.</p>"
+    assert find_fluff(html) == []
+    assert clean_fluff(html) == html
+
+
+def test_failed_rewrite_keeps_original_and_is_not_counted_as_avoided():
+    html = "<p>Rotate to landscape mode.</p>"
+    assert clean_fluff(html, rewrite=Rewriter(fail=True)) == html
+    assert fluff_filter.FLUFF_STATS["regenerations_avoided"] == 0
+    assert fluff_filter.FLUFF_STATS["articles_with_fluff"] == 1
+
+
+def test_rewrite_output_with_html_or_wrong_length_is_rejected():
+    html = "<p>Rotate to landscape mode.</p>"
+    assert clean_fluff(html, rewrite=lambda s: ["<b>Rotate sideways.</b>"]) == html
+    assert clean_fluff(html, rewrite=lambda s: ["a", "b"]) == html
+
+
+def test_case_is_preserved_on_swap():
+    assert clean_fluff("<h2>IN CONCLUSION</h2>") == "<h2>BOTTOM LINE</h2>"
+    assert clean_fluff("<p>Meticulous build.</p>") == "<p>Careful build.</p>"
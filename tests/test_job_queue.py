@@ -0,0 +1,108 @@
+import time
+
+import pytest
+
+import job_queue
+
+
+@pytest.fixture(autouse=True)
+def fresh_queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_queue, "DB_PATH", str(tmp_path / "job_queue.sqlite3"))
+    monkeypatch.setattr(job_queue, "_conn", None)
+    yield
+    if job_queue._conn is not None:
+        job_queue._conn.close()
+
+
+def _run_until(job, last_stage):
+    for stage in job_queue.STAGES[:job_queue.STAGES.index(last_stage) + 1]:
+        job_queue.complete_stage(job, stage, **{f"{stage}_out": stage})
+
+
+def test_new_job_starts_at_scrape_and_needs_every_stage():
+    job = job_queue.open_job("B0001", site_id="s1", keyword="watch", product_url="https://a/dp/B0001")
+    assert job["stage"] == "scrape" and job["status"] == "running"
+    assert all(job_queue.needs(job, stage) for stage in job_queue.STAGES)
+
+
+def test_interrupted_job_resumes_at_first_incomplete_stage_with_artifacts():
+    job = job_queue.open_job("B0001", site_id="s1")
+    _run_until(job, "ai")
+    # Process dies here: status stays "running"
+
+    resumable = job_queue.pending_jobs(site_id="s1")
+    assert [j["asin"] for j in resumable] == ["B0001"]
+
+    job = job_queue.open_job("B0001", site_id="s1")
+    assert job["stage"] == "image"
+    assert job["artifacts"] == {"scrape_out": "scrape", "ai_out": "ai"}
+    assert not job_queue.needs(job, "ai") and job_queue.needs(job, "image")
+
+
+def test_jobs_are_scoped_per_site():
+    job_queue.open_job("B0001", site_id="s1")
+    assert job_queue.pending_jobs(site_id="s2") == []
+    assert job_queue.get("B0001", site_id="s2") is None
+
+
+def test_completing_last_stage_finishes_job_in_one_write():
+    job = job_queue.open_job("B0001", site_id="s1")
+    _run_until(job, "social")
+    # Crash before finish(): the job must not come back
+    stored = job_queue.get("B0001", site_id="s1")
+    assert stored["status"] == "done" and stored["stage"] == "done"
+    assert job_queue.pending_jobs(site_id="s1") == []
+    assert not any(job_queue.needs(stored, stage) for stage in job_queue.STAGES)
+
+
+def test_needs_tolerates_done_stage_left_running():
+    job = job_queue.open_job("B0001", site_id="s1")
+    job_queue._update(job, stage="done")   # row written before the last stage finished jobs
+    stored = job_queue.get("B0001", site_id="s1")
+    assert not job_queue.needs(stored, "scrape")
+    assert job_queue.pending_jobs(site_id="s1") == []
+
+
+def test_finished_job_is_never_reopened():
+    job = job_queue.open_job("B0001", site_id="s1")
+    job_queue.finish(job)
+    assert job_queue.open_job("B0001", site_id="s1")["status"] == "done"
+
+
+def test_dry_run_job_is_parked_not_resumed():
+    job = job_queue.open_job("B0001", site_id="s1")
+    _run_until(job, "image")
+    job_queue.park_dry_run(job)
+    job_queue.release(job)   # process_product's finally must not turn it back into "pending"
+
+    assert job_queue.get("B0001", site_id="s1")["status"] == "dry_run"
+    assert job_queue.pending_jobs(site_id="s1") == []
+
+    # A live run processing the product again reuses the article
+    job = job_queue.open_job("B0001", site_id="s1")
+    assert job["status"] == "running" and job["stage"] == "publish"
+
+
+def test_fail_keeps_job_resumable_until_max_attempts(monkeypatch):
+    monkeypatch.setattr(job_queue, "JOB_MAX_ATTEMPTS", 2)
+    job = job_queue.open_job("B0001", site_id="s1")
+    job_queue.fail(job, "boom")
+    assert job["status"] == "pending" and job_queue.pending_jobs(site_id="s1")
+    job_queue.fail(job, "boom again")
+    assert job["status"] == "failed" and job_queue.pending_jobs(site_id="s1") == []
+    # Retried later: a fresh set of attempts, same stage
+    assert job_queue.open_job("B0001", site_id="s1")["attempts"] == 0
+
+
+def test_stale_jobs_expire(monkeypatch):
+    job_queue.open_job("B0001", site_id="s1")
+    later = time.time() + (job_queue.JOB_MAX_AGE_HOURS + 1) * 3600
+    monkeypatch.setattr(job_queue.time, "time", lambda: later)
+    assert job_queue.pending_jobs(site_id="s1") == []
+
+
+def test_idempotency_key_is_stable_per_job_and_action():
+    job = job_queue.open_job("B0001", site_id="s1")
+    again = job_queue.get("B0001", site_id="s1")
+    assert job_queue.idempotency_key(job, "publish") == job_queue.idempotency_key(again, "publish")
+    assert job_queue.idempotency_key(job, "publish") != job_queue.idempotency_key(job, "social")
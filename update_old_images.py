@@ -1,9 +1,9 @@
 import os
 import sys
-import requests
+import http_client
 import json
 from config import SUPABASE_URL, SUPABASE_KEY
-from image_composer import compose_image
+import render_worker
 
 headers = {
     "apikey": SUPABASE_KEY,
@@ -14,42 +14,41 @@ headers = {
 
 def update_post_image(post_id, new_url):
     url = f"{SUPABASE_URL}/rest/v1/Post?id=eq.{post_id}"
-    resp = requests.patch(url, headers=headers, json={"imageUrl": new_url})
+    resp = http_client.patch(url, headers=headers, json={"imageUrl": new_url})
     if resp.status_code >= 400:
         print(f"Error updating post {post_id}: {resp.text}")
 
 def main():
     print("Fetching existing posts from Supabase...")
     url = f"{SUPABASE_URL}/rest/v1/Post?select=id,slug,title,imageUrl"
-    r = requests.get(url, headers=headers)
+    r = http_client.get(url, headers=headers)
     if r.status_code != 200:
         print("Failed to fetch posts")
         return
         
     posts = r.json()
-    print(f"Found {len(posts)} posts. Reprocessing images...")
-    
-    for p in posts:
-        post_id = p['id']
-        title = p['title']
-        old_url = p['imageUrl']
-        slug = p['slug']
-        
-        print(f"\n[Processing] {slug}")
-        print(f"Old URL: {old_url}")
-        
-        try:
-            # We skip rembg if it's already an amazon image?
-            # Actually, rembg will perfectly cut the watch out of the old charcoal background!
-            new_url = compose_image(old_url, title)
-            
-            if new_url and new_url != old_url:
-                update_post_image(post_id, new_url)
-                print(f"✅ Updated database for {slug}!")
-            else:
-                print(f"⚠️ Failed to generate or upload new image for {slug}")
-        except Exception as e:
-            print(f"❌ Exception for {slug}: {str(e)}")
+    print(f"Found {len(posts)} posts. Reprocessing images on {render_worker.worker_count()} render worker(s)...")
+
+    # Re-rendering is CPU-bound: download/upload in threads, rembg + composition in worker processes.
+    # rembg will perfectly cut the watch out of the old charcoal background!
+    jobs = [(p['id'], p['imageUrl'], p['title']) for p in posts if p.get('imageUrl')]
+    slugs = {p['id']: p['slug'] for p in posts}
+    try:
+        for (post_id, old_url, _title), urls in render_worker.compose_many(jobs, variants=("ad",)):
+            slug = slugs[post_id]
+            new_url = urls["ad"]["jpeg"]
+            print(f"\n[Processing] {slug}")
+            print(f"Old URL: {old_url}")
+            try:
+                if new_url and new_url != old_url:
+                    update_post_image(post_id, new_url)
+                    print(f"✅ Updated database for {slug}!")
+                else:
+                    print(f"⚠️ Failed to generate or upload new image for {slug}")
+            except Exception as e:
+                print(f"❌ Exception for {slug}: {str(e)}")
+    finally:
+        render_worker.shutdown()
 
 if __name__ == "__main__":
     main()